@@ -0,0 +1,94 @@
+from reservation import process_reservation
+from datetime import datetime
+import json
+import sys
+import logging
+
+logger = logging.getLogger('Batch')
+
+def read_reservation_ids(ids=None, id_file=None):
+    reservation_ids = []
+    if id_file:
+        logger.info(f"Reading reservation IDs from {'stdin' if id_file == '-' else id_file}")
+        if id_file == "-":
+            lines = sys.stdin.read().splitlines()
+        else:
+            with open(id_file, 'r') as f:
+                lines = f.read().splitlines()
+        for line in lines:
+            # Allow comma/space separated IDs and '#' comments in the file
+            line = line.split("#", 1)[0]
+            reservation_ids.extend(part for part in line.replace(",", " ").split() if part)
+    if ids:
+        reservation_ids.extend(str(rid).strip() for rid in ids if str(rid).strip())
+
+    unique_ids = []
+    for rid in reservation_ids:
+        if rid not in unique_ids:
+            unique_ids.append(rid)
+        else:
+            logger.warning(f"Skipping duplicate reservation ID: {rid}")
+    logger.info(f"Loaded {len(unique_ids)} reservation IDs")
+    return unique_ids
+
+def run_batch(browser, reservation_ids):
+    logger.info(f"Starting batch of {len(reservation_ids)} reservations")
+    results = []
+    for index, reservation_id in enumerate(reservation_ids, 1):
+        logger.info(f"Batch progress: {index}/{len(reservation_ids)} - reservation {reservation_id}")
+        try:
+            result = process_reservation(browser, reservation_id)
+        except SystemExit:
+            # get_billing_code quits the driver and exits when the requisition
+            # cannot be resolved, so the remaining IDs cannot be processed
+            logger.error(f"Browser closed while processing {reservation_id}, aborting batch")
+            results.append({
+                "reservation_id": reservation_id,
+                "status": "aborted",
+                "billing_code": None,
+                "steps": {},
+                "error": "Browser closed during billing code retrieval",
+                "duration": 0.0
+            })
+            for remaining_id in reservation_ids[index:]:
+                results.append({
+                    "reservation_id": remaining_id,
+                    "status": "skipped",
+                    "billing_code": None,
+                    "steps": {},
+                    "error": "Batch aborted",
+                    "duration": 0.0
+                })
+            break
+        results.append(result)
+        logger.info(f"Reservation {reservation_id} finished with status '{result['status']}' in {result['duration']}s")
+    return results
+
+def summarize_results(results):
+    summary = {}
+    for result in results:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+    return summary
+
+def write_summary(results, filename=None, extra=None):
+    if filename is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"batch_results_{timestamp}.json"
+
+    summary = summarize_results(results)
+    logger.info("Batch summary:")
+    for result in results:
+        logger.info(f"{result['reservation_id']:>10} | {result['status']:8} | {result['duration']:>7}s | {result['error'] or ''}")
+    logger.info(f"Totals: {summary}")
+
+    try:
+        with open(filename, 'w') as f:
+            report = {"summary": summary, "results": results}
+            if extra:
+                report.update(extra)
+            json.dump(report, f, indent=2)
+        logger.info(f"Batch results saved to {filename}")
+        return filename
+    except Exception as e:
+        logger.error(f"Failed to save batch results: {str(e)}")
+        return None
@@ -0,0 +1,399 @@
+from benchmarks.results import DEFAULT_RESULTS_DIR, metric, new_run, save_run, load_run, find_baseline, compare_runs, print_comparison
+from mocks.servers import MockServers
+from mocks.t2Server import parse_billing_code
+from services import tracer
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+import argparse
+import glob
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import logging
+import config
+
+logger = logging.getLogger('Benchmark')
+
+MODES = ("serial", "pipeline", "workers")
+BENCHMARK_CREDS = {
+    "t2_username": "benchmark",
+    "t2_password": "benchmark",
+    "offstreet_email": "benchmark@example.com",
+    "offstreet_password": "benchmark"
+}
+# Spans from reservation.py/pipeline.py that are compared between runs
+STEP_SPANS = (
+    "reservation", "reservation.prefetch", "reservation.convert", "t2.navigate",
+    "offstreet.navigate", "offstreet.first_page", "offstreet.second_page", "offstreet.third_page",
+    "offstreet.event_settings", "offstreet.portal_settings", "email", "denial"
+)
+
+LOTS = (
+    "Downey Way Structure", "Biggy Structure", "San Pablo Parking Structure", "Figueroa Street Structure",
+    "McCarthy Quad Structure", "Jefferson Blvd Structure", "Royal Street Structure", "Grand Avenue Structure"
+)
+DEPARTMENTS = ("Marketing Athletics", "Viterbi Admissions", "Thornton School of Music", "Student Affairs", "Keck Medicine")
+EVENTS = ("Media Days", "Open House", "Alumni Reception", "Faculty Retreat", "Donor Luncheon", "Orientation")
+FIRST_NAMES = ("Taylor", "Jordan", "Alex", "Morgan", "Casey", "Riley", "Jamie")
+LAST_NAMES = ("Kim", "Garcia", "Nguyen", "Smith", "Patel", "Lopez", "Chen")
+BEGIN_TIMES = ("6:00 AM", "7:00 AM", "8:30 AM", "12:00 PM", "5:00 PM")
+
+def generate_reservations(count, seed=1, expired_ratio=0.1):
+    """Synthetic reservations shaped like t2_data.json, sharing R#s so the requisition cache sees repeats."""
+    rng = random.Random(seed)
+    today = datetime.now()
+    requisitions = []
+    for index in range(max(1, count // 3)):
+        expired = rng.random() < expired_ratio
+        exp_date = today + timedelta(days=-rng.randint(1, 90) if expired else rng.randint(30, 365))
+        requisitions.append((f"ISD{rng.randint(10000, 99999):06d}", f"PG{rng.randint(1000000, 9999999)}", exp_date.strftime("%m/%d/%Y")))
+
+    reservations = []
+    for index in range(count):
+        r_number, gl_account, exp_date = rng.choice(requisitions)
+        begin = today + timedelta(days=rng.randint(1, 60))
+        end = begin + timedelta(days=rng.choice((0, 0, 1, 2, 4, 6)))
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        department = rng.choice(DEPARTMENTS)
+        t2_data = {
+            "Attendant Notes": "",
+            "Begin Date": f"{begin.month}/{begin.day}/{begin.year}",
+            "Confirmation/Reservation UID": str(500000 + index),
+            "Customer Remarks": "",
+            "End Date": f"{end.month}/{end.day}/{end.year}",
+            "Requested Lot": rng.choice(LOTS),
+            "Reservation Status": "Pending",
+            "Requested Gate": "McClintock Ave. Entrance",
+            "R#": r_number,
+            "Requisition or Third Party": r_number,
+            "Cars Requested": str(rng.choice((1, 2, 5, 10, 25, 60))),
+            "Exceed Car Requested Set Value": "Yes" if rng.random() < 0.2 else "No",
+            "RSV Payment Method": "Requisition",
+            "Requested Campus": "UPC",
+            "Begin Time": rng.choice(BEGIN_TIMES),
+            "Contact Department": department,
+            "Contact E-mail": f"{first_name[0].lower()}{last_name.lower()}@usc.edu",
+            "Contact First Name": first_name,
+            "Contact Last Name": last_name,
+            "Contact Phone": f"({rng.randint(200, 999)}) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}",
+            "End Time": "11:59 PM",
+            "Event Name": f"{department.split()[0]} {rng.choice(EVENTS)}",
+            "Reservation Type": "Standard Reservation",
+            "Value Type": "Per Use",
+            "Validation Control Group": "Department Pays Requisition"
+        }
+        reservations.append({
+            "t2_data": t2_data,
+            "billing_code": f"{r_number} & {gl_account}",
+            "requisition_exp_date": exp_date
+        })
+    return reservations
+
+class _HeadlessRoot:
+    def withdraw(self):
+        pass
+
+    def destroy(self):
+        pass
+
+    def after(self, *args):
+        pass
+
+    def attributes(self, *args):
+        pass
+
+    def focus_force(self):
+        pass
+
+def install_operator(gl_accounts):
+    """Answers the tkinter prompts the way an operator would, so runs need no display.
+
+    Expired requisitions go through the third party search flow; the operator
+    "reads" the GL account for the R# being searched.
+    """
+    import browser
+    from services import emailTemplateService
+
+    current = {}
+    search_failure = browser.Browser.handle_isd_search_failure
+
+    def handle_isd_search_failure(self, r_number):
+        current["gl_account"] = gl_accounts.get(r_number)
+        return search_failure(self, r_number)
+
+    browser.Browser.handle_isd_search_failure = handle_isd_search_failure
+    browser.tk = SimpleNamespace(Tk=_HeadlessRoot)
+    browser.messagebox = SimpleNamespace(showwarning=lambda *args, **kwargs: None)
+    browser.simpledialog = SimpleNamespace(askstring=lambda *args, **kwargs: current.get("gl_account"))
+    emailTemplateService.tk = SimpleNamespace(Tk=_HeadlessRoot)
+    emailTemplateService.mbox = SimpleNamespace(showinfo=lambda *args, **kwargs: None)
+
+class ChromeMemorySampler:
+    """Samples the summed RSS of Chrome processes started by this process (Linux /proc only)."""
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.peak_kb = 0
+        self.available = os.path.isdir("/proc")
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ChromeMemorySampler", daemon=True)
+
+    def _processes(self):
+        children = {}
+        names = {}
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat", "r") as f:
+                    stat = f.read()
+            except OSError:
+                continue
+            # comm is parenthesised and may contain spaces; ppid follows the state field
+            name = stat[stat.index("(") + 1:stat.rindex(")")]
+            ppid = int(stat[stat.rindex(")") + 2:].split()[1])
+            names[int(entry)] = name
+            children.setdefault(ppid, []).append(int(entry))
+        return children, names
+
+    def _rss_kb(self, pid):
+        try:
+            with open(f"/proc/{pid}/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1])
+        except OSError:
+            pass
+        return 0
+
+    def sample(self):
+        children, names = self._processes()
+        pending = [os.getpid()]
+        total = 0
+        while pending:
+            pid = pending.pop()
+            for child in children.get(pid, []):
+                pending.append(child)
+                if "chrome" in names.get(child, "") and "chromedriver" not in names.get(child, ""):
+                    total += self._rss_kb(child)
+        self.peak_kb = max(self.peak_kb, total)
+        return total
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logger.debug(f"Memory sample failed: {str(e)}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self.available:
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        return round(self.peak_kb / 1024, 1) if self.available else None
+
+def _set_setting(name, env_name, value):
+    # Worker processes re-import config, so settings go through the environment too
+    if isinstance(value, bool):
+        os.environ[env_name] = "1" if value else "0"
+    else:
+        os.environ[env_name] = str(value)
+    setattr(config, name, value)
+
+def _run_serial(reservation_ids, gl_accounts, options):
+    from browser import Browser
+    from reservation import login_browser
+    from batch import run_batch
+
+    browser = Browser()
+    try:
+        if not login_browser(browser, BENCHMARK_CREDS):
+            raise RuntimeError("Login to the mock servers failed")
+        return run_batch(browser, reservation_ids), {}
+    finally:
+        browser.close()
+
+def _run_pipeline(reservation_ids, gl_accounts, options):
+    from browser import Browser
+    from reservation import login_browser, login_t2
+    from pipeline import run_pipeline
+
+    t2_browser = Browser()
+    offstreet_browser = Browser()
+    try:
+        if not login_t2(t2_browser, BENCHMARK_CREDS) or not login_browser(offstreet_browser, BENCHMARK_CREDS):
+            raise RuntimeError("Login to the mock servers failed")
+        return run_pipeline(t2_browser, offstreet_browser, reservation_ids, config.PIPELINE_PREFETCH_DEPTH), {}
+    finally:
+        t2_browser.close()
+        offstreet_browser.close()
+
+def _run_workers(reservation_ids, gl_accounts, options):
+    from workers import run_worker_pool
+
+    results, pool_stats = run_worker_pool(
+        BENCHMARK_CREDS, reservation_ids, options.workers,
+        initializer=install_operator, initargs=(gl_accounts,)
+    )
+    return results, {"pool": pool_stats}
+
+RUNNERS = {"serial": _run_serial, "pipeline": _run_pipeline, "workers": _run_workers}
+
+def _command_counts(profile_dir, reservation_count):
+    total = 0
+    by_command = {}
+    for path in glob.glob(os.path.join(profile_dir, "commands_*.json")):
+        with open(path, "r") as f:
+            profile = json.load(f)
+        total += profile["commands"]
+        for command, entry in profile["by_command"].items():
+            by_command[command] = by_command.get(command, 0) + entry["count"]
+    return {
+        "total": total,
+        "per_reservation": round(total / reservation_count, 1) if reservation_count else 0.0,
+        "by_command": dict(sorted(by_command.items(), key=lambda item: item[1], reverse=True))
+    }
+
+def gl_accounts_by_r_number(reservations):
+    return dict(parse_billing_code(r["billing_code"]) for r in reservations)
+
+def run_mode(mode, reservations, options):
+    """Runs every reservation through one configuration against fresh mock servers."""
+    reservation_ids = [r["t2_data"]["Confirmation/Reservation UID"] for r in reservations]
+    gl_accounts = gl_accounts_by_r_number(reservations)
+    work_dir = tempfile.mkdtemp(prefix=f"parking_benchmark_{mode}_")
+    trace_file = os.path.join(work_dir, "spans.jsonl")
+    profile_dir = os.path.join(work_dir, "commands")
+
+    # Fresh servers per mode: the deny step changes reservation state
+    servers = MockServers(reservations, options.latency, options.api_latency).start()
+    servers.apply()
+    _set_setting("REQUISITION_CACHE_FILE", "REQUISITION_CACHE_FILE", os.path.join(work_dir, "requisitions.json"))
+    _set_setting("LOCATION_CATALOG_FILE", "LOCATION_CATALOG_FILE", os.path.join(work_dir, "locations.json"))
+    _set_setting("ASSET_CACHE_FILE", "ASSET_CACHE_FILE", os.path.join(work_dir, "assets.json"))
+    _set_setting("SESSION_FILE", "SESSION_FILE", os.path.join(work_dir, "sessions"))
+    _set_setting("COMMAND_PROFILE_DIR", "PARKING_COMMAND_PROFILE_DIR", profile_dir)
+    _set_setting("TRACE_FILE", "PARKING_TRACE_FILE", trace_file)
+    tracer.configure(trace_file)
+
+    logger.info(f"Benchmarking {mode} mode with {len(reservation_ids)} reservations")
+    sampler = ChromeMemorySampler().start()
+    started = time.time()
+    try:
+        results, extra = RUNNERS[mode](reservation_ids, gl_accounts, options)
+    finally:
+        elapsed = time.time() - started
+        peak_rss = sampler.stop()
+        tracer.configure(None)
+        servers.stop()
+
+    statuses = {}
+    for result in results:
+        statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+    completed = statuses.get("success", 0) + statuses.get("partial", 0)
+    durations = [result["duration"] for result in results if result["status"] in ("success", "partial")]
+    steps = {}
+    if os.path.exists(trace_file):
+        for row in tracer.summarize(tracer.load_spans([trace_file])):
+            steps[row["name"]] = {key: round(row[key], 3) for key in ("count", "p50", "p95", "max")}
+    summary = {
+        "elapsed": round(elapsed, 2),
+        "statuses": statuses,
+        "reservations_per_minute": round(completed / elapsed * 60, 2) if elapsed else 0.0,
+        "reservation_p50": round(tracer.percentile(durations, 50), 2),
+        "reservation_p95": round(tracer.percentile(durations, 95), 2),
+        "steps": steps,
+        "commands": _command_counts(profile_dir, len(reservation_ids)),
+        "peak_chrome_rss_mb": peak_rss
+    }
+    summary.update(extra)
+    if options.keep_artifacts:
+        logger.info(f"Spans and command profiles kept in {work_dir}")
+    else:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return summary
+
+def add_metrics(run, mode, summary):
+    metrics = run["metrics"]
+    metrics[f"{mode}.reservations_per_minute"] = metric(summary["reservations_per_minute"], "higher", "reservations/min")
+    metrics[f"{mode}.reservation_p95"] = metric(summary["reservation_p95"], "lower", "s")
+    metrics[f"{mode}.commands_per_reservation"] = metric(summary["commands"]["per_reservation"], "lower", "commands")
+    metrics[f"{mode}.peak_chrome_rss_mb"] = metric(summary["peak_chrome_rss_mb"], "lower", "MB")
+    for name in STEP_SPANS:
+        if name in summary["steps"]:
+            metrics[f"{mode}.step.{name}.p95"] = metric(summary["steps"][name]["p95"], "lower", "s")
+
+def print_summary(mode, summary, out=sys.stdout):
+    out.write(f"\n== {mode} ==\n")
+    out.write(f"{summary['reservations_per_minute']} reservations/min over {summary['elapsed']}s, statuses {summary['statuses']}\n")
+    out.write(f"reservation wall time p50 {summary['reservation_p50']}s, p95 {summary['reservation_p95']}s\n")
+    out.write(f"{summary['commands']['total']} WebDriver commands ({summary['commands']['per_reservation']} per reservation)\n")
+    if summary["peak_chrome_rss_mb"] is not None:
+        out.write(f"peak Chrome RSS {summary['peak_chrome_rss_mb']} MB\n")
+    for name in STEP_SPANS:
+        step = summary["steps"].get(name)
+        if step:
+            out.write(f"  {name:30} p50 {step['p50']:>7.2f}s  p95 {step['p95']:>7.2f}s  (n={step['count']})\n")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end throughput/latency benchmark against the local T2 and Offstreet mocks")
+    parser.add_argument("--count", type=int, default=10, help="Synthetic reservations per mode")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--expired-ratio", type=float, default=0.1, help="Share of requisitions that are expired")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes for the workers mode")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock page latency (s)")
+    parser.add_argument("--api-latency", type=float, default=0.2, help="Mock XHR latency (s)")
+    parser.add_argument("--headed", action="store_true", help="Show the Chrome windows")
+    parser.add_argument("--output-dir", default=DEFAULT_RESULTS_DIR)
+    parser.add_argument("--baseline", help="Results file to compare against (defaults to the previous run)")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Relative change that counts as a regression")
+    parser.add_argument("--keep-artifacts", action="store_true", help="Keep the span and command profile files")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s | %(levelname)s | %(name)s | %(message)s')
+    logger.setLevel(logging.INFO)
+    _set_setting("HEADLESS", "PARKING_HEADLESS", not args.headed)
+
+    reservations = generate_reservations(args.count, args.seed, args.expired_ratio)
+    install_operator(gl_accounts_by_r_number(reservations))
+    run = new_run("e2e", {
+        "count": args.count,
+        "seed": args.seed,
+        "expired_ratio": args.expired_ratio,
+        "workers": args.workers,
+        "latency": args.latency,
+        "api_latency": args.api_latency,
+        "fetch_mode": config.T2_FETCH_MODE,
+        "timing_profile": config.TIMING_PROFILE,
+        "wait_strategy": config.WAIT_STRATEGY
+    })
+    run["modes"] = {}
+    for mode in args.modes:
+        summary = run_mode(mode, reservations, args)
+        run["modes"][mode] = summary
+        add_metrics(run, mode, summary)
+        print_summary(mode, summary)
+
+    baseline_file = args.baseline or find_baseline("e2e", args.output_dir)
+    filename = save_run(run, args.output_dir)
+    print(f"\nResults saved to {filename}")
+    if not baseline_file:
+        return 0
+    print(f"Comparing with {baseline_file}")
+    regressions = print_comparison(compare_runs(run, load_run(baseline_file), args.tolerance))
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+from benchmarks.results import DEFAULT_RESULTS_DIR, metric, new_run, save_run, load_run, find_baseline, compare_runs, print_comparison
+from benchmarks.endToEnd import generate_reservations, LOTS
+from services.firstPageService import FirstPageService
+from services.lotMatcher import LotMatcher
+from services.fourthPageService import EventSettingsService
+from services.emailTemplateService import EmailTemplateService
+import argparse
+import gc
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import logging
+
+logger = logging.getLogger('MicroBenchmark')
+
+STREETS = (
+    "Downey Way", "McClintock", "Jefferson", "Figueroa", "San Pablo", "Vermont", "Exposition", "Hoover",
+    "Royal Street", "Grand Avenue", "Biggy", "Zonal", "Soto", "Flower", "Hope", "Trousdale", "Childs Way"
+)
+KINDS = ("Structure", "Parking Structure", "Lot", "Garage", "Surface Lot", "Structure (Lower Level)")
+# Names from the live Offstreet location list, with the lot each T2 request should resolve to
+REAL_LOTS = (
+    "P8 - BIGGY STRUCTURE", "HSC - Biggy Street Lot", "PSA - Parking Structure A", "PSB - San Pablo Parking Structure",
+    "PSD - Downey Way Structure", "PSX - Downey Way Structure (Lower Level)", "PSF - Figueroa Street Structure",
+    "PSG - Grand Avenue Structure", "PSR - Royal Street Structure", "PSM - McCarthy Quad Structure",
+    "LOT 6 - Jefferson Surface Lot", "LOT 71 - Hoover Street Lot", "UVS - University Village Structure",
+    "SHR - Shrine Auditorium Lot", "HSC - Soto Street Structure", "HSC - Zonal Avenue Lot"
+)
+REAL_REQUESTS = (
+    ("Biggy Structure", "P8 - BIGGY STRUCTURE"),
+    ("Downey Way Structure", "PSD - Downey Way Structure"),
+    ("Downey", "PSD - Downey Way Structure"),
+    ("Downey Lower Level", "PSX - Downey Way Structure (Lower Level)"),
+    ("San Pablo", "PSB - San Pablo Parking Structure"),
+    ("Figueroa Street Structure", "PSF - Figueroa Street Structure"),
+    ("Grand Ave Structure", "PSG - Grand Avenue Structure"),
+    ("Royal St", "PSR - Royal Street Structure"),
+    ("McCarthy Quad", "PSM - McCarthy Quad Structure"),
+    ("Parking Structure A", "PSA - Parking Structure A"),
+    ("Jefferson Lot", "LOT 6 - Jefferson Surface Lot"),
+    ("Hoover Lot", "LOT 71 - Hoover Street Lot"),
+    ("University Village", "UVS - University Village Structure"),
+    ("Shrine Lot", "SHR - Shrine Auditorium Lot"),
+    ("Soto Street Structure", "HSC - Soto Street Structure"),
+    ("Zonal Lot", "HSC - Zonal Avenue Lot")
+)
+PHONE_FORMATS = ("({0}) {1}-{2}", "{0}-{1}-{2}", "{0}.{1}.{2}", "+1 {0} {1} {2}", "1{0}{1}{2}", "{0}{1}{2}", "x{2}")
+
+class _StaticLinkDriver:
+    # generate_email_content reads the event link from the page
+    class _Link:
+        def get_attribute(self, name):
+            return "https://www.offstreet.io/events/12345"
+
+    def find_element(self, by, value):
+        return self._Link()
+
+def lot_names(count, seed=1):
+    """Location names shaped like the Offstreet catalogue ("PSD - Downey Way Structure")."""
+    rng = random.Random(seed)
+    names = []
+    for index in range(count):
+        code = f"{rng.choice('PSHJ')}{rng.choice('ABCDFX') if rng.random() < 0.7 else rng.randint(1, 9)}"
+        name = f"{code} - {rng.choice(STREETS)} {rng.choice(KINDS)}"
+        # Some catalogue entries are all caps ("P8 - BIGGY STRUCTURE")
+        names.append(name.upper() if rng.random() < 0.3 else name)
+    return names
+
+def legacy_match_score(str1, str2):
+    # The positional character compare LotMatcher replaced, kept for the accuracy comparison
+    str1 = str1.lower()
+    str2 = str2.lower()
+    return sum(1 for a, b in zip(str1, str2) if a == b)
+
+def lot_matching_accuracy():
+    """Top-1 accuracy of the legacy scorer and LotMatcher over REAL_REQUESTS."""
+    matcher = LotMatcher(REAL_LOTS)
+    legacy_hits = 0
+    matcher_hits = 0
+    for requested, expected in REAL_REQUESTS:
+        if max(REAL_LOTS, key=lambda name: legacy_match_score(name, requested)) == expected:
+            legacy_hits += 1
+        best = matcher.best(requested)
+        if best and best[1] == expected:
+            matcher_hits += 1
+        else:
+            logger.warning(f"LotMatcher picked {best[1] if best else None} for {requested}, expected {expected}")
+    return legacy_hits / len(REAL_REQUESTS), matcher_hits / len(REAL_REQUESTS)
+
+def phone_numbers(count, seed=1):
+    rng = random.Random(seed)
+    return [
+        rng.choice(PHONE_FORMATS).format(rng.randint(200, 999), rng.randint(200, 999), f"{rng.randint(0, 9999):04d}")
+        for _ in range(count)
+    ]
+
+def build_cases(size, seed=1):
+    """(name, function, inputs) per helper; inputs are argument tuples."""
+    reservations = generate_reservations(size, seed)
+    t2_rows = [reservation["t2_data"] for reservation in reservations]
+    locations = list(REAL_LOTS) + lot_names(size, seed)
+    requested = [row["Requested Lot"] for row in t2_rows[:max(1, size // 40)]]
+
+    matcher = LotMatcher(locations)
+    first_page = FirstPageService(None, {}, None)
+    email_service = EmailTemplateService(_StaticLinkDriver())
+    settings_services = [EventSettingsService(None, row) for row in t2_rows]
+
+    return [
+        ("FirstPageService.format_phone", first_page.format_phone, [(phone,) for phone in phone_numbers(size, seed)]),
+        # What ThirdPageService used to do per requested lot: score every option
+        ("legacy match_score[full scan]", lambda lot: max(locations, key=lambda name: legacy_match_score(name, lot)), [(lot,) for lot in requested]),
+        ("LotMatcher.build", LotMatcher, [(locations,)]),
+        ("LotMatcher._score[uncached]", matcher._score, [(lot,) for lot in requested]),
+        ("LotMatcher.rank[cached]", matcher.rank, [(lot,) for lot in requested]),
+        ("EventSettingsService.calculate_days_and_rate", EventSettingsService.calculate_days_and_rate, [(service,) for service in settings_services]),
+        ("EmailTemplateService._format_parking_structure", EmailTemplateService._format_parking_structure, [(name,) for name in locations + list(LOTS)]),
+        ("EmailTemplateService.generate_email_content", email_service.generate_email_content, [({"t2_data": row},) for row in t2_rows])
+    ]
+
+def credential_case(count):
+    """Save+load round trips through a CredentialManager rooted in a temporary APPDATA."""
+    from services.credential_manager import CredentialManager
+
+    app_data = tempfile.mkdtemp(prefix="parking_benchmark_creds_")
+    previous = os.environ.get("APPDATA")
+    os.environ["APPDATA"] = app_data
+    try:
+        manager = CredentialManager()
+    finally:
+        if previous is None:
+            os.environ.pop("APPDATA", None)
+        else:
+            os.environ["APPDATA"] = previous
+    creds = {
+        "t2_username": "benchmark",
+        "t2_password": "benchmark-password",
+        "offstreet_email": "benchmark@example.com",
+        "offstreet_password": "benchmark-password"
+    }
+
+    def round_trip(creds):
+        manager.save_credentials(creds)
+        return manager.load_credentials()
+
+    return ("CredentialManager.save+load", round_trip, [(creds,)] * count), app_data
+
+def run_case(func, inputs, rounds=5, warmup=1):
+    """Times rounds over the whole corpus and reports per-call statistics in microseconds."""
+    for _ in range(warmup):
+        for args in inputs:
+            func(*args)
+
+    per_call = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for args in inputs:
+                func(*args)
+            per_call.append((time.perf_counter() - started) / len(inputs) * 1e6)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {
+        "calls": len(inputs),
+        "rounds": rounds,
+        "min_us": round(min(per_call), 3),
+        "median_us": round(statistics.median(per_call), 3),
+        "mean_us": round(statistics.mean(per_call), 3),
+        "stddev_us": round(statistics.stdev(per_call), 3) if len(per_call) > 1 else 0.0,
+        "ops_per_second": round(1e6 / statistics.median(per_call), 1)
+    }
+
+def print_results(cases, out=sys.stdout):
+    out.write(f"{'helper':50} {'calls':>8} {'min µs':>10} {'median µs':>10} {'stddev':>8} {'ops/s':>12}\n")
+    for name, stats in cases.items():
+        out.write(f"{name[:50]:50} {stats['calls']:>8} {stats['min_us']:>10.3f} {stats['median_us']:>10.3f} {stats['stddev_us']:>8.3f} {stats['ops_per_second']:>12.0f}\n")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the helpers that run without Chrome")
+    parser.add_argument("--size", type=int, default=2000, help="Lot names, phone numbers and reservations per corpus")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--credential-calls", type=int, default=200)
+    parser.add_argument("--filter", help="Only run helpers whose name contains this text")
+    parser.add_argument("--output-dir", default=DEFAULT_RESULTS_DIR)
+    parser.add_argument("--baseline", help="Results file to compare against (defaults to the previous run)")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Relative slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    # The helpers log on every call; keep the console quiet so timing reflects the helpers
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s | %(levelname)s | %(name)s | %(message)s')
+
+    cases = build_cases(args.size, args.seed)
+    credentials, app_data = credential_case(args.credential_calls)
+    cases.append(credentials)
+
+    run = new_run("micro", {"size": args.size, "rounds": args.rounds, "seed": args.seed, "credential_calls": args.credential_calls})
+    run["cases"] = {}
+    legacy_accuracy, indexed_accuracy = lot_matching_accuracy()
+    print(f"Lot matching top-1 accuracy over {len(REAL_REQUESTS)} real requests: legacy {legacy_accuracy:.0%}, LotMatcher {indexed_accuracy:.0%}\n")
+    run["metrics"]["LotMatcher.accuracy"] = metric(indexed_accuracy, "higher", "ratio")
+    try:
+        for name, func, inputs in cases:
+            if args.filter and args.filter not in name:
+                continue
+            stats = run_case(func, inputs, args.rounds)
+            run["cases"][name] = stats
+            run["metrics"][f"{name}.median_us"] = metric(stats["median_us"], "lower", "µs")
+    finally:
+        shutil.rmtree(app_data, ignore_errors=True)
+    print_results(run["cases"])
+
+    baseline_file = args.baseline or find_baseline("micro", args.output_dir)
+    filename = save_run(run, args.output_dir)
+    print(f"\nResults saved to {filename}")
+    if not baseline_file:
+        return 0
+    print(f"Comparing with {baseline_file}")
+    regressions = print_comparison(compare_runs(run, load_run(baseline_file), args.tolerance))
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+from datetime import datetime
+import glob
+import json
+import os
+import subprocess
+import sys
+import logging
+
+logger = logging.getLogger('BenchmarkResults')
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_RESULTS_DIR = os.path.join(REPO_DIR, "benchmark_results")
+
+def metric(value, better="lower", unit=""):
+    return {"value": value, "better": better, "unit": unit}
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+def new_run(kind, settings):
+    return {
+        "kind": kind,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "settings": settings,
+        "metrics": {}
+    }
+
+def save_run(run, output_dir=DEFAULT_RESULTS_DIR):
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = os.path.join(output_dir, f"{run['kind']}_{timestamp}.json")
+    with open(filename, "w") as f:
+        json.dump(run, f, indent=2)
+    logger.info(f"Benchmark results saved to {filename}")
+    return filename
+
+def load_run(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+def find_baseline(kind, output_dir=DEFAULT_RESULTS_DIR, exclude=None):
+    """Most recent earlier run of the same kind, or None."""
+    candidates = sorted(glob.glob(os.path.join(output_dir, f"{kind}_*.json")))
+    candidates = [path for path in candidates if not exclude or os.path.abspath(path) != os.path.abspath(exclude)]
+    return candidates[-1] if candidates else None
+
+def compare_runs(current, baseline, tolerance=0.1):
+    """Returns (name, baseline, current, relative change, regressed) for every shared metric."""
+    if current.get("settings") != baseline.get("settings"):
+        logger.warning("Baseline was recorded with different settings, comparison is approximate")
+    rows = []
+    for name, entry in current["metrics"].items():
+        base = baseline.get("metrics", {}).get(name)
+        if not base or not base["value"] or entry["value"] is None:
+            continue
+        change = (entry["value"] - base["value"]) / base["value"]
+        regressed = change < -tolerance if entry["better"] == "higher" else change > tolerance
+        rows.append((name, base["value"], entry["value"], change, regressed))
+    return rows
+
+def print_comparison(rows, out=sys.stdout):
+    out.write(f"{'metric':60} {'baseline':>12} {'current':>12} {'change':>8}\n")
+    for name, base, value, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        out.write(f"{name[:60]:60} {base:>12.4g} {value:>12.4g} {change * 100:>+7.1f}%{flag}\n")
+    regressions = sum(1 for row in rows if row[4])
+    out.write(f"{regressions} regression(s) out of {len(rows)} metrics\n")
+    return regressions
@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+from browser import Browser
+from reservation import login_browser
+from services.tracer import span
+import time
+import logging
+
+logger = logging.getLogger('Bootstrap')
+
+def _timed(name, func, *args):
+    started = time.time()
+    with span(name):
+        result = func(*args)
+    return result, time.time() - started
+
+def _close_when_launched(launch):
+    try:
+        browser, _ = launch.result()
+        browser.close()
+    except Exception as e:
+        logger.error(f"Failed to close browser after an aborted start-up: {str(e)}")
+
+def bootstrap(get_credentials, *args):
+    """Starts Chrome in a background thread while get_credentials(*args) runs, then logs in.
+
+    The credential dialog stays on the main thread (Tk requires it), and the
+    T2 and Offstreet logins overlap through login_browser's second tab, so
+    start-up takes about max(Chrome launch, credentials) plus the slower login.
+    Returns the logged-in Browser, or None after closing it if the login failed.
+    """
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ChromeLaunch") as executor:
+        launch = executor.submit(_timed, "bootstrap.chrome_launch", Browser)
+        try:
+            creds, credentials_time = _timed("bootstrap.credentials", get_credentials, *args)
+        except BaseException:
+            # get_credentials exits when the dialog is cancelled; do not leave Chrome behind
+            _close_when_launched(launch)
+            raise
+        browser, launch_time = launch.result()
+
+    logged_in, login_time = _timed("bootstrap.login", login_browser, browser, creds)
+    if not logged_in:
+        logger.error("Login failed during start-up")
+        browser.close()
+        return None
+
+    ready = time.time() - started
+    sequential = launch_time + credentials_time + login_time
+    logger.info(
+        f"Ready in {ready:.2f}s (Chrome launch {launch_time:.2f}s alongside credentials {credentials_time:.2f}s, "
+        f"logins {login_time:.2f}s; {sequential:.2f}s if run one after another)"
+    )
+    return browser
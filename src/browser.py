@@ -1,40 +1,121 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from services.t2FetchService import T2FetchService
+from services.requisitionCache import RequisitionCache, requisition_expired
+from services.locationCatalog import LocationCatalog
+from services.assetCache import AssetCache
+from services.credential_manager import CredentialManager
+from services.sessionService import SessionService
+from services.driverResolver import DriverResolver
+from services.waitService import WaitService
+from services.tracer import traced
+from services.commandProfiler import CommandProfiler
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+import config
 import json
-import time
 import tkinter as tk
 from tkinter import messagebox
 import sys
 from tkinter import simpledialog
 import logging
 from datetime import datetime
+from urllib.parse import urlparse
 
 logger = logging.getLogger('Browser')
 
+# Reads every T2FormRow label/value pair in one round trip. Mirrors the lookups
+# of the per-row path and counts the WebDriver commands that path would issue.
+T2_EXTRACT_SCRIPT = """
+const data = {};
+let rows = 0;
+let commands = 0;
+document.querySelectorAll('.T2FormRow').forEach(function (row) {
+    const readOnly = row.querySelector('.T2FormLabelReadOnly');
+    const labelElem = readOnly || row.querySelector('.T2FormLabelRequired');
+    const valueCell = row.querySelector('.T2FormControlCell');
+    commands += 2;
+    if (!labelElem || !valueCell) { return; }
+    const labelSpan = labelElem.querySelector('span');
+    commands += 2;
+    if (!labelSpan) { return; }
+    commands += 1;
+    const span = valueCell.querySelector('span');
+    const anchor = valueCell.querySelector('a');
+    let value = '';
+    if (span) {
+        value = span.innerText;
+        commands += 3;
+    } else if (anchor) {
+        value = anchor.innerText;
+        commands += 4;
+    } else {
+        commands += 2;
+    }
+    data[labelSpan.innerText.trim()] = value.trim();
+    rows += 1;
+});
+return {rows: rows, commands: commands, data: data};
+"""
+
+class OperatorInputRequired(Exception):
+    """Raised instead of prompting while operator input is deferred (the pipeline's prefetch thread)."""
+
+    def __init__(self, r_number):
+        super().__init__(f"Operator input required for R#: {r_number}")
+        self.r_number = r_number
+
 class Browser:
     def __init__(self):
         logger.info("Initializing Browser")
         options = Options()
         options.add_argument("--start-maximized")
-        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+        if config.HEADLESS:
+            options.add_argument("--headless=new")
+            options.add_argument("--window-size=1920,1080")
+        if config.NETWORK_MONITOR:
+            # Exposes CDP Network events through the performance log for NetworkMonitor
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+            options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+        # Without a resolved path Selenium Manager looks for a driver itself
+        driver_path = DriverResolver(config.CHROMEDRIVER_MANIFEST_FILE).resolve()
+        self.driver = webdriver.Chrome(service=Service(driver_path), options=options)
         self.wait = WebDriverWait(self.driver, 10)
+        self.command_profiler = CommandProfiler(self.driver, config.COMMAND_PROFILE_DIR) if config.COMMAND_PROFILE_DIR else None
+        self.waits = WaitService(self.driver)
         self.t2_data = {}
         self.billing_code = None
+        self.t2_fetcher = None
+        self.requisition_cache = RequisitionCache(config.REQUISITION_CACHE_FILE, config.REQUISITION_CACHE_TTL_HOURS)
+        self.location_catalog = LocationCatalog(config.LOCATION_CATALOG_FILE, config.LOCATION_CATALOG_TTL_HOURS, config.OFFSTREET_BASE_URL)
+        self.asset_cache = AssetCache(config.ASSET_CACHE_FILE)
+        # Keys the asset cache; set once the Offstreet account is known
+        self.offstreet_account = None
+        # Tk may only run on the main thread; off it, prompts raise OperatorInputRequired
+        self.defer_operator_input = False
+        self.sessions = SessionService(self.driver, CredentialManager(), config.SESSION_TTL_HOURS, self.waits) if config.SESSION_RESTORE else None
         logger.info("Browser initialized successfully")
         
+    def reset_reservation_state(self):
+        self.t2_data = {}
+        self.billing_code = None
+        if self.t2_fetcher:
+            self.t2_fetcher.last_page = None
+
+    @traced()
     def handle_isd_search_failure(self, r_number):
+        if self.defer_operator_input:
+            logger.info(f"Leaving the ISD search failure for R# {r_number} to the operator")
+            raise OperatorInputRequired(r_number)
         try:
             logger.info(f"Handling ISD search failure for R#: {r_number}")
             root = tk.Tk()
             root.withdraw()
             messagebox.showwarning("Error", "ISDN not found use 3rd party search")
             
-            search_url = "https://usc.t2flex.com/PowerPark/thirdparty/search.aspx"
+            search_url = f"{config.T2_BASE_URL}/thirdparty/search.aspx"
             
             logger.info("Opening third party search in new tab")
             self.driver.execute_script("window.open('');")
@@ -77,30 +158,14 @@ class Browser:
         logger.info(f"Navigating to: {url}")
         self.driver.get(url)
 
+    @traced()
     def extract_t2_data(self):
         try:
             logger.info("Extracting T2 data")
             rows = self.wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, "T2FormRow")))
-            for row in rows:
-                try:
-                    label_elem = row.find_element(By.CLASS_NAME, "T2FormLabelReadOnly") if row.find_elements(By.CLASS_NAME, "T2FormLabelReadOnly") else row.find_element(By.CLASS_NAME, "T2FormLabelRequired")
-                    value_cell = row.find_element(By.CLASS_NAME, "T2FormControlCell")
-                    
-                    # Get the label text from the span inside the label element
-                    label = label_elem.find_element(By.TAG_NAME, "span").text
-                    
-                    # Get the value text, handling different possible element structures
-                    value = ""
-                    if value_cell.find_elements(By.TAG_NAME, "span"):
-                        value = value_cell.find_element(By.TAG_NAME, "span").text
-                    elif value_cell.find_elements(By.TAG_NAME, "a"):
-                        value = value_cell.find_element(By.TAG_NAME, "a").text
-                    
-                    logger.debug(f"Extracted field: {label} = {value}")
-                    self.t2_data[label] = value
-                except Exception as e:
-                    logger.error(f"Error extracting row data: {str(e)}")
-                    continue
+            if not self._extract_t2_data_script():
+                logger.warning("Scripted T2 extraction failed, falling back to per-row extraction")
+                self._extract_t2_data_rows(rows)
             
             logger.info("T2 data extraction completed")
             return self.t2_data
@@ -108,6 +173,44 @@ class Browser:
             logger.error(f"Error extracting T2 data: {str(e)}")
             return None
 
+    def _extract_t2_data_script(self):
+        try:
+            result = self.driver.execute_script(T2_EXTRACT_SCRIPT)
+            if not result or not result.get("rows"):
+                return False
+            for label, value in result["data"].items():
+                logger.debug(f"Extracted field: {label} = {value}")
+                self.t2_data[label] = value
+            # One script call replaces every find_element/.text the per-row path would issue
+            saved = result["commands"] - 1
+            logger.info(f"Extracted {len(result['data'])} fields from {result['rows']} rows in one script call, saved {saved} WebDriver commands")
+            return True
+        except Exception as e:
+            logger.error(f"Error running T2 extraction script: {str(e)}")
+            return False
+
+    def _extract_t2_data_rows(self, rows):
+        for row in rows:
+            try:
+                label_elem = row.find_element(By.CLASS_NAME, "T2FormLabelReadOnly") if row.find_elements(By.CLASS_NAME, "T2FormLabelReadOnly") else row.find_element(By.CLASS_NAME, "T2FormLabelRequired")
+                value_cell = row.find_element(By.CLASS_NAME, "T2FormControlCell")
+                
+                # Get the label text from the span inside the label element
+                label = label_elem.find_element(By.TAG_NAME, "span").text
+                
+                # Get the value text, handling different possible element structures
+                value = ""
+                if value_cell.find_elements(By.TAG_NAME, "span"):
+                    value = value_cell.find_element(By.TAG_NAME, "span").text
+                elif value_cell.find_elements(By.TAG_NAME, "a"):
+                    value = value_cell.find_element(By.TAG_NAME, "a").text
+                
+                logger.debug(f"Extracted field: {label} = {value}")
+                self.t2_data[label] = value
+            except Exception as e:
+                logger.error(f"Error extracting row data: {str(e)}")
+                continue
+
     def get_r_number(self):
         try:
             logger.info("Getting R number")
@@ -119,17 +222,19 @@ class Browser:
             logger.error(f"Error getting R number: {str(e)}")
             return None
 
-    def click_requisition_link(self):
+    @traced()
+    def click_requisition_link(self, r_number=None):
         try:
             logger.info("Attempting to click requisition link")
             link = self.wait.until(EC.element_to_be_clickable((By.ID, "MySettings_ResponsibleThirdPartyLink_T2FormLinkButton")))
             link.click()
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(3)
+            self.waits.present((By.ID, "ctl00_pageContent_MySettings_custom_ThirdParty_REQ_EXP_DATE_T2Label_Label"), replaces=3)
             logger.info("Requisition link clicked successfully")
             return True
         except Exception as e:
             logger.error(f"Error with requisition link: {str(e)}")
+            if self.defer_operator_input:
+                raise OperatorInputRequired(r_number)
             root = tk.Tk()
             root.withdraw()
             messagebox.showwarning("Error", "ISDN not found use 3rd party search")
@@ -148,25 +253,30 @@ class Browser:
             logger.error(f"Error getting GL Account: {str(e)}")
             return None
 
+    @traced()
     def get_billing_code(self):
         logger.info("Starting billing code retrieval process")
         r_number = self.get_r_number()
         if not r_number:
             return None
+
+        cached_billing_code = self._get_cached_billing_code(r_number)
+        if cached_billing_code:
+            return cached_billing_code
                     
-        if not self.click_requisition_link():
+        if not self.click_requisition_link(r_number):
             return None
         try:
             exp_date_element = self.wait.until(EC.presence_of_element_located((By.ID, "ctl00_pageContent_MySettings_custom_ThirdParty_REQ_EXP_DATE_T2Label_Label")))
             exp_date_str = exp_date_element.text.strip()
-            exp_date = time.strptime(exp_date_str, "%m/%d/%Y")
-            today = time.localtime()
                     
-            if time.mktime(exp_date) < time.mktime(today):
+            if self._requisition_expired(exp_date_str):
                 logger.error("Requisition has expired")
                 return self.handle_isd_search_failure(r_number)
                 
             logger.info("Requisition expiration date verified")
+        except OperatorInputRequired:
+            raise
         except Exception as e:
             logger.error(f"Error checking expiration date: {str(e)}")
             return self.handle_isd_search_failure(r_number)
@@ -175,10 +285,67 @@ class Browser:
         if not gl_account:
             return self.handle_isd_search_failure(r_number)
                     
+        self.requisition_cache.put(r_number, gl_account, exp_date_str)
         self.billing_code = f"{r_number} & {gl_account}"
         logger.info(f"Final billing code generated: {self.billing_code}")
         return self.billing_code
 
+    def _get_cached_billing_code(self, r_number):
+        cached = self.requisition_cache.get(r_number)
+        if not cached:
+            return None
+        gl_account, exp_date_str = cached
+        self.billing_code = f"{r_number} & {gl_account}"
+        logger.info(f"Billing code from requisition cache (expires {exp_date_str}): {self.billing_code}")
+        return self.billing_code
+
+    def _requisition_expired(self, exp_date_str):
+        return requisition_expired(exp_date_str)
+
+    @traced()
+    def fetch_t2_data_http(self, reservation_id):
+        try:
+            if self.t2_fetcher is None:
+                self.t2_fetcher = T2FetchService.from_driver(self.driver, config.T2_BASE_URL)
+            t2_data = self.t2_fetcher.fetch_reservation(reservation_id)
+            if t2_data is None:
+                # The T2 session cookies may have rotated since they were copied
+                logger.info("Refreshing T2 cookies from browser and retrying HTTP fetch")
+                self.t2_fetcher.copy_cookies_from_driver(self.driver)
+                t2_data = self.t2_fetcher.fetch_reservation(reservation_id)
+            if t2_data is None:
+                return None
+            self.t2_data.update(t2_data)
+            return self.t2_data
+        except Exception as e:
+            logger.error(f"Error fetching T2 data over HTTP: {str(e)}")
+            return None
+
+    @traced()
+    def get_billing_code_http(self):
+        try:
+            r_number = self.t2_fetcher.get_r_number() if self.t2_fetcher else None
+            if not r_number:
+                logger.error("R number not available from HTTP fetch")
+                return None
+            cached_billing_code = self._get_cached_billing_code(r_number)
+            if cached_billing_code:
+                return cached_billing_code
+            gl_account, exp_date_str = self.t2_fetcher.fetch_requisition()
+            if not gl_account or not exp_date_str:
+                return None
+            if self._requisition_expired(exp_date_str):
+                logger.error("Requisition has expired")
+                return None
+            self.requisition_cache.put(r_number, gl_account, exp_date_str)
+            self.billing_code = f"{r_number} & {gl_account}"
+            logger.info(f"Final billing code generated over HTTP: {self.billing_code}")
+            return self.billing_code
+        except Exception as e:
+            logger.error(f"Error getting billing code over HTTP: {str(e)}")
+            return None
+
+    @traced()
     def login(self, username, password):
         try:
             logger.info("Attempting T2 login")
@@ -198,9 +365,11 @@ class Browser:
             logger.error(f"T2 login failed: {str(e)}")
             return False
 
+    @traced()
     def login_to_offstreet(self, email, password):
         try:
             logger.info("Attempting Offstreet login")
+            self.use_offstreet_account(email)
             email_field = self.wait.until(EC.presence_of_element_located((By.ID, "email")))
             password_field = self.wait.until(EC.presence_of_element_located((By.ID, "password")))
             
@@ -212,24 +381,66 @@ class Browser:
             login_button = self.wait.until(EC.element_to_be_clickable((By.ID, "login")))
             login_button.click()
             
-            self.wait.until(EC.url_contains("dashboard.offstreet.io/dashboard"))
+            self.wait.until(EC.url_contains(f"{urlparse(config.OFFSTREET_BASE_URL).netloc}/dashboard"))
             logger.info("Offstreet login successful")
             return True
         except Exception as e:
             logger.error(f"Offstreet login failed: {str(e)}")
             return False
 
+    def use_offstreet_account(self, email):
+        self.offstreet_account = f"{config.OFFSTREET_BASE_URL}|{email.lower()}"
+
+    @traced()
+    def restore_session(self, site, base_url, account):
+        if self.sessions is None:
+            return False
+        return self.sessions.restore(site, base_url, account)
+
+    def save_session(self, site, base_url, account):
+        if self.sessions is not None:
+            self.sessions.save(site, base_url, account)
+
+    def prepare_session(self, site, base_url, account):
+        if self.sessions is None:
+            return None
+        return self.sessions.prepare(site, base_url, account)
+
+    def verify_session(self, site, base_url, account):
+        return self.sessions.verify(site, base_url, account)
+
+    def open_tab(self):
+        """Opens an empty tab, switches to it and returns its handle."""
+        self.driver.switch_to.new_window('tab')
+        return self.driver.current_window_handle
+
+    def start_loading(self, url):
+        """Starts loading url in the current tab without waiting for it, unlike navigate."""
+        logger.info(f"Loading in background: {url}")
+        try:
+            # Page.navigate answers once the navigation has started
+            self.driver.execute_cdp_cmd("Page.navigate", {"url": url})
+        except Exception as e:
+            logger.debug(f"CDP navigation unavailable, navigating from a timer: {str(e)}")
+            self.driver.execute_script("const url = arguments[0]; setTimeout(() => { location.href = url; }, 0);", url)
+
+    def close_tab(self, handle, back_to):
+        try:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        except Exception as e:
+            logger.error(f"Failed to close tab: {str(e)}")
+        self.driver.switch_to.window(back_to)
+
     def navigate_to_events_create(self):
         try:
             logger.info("Navigating to events create page")
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(3)
+            self.waits.present((By.TAG_NAME, "body"), replaces=3)
             
-            self.driver.get("https://dashboard.offstreet.io/events/create")
+            self.driver.get(f"{config.OFFSTREET_BASE_URL}/events/create")
             
-            time.sleep(2)
             self.wait.until(EC.url_contains("/events/create"))
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "form")))
+            self.waits.present((By.TAG_NAME, "form"), replaces=2)
             logger.info("Successfully reached events create page")
             return True
         except Exception as e:
@@ -257,4 +468,8 @@ class Browser:
 
     def close(self):
         logger.info("Closing browser")
+        self.requisition_cache.log_stats()
+        self.location_catalog.log_stats()
+        if self.t2_fetcher:
+            self.t2_fetcher.close()
         self.driver.quit()
\ No newline at end of file
@@ -0,0 +1,69 @@
+import os
+
+T2_BASE_URL = os.getenv("T2_BASE_URL", "https://usc.t2flex.com/PowerPark")
+OFFSTREET_BASE_URL = os.getenv("OFFSTREET_BASE_URL", "https://dashboard.offstreet.io")
+# Public registration links on the event page start with this prefix
+OFFSTREET_EVENT_URL = os.getenv("OFFSTREET_EVENT_URL", "https://www.offstreet.io/events/")
+
+# "browser" renders the reservation page in Chrome, "http" fetches it with the
+# browser's T2 session cookies and parses the HTML directly
+T2_FETCH_MODE = os.getenv("T2_FETCH_MODE", "browser")
+
+APP_DATA_DIR = os.getenv("APPDATA") or os.path.expanduser("~")
+
+REQUISITION_CACHE_FILE = os.getenv("REQUISITION_CACHE_FILE", os.path.join(APP_DATA_DIR, ".parking_requisitions.json"))
+REQUISITION_CACHE_TTL_HOURS = float(os.getenv("REQUISITION_CACHE_TTL_HOURS", "168"))
+
+# Offstreet location ID -> name, so the third page can tick the requested lot
+# without a live search; re-read from the Add Locations table once it is older
+# than the TTL
+LOCATION_CATALOG_FILE = os.getenv("LOCATION_CATALOG_FILE", os.path.join(APP_DATA_DIR, ".parking_locations.json"))
+LOCATION_CATALOG_TTL_HOURS = float(os.getenv("LOCATION_CATALOG_TTL_HOURS", "24"))
+
+# Offstreet file IDs of previously uploaded assets (the transport.png branding
+# image), per Offstreet account, so the file dialog can be skipped
+ASSET_CACHE_FILE = os.getenv("ASSET_CACHE_FILE", os.path.join(APP_DATA_DIR, ".parking_assets.json"))
+
+# Chrome version -> chromedriver path, so Chrome starts without a
+# ChromeDriverManager lookup until Chrome itself is updated
+CHROMEDRIVER_MANIFEST_FILE = os.getenv("CHROMEDRIVER_MANIFEST_FILE", os.path.join(APP_DATA_DIR, ".parking_chromedriver.json"))
+
+# T2 and Offstreet cookies and localStorage from the last login, encrypted with
+# the credentials key; a saved session is reused when one probe page load
+# shows it is still logged in. Defaults to .parking_sessions next to the credentials.
+SESSION_FILE = os.getenv("SESSION_FILE")
+SESSION_TTL_HOURS = float(os.getenv("SESSION_TTL_HOURS", "5"))
+SESSION_RESTORE = os.getenv("PARKING_SESSION_RESTORE", "1") == "1"
+
+# Log in to T2 while the Offstreet page loads in a second tab
+PARALLEL_LOGIN = os.getenv("PARKING_PARALLEL_LOGIN", "1") == "1"
+
+# Run Chrome without a window (CI, benchmarks, boxes without a display)
+HEADLESS = os.getenv("PARKING_HEADLESS", "0") == "1"
+
+# Reservations extracted ahead of the one being filled in Offstreet
+PIPELINE_PREFETCH_DEPTH = int(os.getenv("PIPELINE_PREFETCH_DEPTH", "2"))
+
+# Wait timing per environment. timeout bounds hard waits, commit_timeout
+# bounds best-effort checks (e.g. a field value sticking), poll is how often
+# conditions are re-checked.
+TIMING_PROFILES = {
+    "default": {"timeout": 10, "commit_timeout": 2, "poll": 0.1},
+    "fast": {"timeout": 6, "commit_timeout": 1, "poll": 0.05},
+    "slow": {"timeout": 20, "commit_timeout": 5, "poll": 0.25}
+}
+TIMING_PROFILE = os.getenv("PARKING_TIMING_PROFILE", "default")
+
+# "observer" resolves waits in the page with a MutationObserver, "poll" uses
+# WebDriverWait polling only
+WAIT_STRATEGY = os.getenv("PARKING_WAIT_STRATEGY", "observer")
+
+# Record CDP Network events so services can wait for XHRs to settle
+NETWORK_MONITOR = os.getenv("PARKING_NETWORK_MONITOR", "1") == "1"
+NETWORK_IDLE_MS = int(os.getenv("PARKING_NETWORK_IDLE_MS", "500"))
+
+# JSONL file for per-step latency spans; tracing is off when unset
+TRACE_FILE = os.getenv("PARKING_TRACE_FILE")
+
+# Directory for WebDriver command profiles; profiling is off when unset
+COMMAND_PROFILE_DIR = os.getenv("PARKING_COMMAND_PROFILE_DIR")
@@ -1,16 +1,20 @@
 from browser import Browser
-from services.secondPageService import SecondPageService
-from services.firstPageService import FirstPageService
-from services.fourthPageService import EventSettingsService
-from services.fifthPageService import PortalSettingsService
-from services.emailTemplateService import EmailTemplateService
-import time
+from bootstrap import bootstrap
+from reservation import login_browser, login_t2, process_reservation
+from pipeline import run_pipeline
+from workers import run_worker_pool
+from batch import read_reservation_ids, run_batch, write_summary
+import argparse
+import multiprocessing
+import config
 import os
 import sys
 import tkinter as tk
 from tkinter import simpledialog, messagebox
 from services.credential_manager import CredentialManager
+from services.requisitionCache import RequisitionCache
 from services import logger
+from services import tracer
 from datetime import datetime
 
 logger.configure_logging()  
@@ -125,6 +129,7 @@ def show_reservation_dialog(cred_manager=None):
             if cred_manager:
                 logger.info("Clearing saved credentials")
                 cred_manager.clear_credentials()
+                cred_manager.clear_sessions()
             result["action"] = "logout"
             dialog.quit()
             dialog.destroy()
@@ -175,24 +180,9 @@ def main():
     cred_manager = CredentialManager()
     
     while True:
-        browser = Browser()
-        creds = get_credentials(cred_manager)
-        
-        logger.info("Initiating T2 login")
-        browser.navigate("https://usc.t2flex.com/PowerPark")
-        if not browser.login(creds["t2_username"], creds["t2_password"]):
-            logger.error("T2 login failed")
-            browser.close()
+        browser = bootstrap(get_credentials, cred_manager)
+        if browser is None:
             continue
-        logger.info("T2 login successful")
-            
-        logger.info("Initiating Offstreet login")
-        browser.navigate("https://dashboard.offstreet.io")
-        if not browser.login_to_offstreet(creds["offstreet_email"], creds["offstreet_password"]):
-            logger.error("Offstreet login failed")
-            browser.close()
-            continue
-        logger.info("Offstreet login successful")
         
         while True:
             reservation_result = show_reservation_dialog(cred_manager)
@@ -214,94 +204,102 @@ def main():
                 browser.close()
                 return
             
-            logger.info(f"Processing reservation ID: {reservation_id}")
-            
-            url = f"https://usc.t2flex.com/PowerPark/reservation/view.aspx?id={reservation_id}&addtoqueue=1"
-            logger.info(f"About to navigate to T2 URL: {url}")
-            
-            try:
-                browser.navigate(url)
-                logger.info("Navigation to T2 reservation page complete")
-                
-                logger.info("Starting T2 data extraction")
-                t2_data = browser.extract_t2_data()
-                logger.info(f"T2 data extraction complete: {'Success' if t2_data else 'Failed'}")
-                
-                logger.info("Starting billing code retrieval")
-                billing_code = browser.get_billing_code()
-                logger.info(f"Billing code retrieval complete: {'Success' if billing_code else 'Failed'}")
-                
-                if t2_data and billing_code:
-                    logger.info(f"Successfully extracted T2 data with billing code: {billing_code}")
-                    logger.info("Saving data to file")
-                    browser.save_data_to_file()
-                    print(f"Billing Code: {billing_code}")
-                    
-                    logger.info("About to navigate to Offstreet events create page")
-                    browser.navigate("https://dashboard.offstreet.io/events/create")
-                    logger.info("Navigation to Offstreet events create page complete")
-                    
-                    logger.info("Starting first page form fill process")
-                    first_page_service = FirstPageService(browser.driver, t2_data, billing_code)
-                    first_page_result = first_page_service.fill_first_page()
-                    logger.info(f"First page form result: {'Success' if first_page_result else 'Failed'}")
-                    time.sleep(1)
-                    
-                    logger.info("Starting second page processing")
-                    try:
-                        second_page_service = SecondPageService(browser.driver)
-                        second_page_result = second_page_service.process_second_page(t2_data)
-                        logger.info(f"Second page processing result: {'Success' if second_page_result else 'Failed'}")
-                    except Exception as e:
-                        logger.error(f"Error in second page processing: {str(e)}")
-                    
-                    logger.info("Starting third page processing")
-                    try:
-                        from services.thirdPageService import ThirdPageService
-                        third_page_service = ThirdPageService(browser.driver)
-                        third_page_result = third_page_service.process_third_page(t2_data)
-                        logger.info(f"Third page processing result: {'Success' if third_page_result else 'Failed'}")
-                    except Exception as e:
-                        logger.error(f"Error in third page processing: {str(e)}")
-                    
-                    logger.info("Configuring event settings")
-                    try:
-                        settings_service = EventSettingsService(browser.driver, t2_data)
-                        settings_service.configure_all_settings()
-                        logger.info("Event settings configuration complete")
-                    except Exception as e:
-                        logger.error(f"Error in event settings configuration: {str(e)}")
+            process_reservation(browser, reservation_id)
+
+def batch_main(reservation_ids, output_file=None):
+    logger.info("Starting batch parking automation process")
+    if not reservation_ids:
+        logger.error("No reservation IDs provided for batch mode")
+        return False
+
+    cred_manager = CredentialManager()
+    browser = bootstrap(get_credentials, cred_manager)
+    if browser is None:
+        return False
+    try:
+        results = run_batch(browser, reservation_ids)
+        write_summary(results, output_file)
+        return all(result["status"] == "success" for result in results)
+    finally:
+        try:
+            browser.close()
+        except Exception as e:
+            logger.error(f"Failed to close browser: {str(e)}")
 
-                    logger.info("Configuring portal settings")
-                    try:
-                        formatted_data = {"t2_data": t2_data}
-                        portal_settings = PortalSettingsService(browser.driver, formatted_data)
-                        portal_settings.configure_all_portal_settings()
-                        logger.info("Portal settings configuration complete")
-                    except Exception as e:
-                        logger.error(f"Error in portal settings configuration: {str(e)}")
-                    
-                    logger.info("Processing email templates")
-                    try:
-                        email_service = EmailTemplateService(browser.driver)
-                        email_service.open_email_in_new_tab({"t2_data": t2_data})
-                        email_service.handle_denial_process({"t2_data": t2_data})
-                        logger.info("Email template processing complete")
-                    except Exception as e:
-                        logger.error(f"Error in email template processing: {str(e)}")
-                    
-                    logger.info("Completed processing reservation")
-                else:
-                    logger.error(f"Failed to extract data for reservation {reservation_id}")
-                    if not t2_data:
-                        logger.error("T2 data extraction failed")
-                    if not billing_code:
-                        logger.error("Billing code retrieval failed")
+def pipeline_main(reservation_ids, output_file=None):
+    logger.info("Starting pipelined parking automation process")
+    if not reservation_ids:
+        logger.error("No reservation IDs provided for pipelined mode")
+        return False
+
+    cred_manager = CredentialManager()
+    creds = get_credentials(cred_manager)
+    # Dedicated T2 driver for prefetching; the Offstreet driver also needs T2
+    # for the denial step
+    t2_browser = Browser()
+    offstreet_browser = Browser()
+    try:
+        if not login_t2(t2_browser, creds) or not login_browser(offstreet_browser, creds):
+            return False
+        results = run_pipeline(t2_browser, offstreet_browser, reservation_ids, config.PIPELINE_PREFETCH_DEPTH)
+        write_summary(results, output_file)
+        return all(result["status"] == "success" for result in results)
+    finally:
+        for browser in (t2_browser, offstreet_browser):
+            try:
+                browser.close()
             except Exception as e:
-                logger.exception(f"Error processing reservation {reservation_id}: {str(e)}")
+                logger.error(f"Failed to close browser: {str(e)}")
+
+def workers_main(reservation_ids, output_file=None, worker_count=2):
+    logger.info("Starting multi-worker parking automation process")
+    if not reservation_ids:
+        logger.error("No reservation IDs provided for worker mode")
+        return False
+
+    cred_manager = CredentialManager()
+    creds = get_credentials(cred_manager)
+    results, pool_stats = run_worker_pool(creds, reservation_ids, worker_count)
+    write_summary(results, output_file, extra={"pool": pool_stats})
+    return all(result["status"] == "success" for result in results)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="USC on-campus parking reservation automation")
+    parser.add_argument("ids", nargs="*", help="Reservation UIDs to process in batch mode")
+    parser.add_argument("--batch-file", help="File with one reservation UID per line ('-' reads stdin)")
+    parser.add_argument("--output", help="Where to write the batch result summary (JSON)")
+    parser.add_argument("--pipeline", action="store_true", help="Prefetch T2 data in a second browser while Offstreet forms are filled")
+    parser.add_argument("--workers", type=int, default=0, help="Process the batch with N parallel browsers, each logged in once")
+    parser.add_argument("--trace", help="Append per-step latency spans to this JSONL file")
+    parser.add_argument("--profile-commands", help="Directory for per-reservation WebDriver command histograms and flamegraph stacks")
+    parser.add_argument("--warm-requisitions", help="CSV export of R#, GL Account and expiration date to pre-load into the requisition cache")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     try:
+        args = parse_args()
+        if args.trace:
+            # Worker processes read the trace file from the environment
+            os.environ["PARKING_TRACE_FILE"] = args.trace
+            tracer.configure(args.trace)
+        if args.profile_commands:
+            os.environ["PARKING_COMMAND_PROFILE_DIR"] = args.profile_commands
+            config.COMMAND_PROFILE_DIR = args.profile_commands
+        if args.warm_requisitions:
+            requisition_cache = RequisitionCache(config.REQUISITION_CACHE_FILE, config.REQUISITION_CACHE_TTL_HOURS)
+            requisition_cache.warm_from_csv(args.warm_requisitions)
+            if not (args.ids or args.batch_file):
+                sys.exit(0)
+        if args.ids or args.batch_file:
+            reservation_ids = read_reservation_ids(args.ids, args.batch_file)
+            if args.workers > 0:
+                success = workers_main(reservation_ids, args.output, args.workers)
+            elif args.pipeline:
+                success = pipeline_main(reservation_ids, args.output)
+            else:
+                success = batch_main(reservation_ids, args.output)
+            sys.exit(0 if success else 1)
         main()
     except Exception as e:
         logger.exception("Unexpected error occurred")
@@ -0,0 +1,143 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from http.cookies import SimpleCookie
+from urllib.parse import urlparse, parse_qs
+import json
+import threading
+import time
+import uuid
+import logging
+
+logger = logging.getLogger('MockServer')
+
+PAGE_STYLE = """
+body { font-family: Arial, sans-serif; margin: 24px; }
+label { display: block; margin-top: 8px; }
+input, select, textarea { display: block; min-width: 240px; margin: 4px 0; }
+button { margin: 6px 4px 6px 0; }
+table { border-collapse: collapse; }
+td, th { border: 1px solid #ccc; padding: 4px 8px; }
+"""
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.server.app.name} {self.address_string()} {format % args}")
+
+    def _dispatch(self, method):
+        parsed = urlparse(self.path)
+        self.route = parsed.path
+        self.query = {key: values[0] for key, values in parse_qs(parsed.query, keep_blank_values=True).items()}
+        self.form = {}
+        self.json = None
+        if method == "POST":
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length).decode("utf-8") if length else ""
+            if "json" in (self.headers.get("Content-Type") or ""):
+                self.json = json.loads(body or "{}")
+            else:
+                self.form = {key: values[0] for key, values in parse_qs(body, keep_blank_values=True).items()}
+
+        app = self.server.app
+        app.delay(self.route)
+        try:
+            app.handle(self, method)
+        except Exception as e:
+            logger.exception(f"{app.name} failed to handle {method} {self.path}: {str(e)}")
+            self.send_text("Internal Server Error", status=500)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def cookie(self, name):
+        cookies = SimpleCookie(self.headers.get("Cookie") or "")
+        return cookies[name].value if name in cookies else None
+
+    def _send(self, status, body, content_type, headers=None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        for name, value in (headers or []):
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_html(self, body, status=200, headers=None):
+        self._send(status, body, "text/html; charset=utf-8", headers)
+
+    def send_json(self, data, status=200):
+        self._send(status, json.dumps(data), "application/json")
+
+    def send_text(self, text, status=200):
+        self._send(status, text, "text/plain; charset=utf-8")
+
+    def redirect(self, location, headers=None):
+        self._send(302, "", "text/plain", [("Location", location)] + list(headers or []))
+
+
+class MockApp:
+    """Base for the local stand-in servers: sessions, artificial latency and routing."""
+
+    name = "Mock"
+    session_cookie = "mock_session"
+
+    def __init__(self, latency=0.0, api_latency=None):
+        self.latency = latency
+        self.api_latency = latency if api_latency is None else api_latency
+        self.lock = threading.Lock()
+        self.sessions = set()
+        self.request_count = 0
+        self.server = None
+        self.thread = None
+
+    def delay(self, route):
+        with self.lock:
+            self.request_count += 1
+        seconds = self.api_latency if "/api/" in route else self.latency
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def handle(self, request, method):
+        request.send_text("Not Found", status=404)
+
+    def new_session(self):
+        token = uuid.uuid4().hex
+        with self.lock:
+            self.sessions.add(token)
+        return ("Set-Cookie", f"{self.session_cookie}={token}; Path=/; HttpOnly")
+
+    def logged_in(self, request):
+        return request.cookie(self.session_cookie) in self.sessions
+
+    def page(self, title, body, script=""):
+        return (
+            f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{title}</title>"
+            f"<style>{PAGE_STYLE}</style></head><body>{body}"
+            f"{f'<script>{script}</script>' if script else ''}</body></html>"
+        )
+
+    def start(self, host="127.0.0.1", port=0):
+        self.server = ThreadingHTTPServer((host, port), MockRequestHandler)
+        self.server.daemon_threads = True
+        self.server.app = self
+        self.thread = threading.Thread(target=self.server.serve_forever, name=f"{self.name}Server", daemon=True)
+        self.thread.start()
+        logger.info(f"{self.name} mock listening on {self.origin} (latency {self.latency}s, API latency {self.api_latency}s)")
+        return self
+
+    @property
+    def origin(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            logger.info(f"{self.name} mock stopped after {self.request_count} requests")
+            self.server = None
@@ -0,0 +1,469 @@
+from mocks.base import MockApp
+from html import escape
+import json
+import logging
+
+logger = logging.getLogger('MockOffstreet')
+
+DEFAULT_LOCATIONS = [
+    "P8 - BIGGY STRUCTURE",
+    "PSA - Parking Structure A",
+    "PSD - Downey Way Structure",
+    "PSX - Downey Way Structure (Lower Level)",
+    "PSB - San Pablo Parking Structure",
+    "PSF - Figueroa Street Structure",
+    "McCarthy Quad Structure",
+    "Jefferson Blvd Structure",
+    "Royal Street Structure",
+    "Grand Avenue Structure",
+    "HSC - Biggy Street Lot",
+    "Shrine Auditorium Lot"
+]
+DEFAULT_FILES = ["transport.png", "transport (1).png", "campus-map.pdf", "logo.svg"]
+TEMPLATES = {
+    "Event Template": {"recipients": [], "message": "Your parking pass link is below."},
+    "Event Template w/Code": {
+        "recipients": ["parkers@example.com", "events@example.com"],
+        "message": "Register with the link below and enter the pass code."
+    }
+}
+
+SHARED_SCRIPT = """
+function openDialog(html) {
+    const dialog = document.createElement('div');
+    dialog.setAttribute('role', 'dialog');
+    dialog.setAttribute('aria-modal', 'true');
+    dialog.className = 'dialog';
+    dialog.innerHTML = html;
+    document.body.appendChild(dialog);
+    return dialog;
+}
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+}
+function debounce(fn, ms) {
+    let timer = null;
+    return function () {
+        const args = arguments;
+        clearTimeout(timer);
+        timer = setTimeout(function () { fn.apply(null, args); }, ms);
+    };
+}
+function setSwitch(button, on) {
+    button.setAttribute('aria-checked', on ? 'true' : 'false');
+    button.classList.toggle('bg-primary-600', on);
+    button.classList.toggle('bg-gray-200', !on);
+    const body = document.querySelector('[data-for="' + button.id + '"]');
+    if (body) { body.hidden = !on; }
+}
+document.addEventListener('click', function (event) {
+    const target = event.target.closest('[role="switch"], [role="checkbox"]');
+    if (!target) { return; }
+    if (target.getAttribute('role') === 'switch') {
+        setSwitch(target, target.getAttribute('aria-checked') !== 'true');
+    } else {
+        const on = target.getAttribute('aria-checked') !== 'true';
+        target.setAttribute('aria-checked', on ? 'true' : 'false');
+        target.classList.toggle('bg-primary-600', on);
+    }
+});
+"""
+
+WIZARD_SCRIPT = """
+const form = document.getElementById('wizard');
+const state = {contact: {}, dates: {}, locations: [], settings: {}, portal: {files: [], instructions: []}};
+let collect = function () {};
+let step = 0;
+
+function switchRow(id, label, body) {
+    return '<div class="setting"><button type="button" role="switch" id="' + id + '" aria-checked="false" class="switch bg-gray-200"></button>' +
+        '<span>' + label + '</span><div class="setting-body" data-for="' + id + '" hidden>' + body + '</div></div>';
+}
+function segment(type, label, placeholder) {
+    return '<div role="spinbutton" tabindex="0" contenteditable="true" data-segment-type="' + type + '" aria-label="' + type + ', ' + label + '">' + placeholder + '</div>';
+}
+function dateField(label) {
+    return '<div class="date-field" role="group" aria-label="' + label + '">' + segment('month', label, 'mm') + '/' + segment('day', label, 'dd') + '/' + segment('year', label, 'yyyy') + '</div>';
+}
+function timeField(id, label) {
+    return '<div id="' + id + '" class="date-field" role="group" aria-label="' + label + '">' + segment('hour', label, '––') + ':' + segment('minute', label, '––') + ' ' + segment('dayPeriod', label, 'AM') + '</div>';
+}
+function segmentValues(container) {
+    const values = {};
+    container.querySelectorAll('[data-segment-type]').forEach(function (seg) { values[seg.dataset.segmentType] = seg.textContent; });
+    return values;
+}
+
+// React Aria style segments: keystrokes are intercepted and the segment text rewritten
+form.addEventListener('keydown', function (event) {
+    const seg = event.target.closest('[data-segment-type]');
+    if (!seg || event.key === 'Tab') { return; }
+    event.preventDefault();
+    const type = seg.dataset.segmentType;
+    if (type === 'dayPeriod') {
+        if (/^[aA]$/.test(event.key)) { seg.textContent = 'AM'; }
+        if (/^[pP]$/.test(event.key)) { seg.textContent = 'PM'; }
+        return;
+    }
+    if (!/^[0-9]$/.test(event.key)) { return; }
+    const width = type === 'year' ? 4 : 2;
+    const typed = ((seg.dataset.typed || '') + event.key).slice(-width);
+    seg.dataset.typed = typed;
+    seg.textContent = typed.padStart(width, '0');
+});
+
+function renderContact() {
+    form.innerHTML =
+        '<h2>Event Details</h2>' +
+        '<label for="event">Event Name</label><input id="event" name="event">' +
+        '<label for="host">Host</label><input id="host" name="host">' +
+        '<label for="contact.firstName">First Name</label><input id="contact.firstName" name="contact.firstName">' +
+        '<label for="contact.lastName">Last Name</label><input id="contact.lastName" name="contact.lastName">' +
+        '<label for="contact.email">Email</label><input id="contact.email" name="contact.email" type="email">' +
+        '<label for="contact.phoneNumber">Phone Number</label><input id="contact.phoneNumber" name="contact.phoneNumber" type="tel">' +
+        '<label for="billingCode">Billing Code</label><input id="billingCode" name="billingCode">' +
+        '<button type="submit" class="bg-primary-600">Continue</button>';
+    collect = function () {
+        form.querySelectorAll('input').forEach(function (input) { state.contact[input.name] = input.value; });
+    };
+}
+
+function renderDates() {
+    form.innerHTML =
+        '<h2>Dates</h2>' +
+        '<label>Start Date</label>' + dateField('Start Date') +
+        '<label>Expiry Date</label>' + dateField('Expiry Date') +
+        '<label>Start Time</label>' + timeField('startTime', 'Start Time') +
+        '<label>End Time</label>' + timeField('endTime', 'End Time') +
+        '<button type="submit" class="bg-primary-600">Continue</button>';
+    collect = function () {
+        form.querySelectorAll('[role="group"]').forEach(function (group) { state.dates[group.getAttribute('aria-label')] = segmentValues(group); });
+    };
+}
+
+function renderLocations() {
+    form.innerHTML =
+        '<h2>Locations</h2>' +
+        '<ul id="selected-locations"></ul>' +
+        '<button type="button" class="inline-flex items-center gap-x-1.5" id="add-locations"><svg viewBox="0 0 16 16" width="12" height="12"><path d="M8 2v12M2 8h12" stroke="currentColor"/></svg>Add Locations</button>' +
+        '<button type="submit" class="bg-primary-600">Continue</button>';
+    document.getElementById('add-locations').addEventListener('click', openLocationsDialog);
+    collect = function () {};
+}
+
+function openLocationsDialog() {
+    const dialog = openDialog(
+        '<h2>Add Locations</h2>' +
+        '<input id="search" type="search" placeholder="Search..." autocomplete="off">' +
+        '<table><thead><tr><th></th><th>Location</th><th>Country</th></tr></thead><tbody></tbody></table>' +
+        '<div class="footer"><button type="button" data-close>Cancel</button><button type="button" class="bg-primary-600" data-choose>Choose</button></div>'
+    );
+    const tbody = dialog.querySelector('tbody');
+    let latest = 0;
+    function load(term) {
+        const request = ++latest;
+        fetch('/api/locations?q=' + encodeURIComponent(term)).then(function (response) { return response.json(); }).then(function (locations) {
+            if (request !== latest) { return; }
+            tbody.innerHTML = locations.map(function (location) {
+                return '<tr data-id="' + location.id + '"><td><span role="checkbox" aria-checked="false" tabindex="0" class="checkbox"></span></td>' +
+                    '<td>' + escapeHtml(location.name) + '</td><td>' + location.country + '</td></tr>';
+            }).join('');
+        });
+    }
+    dialog.querySelector('#search').addEventListener('input', debounce(function (event) { load(event.target.value); }, 150));
+    dialog.querySelector('[data-close]').addEventListener('click', function () { dialog.remove(); });
+    dialog.querySelector('[data-choose]').addEventListener('click', function () {
+        dialog.querySelectorAll('tbody tr').forEach(function (row) {
+            if (row.querySelector('[role="checkbox"]').getAttribute('aria-checked') === 'true') {
+                state.locations.push({id: row.dataset.id, name: row.children[1].textContent});
+            }
+        });
+        document.getElementById('selected-locations').innerHTML = state.locations.map(function (location) { return '<li>' + escapeHtml(location.name) + '</li>'; }).join('');
+        dialog.remove();
+    });
+    load('');
+}
+
+function additionalField(index) {
+    return '<div class="additional-field"><input name="additionalInfo.' + index + '.name" placeholder="e.g. Driver Name">' +
+        '<button type="button" role="switch" id="additionalInfo.' + index + '.isRequired" aria-checked="false" class="switch bg-gray-200"></button><span>Required</span></div>';
+}
+
+function renderSettings() {
+    form.innerHTML =
+        '<h2>Settings</h2>' +
+        switchRow('hasAdditionalInfo', 'Collect Additional Information', '<div id="additional-fields">' + additionalField(0) + '</div><button type="button" id="add-field">Add Field</button>') +
+        switchRow('hasCode', 'Require a Code',
+            '<div role="radiogroup"><div role="radio" class="option" data-mode="unique">Parkers input a unique code</div>' +
+            '<div role="radio" class="option" data-mode="same">Parkers input the same code</div></div>' +
+            '<div id="same-code" hidden><label for="sameCode">Code</label><input id="sameCode" name="sameCode"></div>') +
+        switchRow('hasRate', 'Add Rate', '<label>Rate</label><input name="rate" inputmode="numeric" placeholder="0.00">') +
+        switchRow('hasMaxParkers', 'Set Max Number of Parkers', '<label>Max Parkers</label><input name="maxParkers" placeholder="e.g. 48">') +
+        '<button type="submit" class="bg-primary-600">Continue</button>';
+    const fields = document.getElementById('additional-fields');
+    document.getElementById('add-field').addEventListener('click', function () {
+        fields.insertAdjacentHTML('beforeend', additionalField(fields.children.length));
+    });
+    form.querySelectorAll('[role="radio"]').forEach(function (option) {
+        option.addEventListener('click', function () {
+            form.querySelectorAll('[role="radio"]').forEach(function (other) { other.setAttribute('aria-checked', other === option ? 'true' : 'false'); });
+            document.getElementById('same-code').hidden = option.dataset.mode !== 'same';
+        });
+    });
+    collect = function () {
+        form.querySelectorAll('[role="switch"]').forEach(function (toggle) { state.settings[toggle.id] = toggle.getAttribute('aria-checked') === 'true'; });
+        form.querySelectorAll('input').forEach(function (input) { state.settings[input.name] = input.value; });
+    };
+}
+
+function renderPortal() {
+    form.innerHTML =
+        '<h2>Portal</h2>' +
+        switchRow('hasBranding', 'Add Branding', '<ul id="branding-files"></ul><button type="button" id="add-previous-files">Add Previous Files</button>') +
+        switchRow('hasInstructions', 'Add Instructions',
+            '<label>Registration Instructions</label><div class="ProseMirror" contenteditable="true" role="textbox"></div>' +
+            '<label>Confirmation Instructions</label><div class="ProseMirror" contenteditable="true" role="textbox"></div>') +
+        '<button type="submit" class="bg-primary-600">Create Event</button>';
+    document.getElementById('add-previous-files').addEventListener('click', openFilesDialog);
+    collect = function () {
+        state.portal.branding = document.getElementById('hasBranding').getAttribute('aria-checked') === 'true';
+        state.portal.instructions = Array.from(form.querySelectorAll('.ProseMirror')).map(function (editor) { return editor.innerText; });
+    };
+}
+
+function openFilesDialog() {
+    const dialog = openDialog(
+        '<h2>Add Previous Files</h2>' +
+        '<input type="search" placeholder="Search..." autocomplete="off">' +
+        '<table><tbody></tbody></table>' +
+        '<div class="footer"><button type="button" data-close>Cancel</button><button type="button" class="bg-primary-600" data-next>Next</button></div>'
+    );
+    const tbody = dialog.querySelector('tbody');
+    let latest = 0;
+    function load(term) {
+        const request = ++latest;
+        fetch('/api/files?q=' + encodeURIComponent(term)).then(function (response) { return response.json(); }).then(function (files) {
+            if (request !== latest) { return; }
+            tbody.innerHTML = files.map(function (file) {
+                return '<tr aria-label="' + escapeHtml(file.name) + '" data-id="' + file.id + '"><td><span role="checkbox" aria-checked="false" tabindex="0" class="checkbox"></span></td>' +
+                    '<td>' + escapeHtml(file.name) + '</td></tr>';
+            }).join('');
+        });
+    }
+    dialog.querySelector('input').addEventListener('input', debounce(function (event) { load(event.target.value); }, 150));
+    dialog.querySelector('[data-close]').addEventListener('click', function () { dialog.remove(); });
+    dialog.querySelector('[data-next]').addEventListener('click', function () {
+        const chosen = [];
+        tbody.querySelectorAll('tr').forEach(function (row) {
+            if (row.querySelector('[role="checkbox"]').getAttribute('aria-checked') === 'true') {
+                chosen.push({id: row.dataset.id, name: row.getAttribute('aria-label')});
+            }
+        });
+        dialog.innerHTML =
+            '<h2>Selected Files</h2><ul>' + chosen.map(function (file) { return '<li>' + escapeHtml(file.name) + '</li>'; }).join('') + '</ul>' +
+            '<div class="footer"><button type="button" data-close>Cancel</button><button type="button" class="bg-primary-600" data-save>Save</button></div>';
+        dialog.querySelector('[data-close]').addEventListener('click', function () { dialog.remove(); });
+        dialog.querySelector('[data-save]').addEventListener('click', function () {
+            state.portal.files = chosen;
+            document.getElementById('branding-files').innerHTML = chosen.map(function (file) { return '<li>' + escapeHtml(file.name) + '</li>'; }).join('');
+            dialog.remove();
+        });
+    });
+    load('');
+}
+
+const steps = [renderContact, renderDates, renderLocations, renderSettings, renderPortal];
+
+form.addEventListener('submit', function (event) {
+    event.preventDefault();
+    collect();
+    step += 1;
+    if (step < steps.length) {
+        steps[step]();
+        return;
+    }
+    form.querySelector('button[type="submit"]').disabled = true;
+    fetch('/api/events', {method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify(state)})
+        .then(function (response) { return response.json(); })
+        .then(function (created) { window.location.href = '/events/' + created.id; });
+});
+
+renderContact();
+"""
+
+SHARE_SCRIPT = """
+const shareForm = document.getElementById('share-form');
+document.querySelectorAll('.snap-center').forEach(function (tab) {
+    tab.addEventListener('click', function () {
+        document.querySelectorAll('[data-panel]').forEach(function (panel) { panel.hidden = panel.dataset.panel !== tab.dataset.tab; });
+    });
+});
+function pill(address, removable) {
+    return '<button type="button" class="pill"><span class="truncate">' + escapeHtml(address) + '</span>' +
+        (removable ? '<svg data-slot="icon" viewBox="0 0 16 16" width="10" height="10"><path d="M4 4l8 8M12 4l-8 8" stroke="currentColor"/></svg>' : '') + '</button>';
+}
+shareForm.addEventListener('submit', function (event) { event.preventDefault(); });
+shareForm.querySelector('input[name="replyToEmails"]').addEventListener('keydown', function (event) {
+    if (event.key !== 'Enter') { return; }
+    event.preventDefault();
+    if (event.target.value.trim()) {
+        document.getElementById('reply-to').insertAdjacentHTML('beforeend', pill(event.target.value.trim(), false));
+        event.target.value = '';
+    }
+});
+document.getElementById('recipients').addEventListener('click', function (event) {
+    const button = event.target.closest('button');
+    if (button) { button.remove(); }
+});
+document.getElementById('load-template').addEventListener('click', function () {
+    const names = TEMPLATE_NAMES;
+    const dialog = openDialog(
+        '<h2>Load Template</h2><div class="templates">' +
+        names.map(function (name) { return '<button type="button" class="template">' + escapeHtml(name) + '</button>'; }).join('') +
+        '</div><div class="footer"><button type="button" data-close>Cancel</button><button type="button" class="bg-primary-600" data-load>Load Template</button></div>'
+    );
+    let selected = null;
+    dialog.querySelectorAll('.template').forEach(function (button) {
+        button.addEventListener('click', function () {
+            dialog.querySelectorAll('.template').forEach(function (other) { other.classList.toggle('bg-primary-600', other === button); });
+            selected = button.textContent;
+        });
+    });
+    dialog.querySelector('[data-close]').addEventListener('click', function () { dialog.remove(); });
+    dialog.querySelector('[data-load]').addEventListener('click', function () {
+        if (!selected) { return; }
+        dialog.remove();
+        fetch('/api/templates?name=' + encodeURIComponent(selected)).then(function (response) { return response.json(); }).then(function (template) {
+            document.getElementById('recipients').innerHTML = template.recipients.map(function (address) { return pill(address, true); }).join('');
+            document.getElementById('message').innerText = template.message;
+        });
+    });
+});
+"""
+
+DIALOG_STYLE = """
+.dialog { position: fixed; top: 10%; left: 20%; right: 20%; background: #fff; border: 1px solid #888; padding: 16px; }
+.checkbox { display: inline-block; width: 14px; height: 14px; border: 1px solid #555; }
+.switch { width: 36px; height: 18px; border: 1px solid #555; }
+.bg-primary-600 { background: #4f46e5; color: #fff; }
+[data-segment-type] { display: inline-block; min-width: 20px; padding: 0 2px; }
+.ProseMirror { min-height: 40px; border: 1px solid #ccc; }
+"""
+
+class MockOffstreet(MockApp):
+    """Offstreet dashboard pages the automation drives: login, the events/create wizard and the event Share tab."""
+
+    name = "Offstreet"
+    session_cookie = "offstreet_session"
+
+    def __init__(self, locations=None, files=None, event_url=None, **kwargs):
+        super().__init__(**kwargs)
+        self.locations = [
+            {"id": index + 1, "name": name, "country": "US"}
+            for index, name in enumerate(locations or DEFAULT_LOCATIONS)
+        ]
+        self.files = [{"id": index + 1, "name": name} for index, name in enumerate(files or DEFAULT_FILES)]
+        self._event_url = event_url
+        self.events = {}
+
+    @property
+    def base_url(self):
+        return self.origin
+
+    @property
+    def event_url(self):
+        return self._event_url or f"{self.origin}/public/events/"
+
+    def page(self, title, body, script=""):
+        return super().page(title, f"<style>{DIALOG_STYLE}</style>{body}", script)
+
+    def handle(self, request, method):
+        route = request.route.rstrip("/") or "/"
+        if route == "/":
+            if self.logged_in(request):
+                return request.redirect("/dashboard")
+            return request.send_html(self.login_page())
+        if route == "/login" and method == "POST":
+            return self.login(request)
+        if route.startswith("/public/events/"):
+            return request.send_html(self.page("Event", "<h1>Register for parking</h1>"))
+        if not self.logged_in(request):
+            if route.startswith("/api/"):
+                return request.send_json({"error": "unauthorized"}, status=401)
+            return request.redirect("/")
+
+        if route == "/dashboard":
+            return request.send_html(self.page("Dashboard", "<h1>Dashboard</h1><a href='/events/create'>Create Event</a>"))
+        if route == "/events/create":
+            body = "<h1>Create Event</h1><form id='wizard' novalidate></form>"
+            return request.send_html(self.page("Create Event", body, SHARED_SCRIPT + WIZARD_SCRIPT))
+        if route.startswith("/events/"):
+            return self.event_page(request, route.split("/")[-1])
+        if route == "/api/locations":
+            return request.send_json(self._search(self.locations, request.query.get("q", "")))
+        if route == "/api/files":
+            return request.send_json(self._search(self.files, request.query.get("q", "")))
+        if route == "/api/templates":
+            template = TEMPLATES.get(request.query.get("name", ""))
+            if template is None:
+                return request.send_json({"error": "not found"}, status=404)
+            return request.send_json(template)
+        if route == "/api/events" and method == "POST":
+            return self.create_event(request)
+        request.send_text("Not Found", status=404)
+
+    def _search(self, items, term):
+        term = term.strip().lower()
+        return [item for item in items if term in item["name"].lower()]
+
+    def login_page(self):
+        return self.page("Offstreet Login", """
+<form method="post" action="/login">
+  <label for="email">Email</label><input id="email" name="email" type="email">
+  <label for="password">Password</label><input id="password" name="password" type="password">
+  <button id="login" type="submit">Log in</button>
+</form>""")
+
+    def login(self, request):
+        if not request.form.get("email") or not request.form.get("password"):
+            return request.send_html(self.login_page(), status=401)
+        logger.info(f"Offstreet login for {request.form['email']}")
+        request.redirect("/dashboard", [self.new_session()])
+
+    def create_event(self, request):
+        with self.lock:
+            event_id = str(len(self.events) + 1)
+            self.events[event_id] = request.json or {}
+        logger.info(f"Event {event_id} created: {self.events[event_id].get('contact', {}).get('event', '')}")
+        request.send_json({"id": event_id}, status=201)
+
+    def event_page(self, request, event_id):
+        event = self.events.get(event_id)
+        if event is None:
+            return request.send_text("Not Found", status=404)
+        link = f"{self.event_url}{event_id}"
+        name = escape(event.get("contact", {}).get("event", ""))
+        body = f"""
+<h1>{name}</h1>
+<p>Registration link: <a href="{escape(link)}">{escape(link)}</a></p>
+<div class="tabs">
+  <button type="button" class="snap-center" data-tab="overview">Overview</button>
+  <button type="button" class="snap-center" data-tab="parkers">Parkers</button>
+  <button type="button" class="snap-center" data-tab="share">Share</button>
+</div>
+<section data-panel="overview"><p>{len(event.get('locations', []))} location(s)</p></section>
+<section data-panel="parkers" hidden><p>No parkers yet.</p></section>
+<section data-panel="share" hidden>
+  <form id="share-form">
+    <label>Reply To</label><div id="reply-to"></div><input name="replyToEmails" type="email">
+    <label>Recipients</label><div role="combobox" id="recipients"></div>
+    <label for="subject">Subject</label><input id="subject" name="subject">
+    <label>Message</label><div id="message" class="ProseMirror" contenteditable="true"></div>
+    <button type="button" id="load-template">Load Template</button>
+    <button type="submit" class="bg-primary-600">Send</button>
+  </form>
+</section>"""
+        script = f"const TEMPLATE_NAMES = {json.dumps(list(TEMPLATES))};" + SHARED_SCRIPT + SHARE_SCRIPT
+        request.send_html(self.page(name or "Event", body, script))
@@ -0,0 +1,92 @@
+from mocks.t2Server import MockT2
+from mocks.offstreetServer import MockOffstreet
+import argparse
+import json
+import os
+import time
+import logging
+
+logger = logging.getLogger('MockServers')
+
+SAMPLE_RESERVATION_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "t2_data.json")
+
+def load_reservations(path=SAMPLE_RESERVATION_FILE):
+    """Reads one reservation shaped like t2_data.json, or a list of them.
+
+    Entries may carry a "requisition_exp_date" (MM/DD/YYYY) for the
+    requisition page; the sample's "Denied" status is reset so the deny
+    wizard is exercised.
+    """
+    with open(path, "r") as f:
+        data = json.load(f)
+    reservations = data if isinstance(data, list) else [data]
+    if path == SAMPLE_RESERVATION_FILE:
+        for reservation in reservations:
+            reservation["t2_data"]["Reservation Status"] = "Pending"
+    return reservations
+
+class MockServers:
+    """Runs the T2 and Offstreet stand-ins side by side on localhost."""
+
+    def __init__(self, reservations=None, latency=0.0, api_latency=None, host="127.0.0.1", t2_port=0, offstreet_port=0):
+        self.host = host
+        self.ports = (t2_port, offstreet_port)
+        self.t2 = MockT2(reservations, latency=latency, api_latency=api_latency)
+        self.offstreet = MockOffstreet(latency=latency, api_latency=api_latency)
+
+    def start(self):
+        self.t2.start(self.host, self.ports[0])
+        self.offstreet.start(self.host, self.ports[1])
+        return self
+
+    def stop(self):
+        self.t2.stop()
+        self.offstreet.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def environment(self):
+        """Settings that point config at the mocks (set before importing config)."""
+        return {
+            "T2_BASE_URL": self.t2.base_url,
+            "OFFSTREET_BASE_URL": self.offstreet.base_url,
+            "OFFSTREET_EVENT_URL": self.offstreet.event_url
+        }
+
+    def apply(self):
+        """Points an already imported config module at the mocks."""
+        import config
+
+        for name, value in self.environment().items():
+            os.environ[name] = value
+            setattr(config, name, value)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-ins for T2 and Offstreet")
+    parser.add_argument("--reservations", default=SAMPLE_RESERVATION_FILE, help="JSON file with one or a list of t2_data.json-shaped reservations")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every page response")
+    parser.add_argument("--api-latency", type=float, help="Seconds added to XHR/fetch responses (defaults to --latency)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--t2-port", type=int, default=8001)
+    parser.add_argument("--offstreet-port", type=int, default=8002)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(levelname)s | %(name)s | %(message)s')
+    servers = MockServers(load_reservations(args.reservations), args.latency, args.api_latency, args.host, args.t2_port, args.offstreet_port)
+    servers.start()
+    print("Point the automation at the mocks with:")
+    for name, value in servers.environment().items():
+        print(f"  export {name}={value}")
+    print(f"Reservations: {', '.join(servers.t2.reservations)}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        servers.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+from mocks.base import MockApp
+from html import escape
+from urllib.parse import quote
+import logging
+
+logger = logging.getLogger('MockT2')
+
+REQUISITION_TARGET = "ctl00$pageContent$MySettings$ResponsibleThirdPartyLink$T2FormLinkButton"
+DEFAULT_EXP_DATE = "12/31/2099"
+
+POSTBACK_SCRIPT = """
+function __doPostBack(eventTarget, eventArgument) {
+    const form = document.forms['aspnetForm'];
+    form.__EVENTTARGET.value = eventTarget;
+    form.__EVENTARGUMENT.value = eventArgument;
+    form.submit();
+}
+"""
+
+def parse_billing_code(billing_code):
+    parts = [part.strip() for part in (billing_code or "").split("&")]
+    if len(parts) != 2 or not all(parts):
+        return None, None
+    return parts[0], parts[1]
+
+class MockT2(MockApp):
+    """T2 Flex pages the automation reads: login, reservation view, requisition, deny note and third party search."""
+
+    name = "T2"
+    session_cookie = "ASP.NET_SessionId"
+
+    def __init__(self, reservations=None, prefix="/PowerPark", **kwargs):
+        super().__init__(**kwargs)
+        self.prefix = prefix
+        self.reservations = {}
+        self.requisitions = {}
+        self.notes = {}
+        for reservation in reservations or []:
+            self.add_reservation(reservation)
+
+    @property
+    def base_url(self):
+        return f"{self.origin}{self.prefix}"
+
+    def add_reservation(self, reservation):
+        """Registers a reservation shaped like t2_data.json ({"t2_data": ..., "billing_code": ...})."""
+        t2_data = dict(reservation["t2_data"])
+        reservation_id = t2_data["Confirmation/Reservation UID"]
+        t2_data.setdefault("Reservation Status", "Pending")
+        r_number, gl_account = parse_billing_code(reservation.get("billing_code"))
+        r_number = t2_data.get("R#") or r_number
+        if r_number and gl_account:
+            self.requisitions[r_number] = {
+                "gl_account": gl_account,
+                "exp_date": reservation.get("requisition_exp_date", DEFAULT_EXP_DATE),
+                "name": t2_data.get("Contact Department", "")
+            }
+        with self.lock:
+            self.reservations[reservation_id] = t2_data
+        return reservation_id
+
+    def handle(self, request, method):
+        route = request.route
+        if not route.startswith(self.prefix):
+            return request.redirect(f"{self.prefix}/")
+        route = route[len(self.prefix):].lower() or "/"
+
+        if route in ("/", "/login.aspx"):
+            if method == "POST":
+                return self.login(request)
+            return request.send_html(self.login_page())
+        if not self.logged_in(request):
+            # T2 answers protected URLs with the login form in place
+            return request.send_html(self.login_page())
+
+        if route == "/default.aspx":
+            return request.send_html(self.page("T2 Flex", f"<h1>T2 Flex</h1><p>Welcome back.</p><a id='LogoutLink' href='{self.prefix}/logout.aspx'>Log Out</a>"))
+        if route == "/reservation/view.aspx":
+            if method == "POST" and request.form.get("__EVENTTARGET") == REQUISITION_TARGET:
+                return self.requisition(request)
+            return self.view(request)
+        if route == "/reservation/modify.aspx":
+            if method == "POST":
+                return self.save_note(request)
+            return self.deny_page(request)
+        if route == "/thirdparty/search.aspx":
+            return self.third_party_search(request)
+        request.send_text("Not Found", status=404)
+
+    def login_page(self):
+        return self.page("T2 Flex Login", f"""
+<form method="post" action="{self.prefix}/login.aspx">
+  <label for="ctl00_pageContent_UserID_T2FormTextBox_TextBox">User ID</label>
+  <input type="text" id="ctl00_pageContent_UserID_T2FormTextBox_TextBox" name="ctl00$pageContent$UserID$T2FormTextBox$TextBox">
+  <label for="ctl00_pageContent_Password_T2FormTextBox_TextBox">Password</label>
+  <input type="password" id="ctl00_pageContent_Password_T2FormTextBox_TextBox" name="ctl00$pageContent$Password$T2FormTextBox$TextBox">
+  <input type="submit" id="ctl00_pageContent_LoginButton" name="ctl00$pageContent$LoginButton" value="Log In">
+</form>""")
+
+    def login(self, request):
+        username = request.form.get("ctl00$pageContent$UserID$T2FormTextBox$TextBox", "")
+        password = request.form.get("ctl00$pageContent$Password$T2FormTextBox$TextBox", "")
+        if not username or not password:
+            return request.send_html(self.login_page(), status=401)
+        logger.info(f"T2 login for {username}")
+        request.redirect(f"{self.prefix}/default.aspx", [self.new_session()])
+
+    def _row(self, label, value_html, required=False):
+        label_class = "T2FormLabelRequired" if required else "T2FormLabelReadOnly"
+        return (
+            f"<tr class='T2FormRow'><td class='{label_class}'><span>{escape(label)}</span></td>"
+            f"<td class='T2FormControlCell'>{value_html}</td></tr>"
+        )
+
+    def _value(self, value, element_id=None):
+        id_attr = f" id='{element_id}'" if element_id else ""
+        return f"<span{id_attr}>{escape(value or '')}</span>"
+
+    def _form(self, action, content):
+        return f"""
+<form name="aspnetForm" id="aspnetForm" method="post" action="{action}">
+  <input type="hidden" name="__EVENTTARGET" value="">
+  <input type="hidden" name="__EVENTARGUMENT" value="">
+  <input type="hidden" name="__VIEWSTATE" value="mock-viewstate">
+  {content}
+</form>"""
+
+    def view(self, request):
+        reservation_id = request.query.get("id", "")
+        t2_data = self.reservations.get(reservation_id)
+        if t2_data is None:
+            return request.send_html(self.page("Reservation", "<p class='T2Error'>Reservation not found.</p>"), status=404)
+
+        rows = []
+        for label, value in t2_data.items():
+            if label == "R#":
+                value_html = self._value(value, "MySettings_custom_Reservation_REQ_NUMBER_T2Label_Label")
+            elif label == "Reservation Status":
+                value_html = self._value(value, "MySettings_Reservation_ReservationStatus_T2Label_Label")
+            elif label == "Requisition or Third Party":
+                value_html = (
+                    f"<a id='MySettings_ResponsibleThirdPartyLink_T2FormLinkButton' "
+                    f"href=\"javascript:__doPostBack('{REQUISITION_TARGET}','')\">{escape(value)}</a>"
+                )
+            else:
+                value_html = self._value(value)
+            rows.append(self._row(label, value_html, required=label == "Requested Lot"))
+
+        if t2_data.get("Reservation Status", "").lower() == "denied":
+            deny = "<div class='PageSideBarItemDisabled'><span>Deny Reservation</span></div>"
+        else:
+            deny = (
+                f"<div class='PageSideBarItemEnabled'><a href='{self.prefix}/reservation/modify.aspx"
+                f"?id={quote(reservation_id)}&amp;modifyType=Deny'>Deny Reservation</a></div>"
+            )
+        action = f"{self.prefix}/reservation/view.aspx?id={quote(reservation_id)}"
+        body = self._form(action, f"""
+<div class="PageSideBar">{deny}</div>
+<h1>Reservation {escape(reservation_id)}</h1>
+<table class="T2Form">{''.join(rows)}</table>""")
+        request.send_html(self.page(f"Reservation {reservation_id}", body, POSTBACK_SCRIPT))
+
+    def requisition(self, request):
+        t2_data = self.reservations.get(request.query.get("id", ""), {})
+        requisition = self.requisitions.get(t2_data.get("R#", ""))
+        if requisition is None:
+            return request.send_html(self.page("Third Party", "<p class='T2Error'>Third party not found.</p>"), status=404)
+        rows = [
+            self._row("Name", self._value(requisition["name"])),
+            self._row("Requisition Number", self._value(t2_data.get("R#"))),
+            self._row("GL Account", self._value(requisition["gl_account"], "ctl00_pageContent_MySettings_custom_ThirdParty_ACCT_NUMBER_T2Label_Label")),
+            self._row("Expiration Date", self._value(requisition["exp_date"], "ctl00_pageContent_MySettings_custom_ThirdParty_REQ_EXP_DATE_T2Label_Label"))
+        ]
+        request.send_html(self.page("Third Party", f"<h1>Third Party</h1><table class='T2Form'>{''.join(rows)}</table>"))
+
+    def deny_page(self, request):
+        reservation_id = request.query.get("id", "")
+        if reservation_id not in self.reservations:
+            return request.send_html(self.page("Deny", "<p class='T2Error'>Reservation not found.</p>"), status=404)
+        action = f"{self.prefix}/reservation/modify.aspx?id={quote(reservation_id)}&modifyType=Deny"
+        body = self._form(action.replace("&", "&amp;"), """
+<h1>Deny Reservation</h1>
+<label for="insertEditNoteControl1_WizardStep1_S1NoteType_T2DropDownList_DropDownList">Note Type</label>
+<select id="insertEditNoteControl1_WizardStep1_S1NoteType_T2DropDownList_DropDownList" name="insertEditNoteControl1$WizardStep1$S1NoteType$T2DropDownList$DropDownList">
+  <option value="">(Select)</option>
+  <option value="2001">General</option>
+  <option value="2005">Reservation Denied</option>
+</select>
+<label for="insertEditNoteControl1_WizardStep1_S1NoteText_T2FormTextBox_TextBox">Note</label>
+<textarea id="insertEditNoteControl1_WizardStep1_S1NoteText_T2FormTextBox_TextBox" name="insertEditNoteControl1$WizardStep1$S1NoteText$T2FormTextBox$TextBox"></textarea>
+<input type="submit" id="insertEditNoteControl1_SaveButton" name="insertEditNoteControl1$SaveButton" value="Save">""")
+        request.send_html(self.page("Deny Reservation", body))
+
+    def save_note(self, request):
+        reservation_id = request.query.get("id", "")
+        t2_data = self.reservations.get(reservation_id)
+        if t2_data is None:
+            return request.send_text("Not Found", status=404)
+        note_type = request.form.get("insertEditNoteControl1$WizardStep1$S1NoteType$T2DropDownList$DropDownList", "")
+        note = request.form.get("insertEditNoteControl1$WizardStep1$S1NoteText$T2FormTextBox$TextBox", "")
+        with self.lock:
+            self.notes.setdefault(reservation_id, []).append({"type": note_type, "text": note})
+            if note_type == "2005":
+                t2_data["Reservation Status"] = "Denied"
+        logger.info(f"Reservation {reservation_id} note saved (type {note_type})")
+        request.redirect(f"{self.prefix}/reservation/view.aspx?id={quote(reservation_id)}&addtoqueue=1")
+
+    def third_party_search(self, request):
+        term = (request.query.get("q") or request.form.get("ThirdPartyNameText$T2FormTextBox$TextBox") or "").strip()
+        results = ""
+        if term:
+            rows = [
+                f"<tr><td>{escape(r_number)}</td><td>{escape(requisition['name'])}</td><td>{escape(requisition['gl_account'])}</td><td>{escape(requisition['exp_date'])}</td></tr>"
+                for r_number, requisition in self.requisitions.items()
+                if term.lower() in r_number.lower()
+            ]
+            results = f"<table id='SearchResults'><tr><th>Name</th><th>Department</th><th>GL Account</th><th>Expires</th></tr>{''.join(rows)}</table>"
+        body = f"""
+<form method="post" action="{self.prefix}/thirdparty/search.aspx">
+  <label for="ThirdPartyNameText_T2FormTextBox_TextBox">Third Party Name</label>
+  <input type="text" id="ThirdPartyNameText_T2FormTextBox_TextBox" name="ThirdPartyNameText$T2FormTextBox$TextBox" value="{escape(term)}">
+  <input type="submit" id="SearchButton" name="SearchButton" value="Search">
+</form>
+{results}"""
+        request.send_html(self.page("Third Party Search", body))
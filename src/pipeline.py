@@ -0,0 +1,162 @@
+from reservation import extract_reservation, convert_reservation
+from browser import OperatorInputRequired
+from services.tracer import span
+import queue
+import threading
+import time
+import logging
+
+logger = logging.getLogger('Pipeline')
+
+def new_result(reservation_id):
+    return {
+        "reservation_id": reservation_id,
+        "status": "failed",
+        "billing_code": None,
+        "steps": {},
+        "error": None,
+        "duration": 0.0
+    }
+
+def _prefetch(t2_browser, reservation_ids, jobs, stop_event):
+    for reservation_id in reservation_ids:
+        if stop_event.is_set():
+            break
+        started = time.time()
+        item = {"reservation_id": reservation_id, "t2_data": None, "billing_code": None, "error": None}
+        if t2_browser.command_profiler:
+            t2_browser.command_profiler.begin(f"{reservation_id}_t2")
+        try:
+            with span("reservation.prefetch", reservation_id=reservation_id):
+                t2_data, billing_code = extract_reservation(t2_browser, reservation_id)
+            # The T2 browser reuses its t2_data dict, so hand the consumer a copy
+            item["t2_data"] = dict(t2_data) if t2_data else None
+            item["billing_code"] = billing_code
+        except OperatorInputRequired as e:
+            # Prompts must come from the main thread, when the operator reaches this reservation
+            logger.info(f"Reservation {reservation_id} needs operator input for R# {e.r_number}")
+            item["t2_data"] = dict(t2_browser.t2_data) if t2_browser.t2_data else None
+            item["needs_operator"] = e.r_number
+        except SystemExit:
+            logger.error(f"T2 browser closed while prefetching {reservation_id}, stopping prefetch")
+            item["error"] = "Browser closed during billing code retrieval"
+            item["aborted"] = True
+        except Exception as e:
+            logger.exception(f"Error prefetching reservation {reservation_id}: {str(e)}")
+            item["error"] = str(e)
+        item["extract_duration"] = round(time.time() - started, 2)
+        if t2_browser.command_profiler:
+            t2_browser.command_profiler.finish()
+        logger.info(f"Prefetched reservation {reservation_id} in {item['extract_duration']}s")
+        jobs.put(item)
+        if item.get("aborted"):
+            break
+    jobs.put(None)
+
+def resolve_with_operator(offstreet_browser, r_number):
+    """Runs the third party search prompt on the main thread; None if the operator gave up.
+
+    The T2 browser is busy prefetching, so the search runs in the Offstreet
+    browser, which is logged in to T2 for the denial step.
+    """
+    try:
+        return offstreet_browser.handle_isd_search_failure(r_number)
+    except SystemExit:
+        logger.error(f"No GL account given for R# {r_number}, Offstreet browser closed")
+        return None
+
+def run_pipeline(t2_browser, offstreet_browser, reservation_ids, prefetch_depth=2):
+    logger.info(f"Starting pipelined batch of {len(reservation_ids)} reservations (prefetch depth {prefetch_depth})")
+    jobs = queue.Queue(maxsize=prefetch_depth)
+    stop_event = threading.Event()
+    producer = threading.Thread(
+        target=_prefetch,
+        args=(t2_browser, reservation_ids, jobs, stop_event),
+        name="T2Prefetch",
+        daemon=True
+    )
+    t2_browser.defer_operator_input = True
+    batch_started = time.time()
+    producer.start()
+
+    results = []
+    try:
+        while True:
+            wait_started = time.time()
+            item = jobs.get()
+            if item is None:
+                break
+            queue_wait = round(time.time() - wait_started, 2)
+
+            reservation_id = item["reservation_id"]
+            result = new_result(reservation_id)
+            result["billing_code"] = item["billing_code"]
+            result["extract_duration"] = item["extract_duration"]
+            result["queue_wait"] = queue_wait
+
+            started = time.time()
+            if item.get("needs_operator"):
+                item["billing_code"] = resolve_with_operator(offstreet_browser, item["needs_operator"])
+                if item["billing_code"] is None:
+                    item["aborted"] = True
+                    item["error"] = "Browser closed during billing code retrieval"
+                result["billing_code"] = item["billing_code"]
+
+            if item.get("aborted"):
+                result["status"] = "aborted"
+                result["error"] = item["error"]
+            elif item["error"]:
+                result["status"] = "error"
+                result["error"] = item["error"]
+            elif item["t2_data"] and item["billing_code"]:
+                logger.info(f"Converting reservation {reservation_id} with billing code: {item['billing_code']}")
+                if offstreet_browser.command_profiler:
+                    offstreet_browser.command_profiler.begin(f"{reservation_id}_offstreet")
+                try:
+                    with span("reservation.convert", reservation_id=reservation_id):
+                        result["steps"] = convert_reservation(offstreet_browser, item["t2_data"], item["billing_code"])
+                    result["status"] = "success" if all(result["steps"].values()) else "partial"
+                except Exception as e:
+                    logger.exception(f"Error converting reservation {reservation_id}: {str(e)}")
+                    result["status"] = "error"
+                    result["error"] = str(e)
+            else:
+                result["error"] = "T2 data extraction failed" if not item["t2_data"] else "Billing code retrieval failed"
+                logger.error(f"Failed to extract data for reservation {reservation_id}: {result['error']}")
+
+            result["convert_duration"] = round(time.time() - started, 2)
+            if offstreet_browser.command_profiler:
+                offstreet_browser.command_profiler.finish()
+            # Wall time attributable to this reservation: extraction overlapped
+            # with the previous conversion, so only the time spent waiting counts
+            result["duration"] = round(queue_wait + result["convert_duration"], 2)
+            results.append(result)
+            logger.info(
+                f"Reservation {reservation_id} finished with status '{result['status']}' - "
+                f"extract {result['extract_duration']}s, convert {result['convert_duration']}s, wall {result['duration']}s"
+            )
+            if item.get("needs_operator") and item.get("aborted"):
+                # handle_isd_search_failure quit the Offstreet browser
+                break
+    finally:
+        stop_event.set()
+        # Unblock the producer if it is waiting on a full queue
+        while producer.is_alive():
+            try:
+                jobs.get(timeout=0.5)
+            except queue.Empty:
+                pass
+        t2_browser.defer_operator_input = False
+
+    processed_ids = {result["reservation_id"] for result in results}
+    for reservation_id in reservation_ids:
+        if reservation_id not in processed_ids:
+            result = new_result(reservation_id)
+            result["status"] = "skipped"
+            result["error"] = "Batch aborted"
+            results.append(result)
+
+    elapsed = time.time() - batch_started
+    serial_estimate = sum(r.get("extract_duration", 0) + r.get("convert_duration", 0) for r in results)
+    logger.info(f"Pipelined batch finished in {elapsed:.1f}s (serial estimate {serial_estimate:.1f}s)")
+    return results
@@ -0,0 +1,239 @@
+from services.secondPageService import SecondPageService
+from services.firstPageService import FirstPageService
+from services.thirdPageService import ThirdPageService
+from services.fourthPageService import EventSettingsService
+from services.fifthPageService import PortalSettingsService
+from services.emailTemplateService import EmailTemplateService
+from services.tracer import span
+import config
+import time
+import logging
+
+logger = logging.getLogger('Reservation')
+
+PAGE_LOADED_SCRIPT = "return document.readyState === 'complete' && location.href !== 'about:blank';"
+
+def login_t2(browser, creds):
+    logger.info("Initiating T2 login")
+    if browser.restore_session("t2", config.T2_BASE_URL, creds["t2_username"]):
+        logger.info("Reusing saved T2 session")
+        return True
+    browser.navigate(config.T2_BASE_URL)
+    if not browser.login(creds["t2_username"], creds["t2_password"]):
+        logger.error("T2 login failed")
+        return False
+    browser.save_session("t2", config.T2_BASE_URL, creds["t2_username"])
+    logger.info("T2 login successful")
+    return True
+
+def login_offstreet(browser, creds):
+    logger.info("Initiating Offstreet login")
+    if browser.restore_session("offstreet", config.OFFSTREET_BASE_URL, creds["offstreet_email"]):
+        browser.use_offstreet_account(creds["offstreet_email"])
+        logger.info("Reusing saved Offstreet session")
+        return True
+    browser.navigate(config.OFFSTREET_BASE_URL)
+    return submit_offstreet_login(browser, creds)
+
+def submit_offstreet_login(browser, creds):
+    if not browser.login_to_offstreet(creds["offstreet_email"], creds["offstreet_password"]):
+        logger.error("Offstreet login failed")
+        return False
+    browser.save_session("offstreet", config.OFFSTREET_BASE_URL, creds["offstreet_email"])
+    logger.info("Offstreet login successful")
+    return True
+
+def login_browser(browser, creds):
+    if config.PARALLEL_LOGIN:
+        return login_in_parallel_tabs(browser, creds)
+    return login_t2(browser, creds) and login_offstreet(browser, creds)
+
+def login_in_parallel_tabs(browser, creds):
+    """Logs in to T2 in the current tab while the Offstreet page loads in a second tab.
+
+    A WebDriver session drives one tab at a time, so the page loads overlap
+    rather than the form input. The Offstreet tab is closed once its login is
+    done; the session cookies are shared with the remaining tab.
+    """
+    email = creds["offstreet_email"]
+    t2_tab = browser.driver.current_window_handle
+    try:
+        offstreet_tab = browser.open_tab()
+        probe_url = browser.prepare_session("offstreet", config.OFFSTREET_BASE_URL, email)
+        browser.start_loading(probe_url or config.OFFSTREET_BASE_URL)
+        browser.driver.switch_to.window(t2_tab)
+    except Exception as e:
+        logger.warning(f"Could not load Offstreet in a second tab, logging in one site at a time: {str(e)}")
+        browser.driver.switch_to.window(t2_tab)
+        return login_t2(browser, creds) and login_offstreet(browser, creds)
+
+    logged_in = login_t2(browser, creds)
+    if logged_in:
+        logger.info("Initiating Offstreet login in the preloaded tab")
+        browser.driver.switch_to.window(offstreet_tab)
+        browser.waits.script(PAGE_LOADED_SCRIPT, "preloaded Offstreet tab", timeout=browser.waits.profile["timeout"], soft=True)
+        if probe_url and browser.verify_session("offstreet", config.OFFSTREET_BASE_URL, email):
+            browser.use_offstreet_account(email)
+            logger.info("Reusing saved Offstreet session")
+        else:
+            if probe_url:
+                # The rejected probe may have left the tab anywhere
+                browser.navigate(config.OFFSTREET_BASE_URL)
+            logged_in = submit_offstreet_login(browser, creds)
+    browser.close_tab(offstreet_tab, t2_tab)
+    return logged_in
+
+def extract_reservation(browser, reservation_id):
+    # Fields from the previous reservation must not leak into this one
+    browser.reset_reservation_state()
+    url = f"{config.T2_BASE_URL}/reservation/view.aspx?id={reservation_id}&addtoqueue=1"
+
+    if config.T2_FETCH_MODE == "http":
+        logger.info("Starting T2 data extraction over HTTP")
+        t2_data = browser.fetch_t2_data_http(reservation_id)
+        logger.info(f"T2 HTTP extraction complete: {'Success' if t2_data else 'Failed'}")
+        if t2_data:
+            billing_code = browser.get_billing_code_http()
+            if billing_code:
+                return t2_data, billing_code
+            # Expired or missing requisitions need the interactive browser flow
+            logger.info("HTTP billing code retrieval failed, falling back to browser")
+            with span("t2.navigate"):
+                browser.navigate(url)
+            billing_code = browser.get_billing_code()
+            logger.info(f"Billing code retrieval complete: {'Success' if billing_code else 'Failed'}")
+            return t2_data, billing_code
+        logger.info("Falling back to browser extraction")
+
+    logger.info(f"About to navigate to T2 URL: {url}")
+    with span("t2.navigate"):
+        browser.navigate(url)
+    logger.info("Navigation to T2 reservation page complete")
+
+    logger.info("Starting T2 data extraction")
+    t2_data = browser.extract_t2_data()
+    logger.info(f"T2 data extraction complete: {'Success' if t2_data else 'Failed'}")
+
+    logger.info("Starting billing code retrieval")
+    billing_code = browser.get_billing_code()
+    logger.info(f"Billing code retrieval complete: {'Success' if billing_code else 'Failed'}")
+    return t2_data, billing_code
+
+def convert_reservation(browser, t2_data, billing_code):
+    steps = {}
+
+    logger.info("About to navigate to Offstreet events create page")
+    with span("offstreet.navigate"):
+        browser.navigate(f"{config.OFFSTREET_BASE_URL}/events/create")
+    logger.info("Navigation to Offstreet events create page complete")
+
+    logger.info("Starting first page form fill process")
+    with span("offstreet.first_page"):
+        first_page_service = FirstPageService(browser.driver, t2_data, billing_code)
+        steps["first_page"] = bool(first_page_service.fill_first_page())
+    logger.info(f"First page form result: {'Success' if steps['first_page'] else 'Failed'}")
+
+    logger.info("Starting second page processing")
+    try:
+        with span("offstreet.second_page"):
+            second_page_service = SecondPageService(browser.driver)
+            steps["second_page"] = bool(second_page_service.process_second_page(t2_data))
+        logger.info(f"Second page processing result: {'Success' if steps['second_page'] else 'Failed'}")
+    except Exception as e:
+        steps["second_page"] = False
+        logger.error(f"Error in second page processing: {str(e)}")
+
+    logger.info("Starting third page processing")
+    try:
+        with span("offstreet.third_page"):
+            third_page_service = ThirdPageService(browser.driver, browser.location_catalog)
+            steps["third_page"] = bool(third_page_service.process_third_page(t2_data))
+        logger.info(f"Third page processing result: {'Success' if steps['third_page'] else 'Failed'}")
+    except Exception as e:
+        steps["third_page"] = False
+        logger.error(f"Error in third page processing: {str(e)}")
+
+    logger.info("Configuring event settings")
+    try:
+        with span("offstreet.event_settings"):
+            settings_service = EventSettingsService(browser.driver, t2_data)
+            steps["event_settings"] = bool(settings_service.configure_all_settings())
+        logger.info("Event settings configuration complete")
+    except Exception as e:
+        steps["event_settings"] = False
+        logger.error(f"Error in event settings configuration: {str(e)}")
+
+    logger.info("Configuring portal settings")
+    try:
+        with span("offstreet.portal_settings"):
+            formatted_data = {"t2_data": t2_data}
+            portal_settings = PortalSettingsService(browser.driver, formatted_data, browser.asset_cache, browser.offstreet_account)
+            portal_settings.configure_all_portal_settings()
+        steps["portal_settings"] = True
+        logger.info("Portal settings configuration complete")
+    except Exception as e:
+        steps["portal_settings"] = False
+        logger.error(f"Error in portal settings configuration: {str(e)}")
+
+    logger.info("Processing email templates")
+    try:
+        email_service = EmailTemplateService(browser.driver)
+        with span("email"):
+            email_service.open_email_in_new_tab({"t2_data": t2_data})
+        with span("denial"):
+            email_service.handle_denial_process({"t2_data": t2_data})
+        steps["email"] = True
+        logger.info("Email template processing complete")
+    except Exception as e:
+        steps["email"] = False
+        logger.error(f"Error in email template processing: {str(e)}")
+
+    logger.info("Completed processing reservation")
+    return steps
+
+def process_reservation(browser, reservation_id):
+    logger.info(f"Processing reservation ID: {reservation_id}")
+    started = time.time()
+    if browser.command_profiler:
+        browser.command_profiler.begin(reservation_id)
+    result = {
+        "reservation_id": reservation_id,
+        "status": "failed",
+        "billing_code": None,
+        "steps": {},
+        "error": None,
+        "duration": 0.0
+    }
+
+    try:
+        with span("reservation", reservation_id=reservation_id) as root:
+            t2_data, billing_code = extract_reservation(browser, reservation_id)
+            result["billing_code"] = billing_code
+
+            if t2_data and billing_code:
+                logger.info(f"Successfully extracted T2 data with billing code: {billing_code}")
+                logger.info("Saving data to file")
+                browser.save_data_to_file()
+                print(f"Billing Code: {billing_code}")
+
+                result["steps"] = convert_reservation(browser, t2_data, billing_code)
+                result["status"] = "success" if all(result["steps"].values()) else "partial"
+            else:
+                logger.error(f"Failed to extract data for reservation {reservation_id}")
+                if not t2_data:
+                    logger.error("T2 data extraction failed")
+                    result["error"] = "T2 data extraction failed"
+                if not billing_code:
+                    logger.error("Billing code retrieval failed")
+                    result["error"] = "Billing code retrieval failed"
+            if root:
+                root["attrs"]["status"] = result["status"]
+    except Exception as e:
+        logger.exception(f"Error processing reservation {reservation_id}: {str(e)}")
+        result["status"] = "error"
+        result["error"] = str(e)
+
+    result["duration"] = round(time.time() - started, 2)
+    if browser.command_profiler:
+        browser.command_profiler.finish()
+    return result
@@ -0,0 +1,47 @@
+import json
+import os
+import time
+import logging
+
+logger = logging.getLogger('AssetCache')
+
+class AssetCache:
+    """Offstreet file IDs of reusable uploads such as transport.png, keyed by Offstreet account."""
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self.accounts = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load asset cache, starting empty: {str(e)}")
+            return {}
+
+    def _save(self):
+        try:
+            tmp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(self.accounts, f, indent=2)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            logger.error(f"Failed to save asset cache: {str(e)}")
+
+    def get(self, account, name):
+        entry = self.accounts.get(account, {}).get(name)
+        if entry:
+            logger.info(f"Asset cache hit for {name}: file ID {entry['id']}")
+            return entry["id"]
+        logger.info(f"Asset cache miss for {name}")
+        return None
+
+    def put(self, account, name, file_id):
+        if self.accounts.get(account, {}).get(name, {}).get("id") == file_id:
+            return
+        self.accounts.setdefault(account, {})[name] = {"id": file_id, "cached_at": time.time()}
+        self._save()
+        logger.info(f"Cached file ID {file_id} for {name}")
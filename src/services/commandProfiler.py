@@ -0,0 +1,117 @@
+import json
+import os
+import sys
+import threading
+import time
+import logging
+
+logger = logging.getLogger('CommandProfiler')
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKIPPED_FILES = {
+    os.path.abspath(__file__),
+    os.path.join(SRC_DIR, "services", "tracer.py")
+}
+
+class CommandProfiler:
+    """Times every WebDriver command by wrapping the driver's command executor."""
+
+    def __init__(self, driver, output_dir):
+        self.output_dir = output_dir
+        self.records = []
+        self.label = None
+        self._lock = threading.Lock()
+
+        executor = driver.command_executor
+        original_execute = executor.execute
+
+        def execute(command, params):
+            started = time.perf_counter()
+            try:
+                return original_execute(command, params)
+            finally:
+                self._record(command, time.perf_counter() - started)
+
+        executor.execute = execute
+        logger.info(f"Profiling WebDriver commands into {output_dir}")
+
+    def _caller_stack(self):
+        frames = []
+        frame = sys._getframe(1)
+        while frame is not None:
+            filename = os.path.abspath(frame.f_code.co_filename)
+            if filename.startswith(SRC_DIR) and filename not in SKIPPED_FILES:
+                owner = frame.f_locals.get("self")
+                name = frame.f_code.co_name
+                frames.append(f"{type(owner).__name__}.{name}" if owner is not None else name)
+            frame = frame.f_back
+        frames.reverse()
+        return frames
+
+    def _record(self, command, duration):
+        stack = self._caller_stack()
+        with self._lock:
+            self.records.append((command, duration, stack))
+
+    def begin(self, label):
+        with self._lock:
+            self.label = str(label)
+            self.records = []
+
+    def histogram(self, records):
+        by_command = {}
+        by_caller = {}
+        for command, duration, stack in records:
+            caller = stack[-1] if stack else "<unknown>"
+            for table, key in ((by_command, command), (by_caller, caller)):
+                entry = table.setdefault(key, {"count": 0, "total": 0.0, "max": 0.0})
+                entry["count"] += 1
+                entry["total"] += duration
+                entry["max"] = max(entry["max"], duration)
+        return by_command, by_caller
+
+    def folded_stacks(self, records):
+        # Brendan Gregg's folded format, weighted by milliseconds spent
+        totals = {}
+        for command, duration, stack in records:
+            key = ";".join(stack + [command])
+            totals[key] = totals.get(key, 0.0) + duration * 1000
+        return [f"{key} {max(1, round(value))}" for key, value in sorted(totals.items())]
+
+    def finish(self):
+        with self._lock:
+            source = self.records
+            records = list(source)
+            label = self.label or "session"
+        if not records:
+            return None
+
+        by_command, by_caller = self.histogram(records)
+        total = sum(duration for _, duration, _ in records)
+        logger.info(f"{label}: {len(records)} WebDriver commands, {total:.2f}s in round trips")
+        for caller, entry in sorted(by_caller.items(), key=lambda item: item[1]["total"], reverse=True)[:10]:
+            logger.info(f"  {caller:55} {entry['count']:>5} commands {entry['total']:>7.2f}s")
+
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            base = os.path.join(self.output_dir, f"commands_{label}")
+            with open(f"{base}.json", "w") as f:
+                json.dump({
+                    "label": label,
+                    "commands": len(records),
+                    "total_seconds": round(total, 4),
+                    "by_command": by_command,
+                    "by_caller": by_caller
+                }, f, indent=2)
+            with open(f"{base}.folded", "w") as f:
+                f.write("\n".join(self.folded_stacks(records)) + "\n")
+            logger.info(f"Command profile written to {base}.json and {base}.folded")
+        except Exception as e:
+            logger.error(f"Failed to write command profile: {str(e)}")
+
+        with self._lock:
+            # Commands recorded while the profile was written belong to the next
+            # one; begin() may already have started a fresh list
+            if self.records is source:
+                del self.records[:len(records)]
+        return by_command, by_caller
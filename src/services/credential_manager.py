@@ -4,11 +4,14 @@ import os
 from cryptography.fernet import Fernet
 from base64 import b64encode
 import hashlib
+import config
 
 class CredentialManager:
     def __init__(self):
-        self.cred_file = os.path.join(os.getenv('APPDATA'), '.parking_creds')
-        self.key_file = os.path.join(os.getenv('APPDATA'), '.parking_key')
+        app_data = os.getenv('APPDATA') or os.path.expanduser('~')
+        self.cred_file = os.path.join(app_data, '.parking_creds')
+        self.key_file = os.path.join(app_data, '.parking_key')
+        self.session_file = config.SESSION_FILE or os.path.join(app_data, '.parking_sessions')
         self._init_encryption_key()
         
     def _init_encryption_key(self):
@@ -50,4 +53,47 @@ class CredentialManager:
 
     def clear_credentials(self):
         if os.path.exists(self.cred_file):
-            os.remove(self.cred_file)
\ No newline at end of file
+            os.remove(self.cred_file)
+
+    def _load_sessions(self):
+        if not os.path.exists(self.session_file):
+            return {}
+        try:
+            with open(self.session_file, 'rb') as f:
+                return json.loads(self.cipher.decrypt(f.read()))
+        except:
+            return {}
+
+    def _save_sessions(self, sessions):
+        encrypted_data = self.cipher.encrypt(json.dumps(sessions).encode())
+        tmp_file = f"{self.session_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(encrypted_data)
+        os.replace(tmp_file, self.session_file)
+
+    def save_session(self, site, account, session):
+        sessions = self._load_sessions()
+        sessions[site] = {
+            'account': account,
+            'session': session,
+            'timestamp': time.time()
+        }
+        self._save_sessions(sessions)
+
+    def load_session(self, site, account, max_age_hours):
+        entry = self._load_sessions().get(site)
+        if not entry or entry['account'] != account:
+            return None
+        if time.time() - entry['timestamp'] > max_age_hours * 3600:
+            self.forget_session(site)
+            return None
+        return entry['session']
+
+    def forget_session(self, site):
+        sessions = self._load_sessions()
+        if sessions.pop(site, None) is not None:
+            self._save_sessions(sessions)
+
+    def clear_sessions(self):
+        if os.path.exists(self.session_file):
+            os.remove(self.session_file)
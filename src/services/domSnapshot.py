@@ -0,0 +1,92 @@
+import logging
+
+logger = logging.getLogger('DomSnapshot')
+
+# Every row's cell texts, requested attributes and checkbox state in one round trip
+TABLE_SNAPSHOT_SCRIPT = """
+const [rowSelector, cellSelector, attributes] = arguments;
+return Array.from(document.querySelectorAll(rowSelector)).map((row, index) => {
+    const checkbox = row.querySelector('[role="checkbox"]');
+    const attrs = {};
+    attributes.forEach(name => { attrs[name] = row.getAttribute(name); });
+    return {
+        index: index,
+        cells: Array.from(row.querySelectorAll(cellSelector)).map(cell => cell.innerText.trim()),
+        attributes: attrs,
+        checked: checkbox ? checkbox.getAttribute('aria-checked') === 'true' : null
+    };
+});
+"""
+
+OPTIONS_SNAPSHOT_SCRIPT = """
+const [select, attributes] = arguments;
+const root = typeof select === 'string' ? document.querySelector(select) : select;
+if (!root) { return []; }
+return Array.from(root.querySelectorAll('option')).map((option, index) => {
+    const attrs = {};
+    attributes.forEach(name => { attrs[name] = option.getAttribute(name); });
+    return {index: index, value: option.value, text: option.text.trim(), attributes: attrs};
+});
+"""
+
+# Element inside row k, or null when the row is gone or no longer shows the expected text
+ROW_TARGET_SCRIPT = """
+const [rowSelector, index, targetSelector, cellSelector, expected] = arguments;
+const row = document.querySelectorAll(rowSelector)[index];
+if (!row) { return null; }
+if (expected !== null && !Array.from(row.querySelectorAll(cellSelector)).some(cell => cell.innerText.trim() === expected)) {
+    return null;
+}
+return targetSelector ? row.querySelector(targetSelector) : row;
+"""
+
+OPTION_TARGET_SCRIPT = """
+const [select, index] = arguments;
+const root = typeof select === 'string' ? document.querySelector(select) : select;
+return root ? root.querySelectorAll('option')[index] || null : null;
+"""
+
+ROW_CHECKBOX = "td:first-child span[role='checkbox']"
+
+class DomSnapshot:
+    """Reads whole tables and dropdowns in one execute_script instead of one WebDriver call per row."""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def table_rows(self, row_selector="tbody tr", attributes=(), cell_selector="td"):
+        """[{"index", "cells", "attributes", "checked"}] for every row matching row_selector."""
+        rows = self.driver.execute_script(TABLE_SNAPSHOT_SCRIPT, row_selector, cell_selector, list(attributes))
+        logger.debug(f"Snapshot of {len(rows)} rows for {row_selector}")
+        return rows
+
+    def options(self, select, attributes=()):
+        """[{"index", "value", "text", "attributes"}] for a select given as a CSS selector or element."""
+        options = self.driver.execute_script(OPTIONS_SNAPSHOT_SCRIPT, select, list(attributes))
+        logger.debug(f"Snapshot of {len(options)} options")
+        return options
+
+    def row_target(self, index, row_selector="tbody tr", target_selector=ROW_CHECKBOX, expected_text=None, cell_selector="td"):
+        return self.driver.execute_script(ROW_TARGET_SCRIPT, row_selector, index, target_selector, cell_selector, expected_text)
+
+    def click_row(self, index, row_selector="tbody tr", target_selector=ROW_CHECKBOX, expected_text=None, cell_selector="td"):
+        """Clicks the target (the row checkbox by default) of row index.
+
+        With expected_text the click only happens if one of the row's cells
+        still shows that text, so a table re-rendered since the snapshot
+        cannot tick the wrong row. Returns False when nothing was clicked.
+        """
+        target = self.row_target(index, row_selector, target_selector, expected_text, cell_selector)
+        if not target:
+            logger.warning(f"Row {index} of {row_selector} is no longer present{f' as {expected_text}' if expected_text else ''}")
+            return False
+        target.click()
+        return True
+
+    def select_option(self, select, index):
+        option = self.driver.execute_script(OPTION_TARGET_SCRIPT, select, index)
+        if not option:
+            logger.warning(f"Option {index} is no longer present")
+            return False
+        option.click()
+        return True
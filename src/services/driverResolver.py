@@ -0,0 +1,153 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import logging
+
+logger = logging.getLogger('DriverResolver')
+
+VERSION_PATTERN = re.compile(r"\d+\.\d+\.\d+\.\d+")
+
+CHROME_COMMANDS = {
+    "darwin": ("/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",),
+    "linux": ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser")
+}
+
+WINDOWS_CHROME_DIRS = (
+    os.path.join(os.getenv("PROGRAMFILES", r"C:\Program Files"), "Google", "Chrome", "Application"),
+    os.path.join(os.getenv("PROGRAMFILES(X86)", r"C:\Program Files (x86)"), "Google", "Chrome", "Application"),
+    os.path.join(os.getenv("LOCALAPPDATA", ""), "Google", "Chrome", "Application")
+)
+
+def _major(version):
+    return version.split(".")[0]
+
+def _windows_chrome_version():
+    import winreg
+
+    # Chrome writes its version here on every update; reading it is instant,
+    # unlike the PowerShell query webdriver_manager runs
+    for root in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+        try:
+            with winreg.OpenKey(root, r"Software\Google\Chrome\BLBeacon") as key:
+                return winreg.QueryValueEx(key, "version")[0]
+        except OSError:
+            continue
+    # The installer keeps one directory per version next to chrome.exe
+    for directory in WINDOWS_CHROME_DIRS:
+        if os.path.isdir(directory):
+            versions = [name for name in os.listdir(directory) if VERSION_PATTERN.fullmatch(name)]
+            if versions:
+                return max(versions, key=lambda v: [int(part) for part in v.split(".")])
+    return None
+
+def _command_chrome_version():
+    for command in CHROME_COMMANDS.get(sys.platform, CHROME_COMMANDS["linux"]):
+        try:
+            output = subprocess.run([command, "--version"], capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = VERSION_PATTERN.search(output)
+        if match:
+            return match.group(0)
+    return None
+
+def chrome_version():
+    """Installed Chrome version, read locally without any network access; None if Chrome is not found."""
+    try:
+        if sys.platform == "win32":
+            return _windows_chrome_version()
+        return _command_chrome_version()
+    except Exception as e:
+        logger.error(f"Failed to read the installed Chrome version: {str(e)}")
+        return None
+
+class DriverResolver:
+    """Pins the chromedriver path per installed Chrome version so launches skip ChromeDriverManager.
+
+    ChromeDriverManager().install() detects the Chrome version and looks up
+    driver metadata online on every call. The manifest maps a Chrome version
+    to the driver it resolved; a new Chrome version is the only thing that
+    sends resolution back to ChromeDriverManager. Offline, the newest pinned
+    driver of the same major version is used.
+    """
+
+    def __init__(self, manifest_file):
+        self.manifest_file = manifest_file
+        self.entries = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.manifest_file):
+            return {}
+        try:
+            with open(self.manifest_file, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load chromedriver manifest, starting empty: {str(e)}")
+            return {}
+
+    def _save(self):
+        try:
+            tmp_file = f"{self.manifest_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_file, self.manifest_file)
+        except Exception as e:
+            logger.error(f"Failed to save chromedriver manifest: {str(e)}")
+
+    def _pinned(self, version):
+        entry = self.entries.get(version)
+        if entry and os.path.isfile(entry["path"]):
+            return entry["path"]
+        if entry:
+            logger.info(f"Pinned chromedriver for Chrome {version} is gone, resolving again")
+            del self.entries[version]
+            self._save()
+        return None
+
+    def _fallback(self, version):
+        """Newest existing driver for the same Chrome major version (any version when Chrome's is unknown).
+
+        chromedriver refuses to drive a Chrome of another major version, so
+        those drivers are never used; None if nothing suitable is pinned.
+        """
+        candidates = [
+            (key, entry) for key, entry in self.entries.items()
+            if os.path.isfile(entry["path"]) and (version is None or _major(key) == _major(version))
+        ]
+        if not candidates:
+            return None
+        key, entry = max(candidates, key=lambda item: item[1]["resolved_at"])
+        logger.warning(f"Using the chromedriver pinned for Chrome {key}")
+        return entry["path"]
+
+    def _install(self):
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        return ChromeDriverManager().install()
+
+    def resolve(self):
+        """chromedriver path for the installed Chrome, or None to let Selenium find a driver itself."""
+        started = time.time()
+        version = chrome_version()
+        if version:
+            path = self._pinned(version)
+            if path:
+                logger.info(f"Using pinned chromedriver for Chrome {version} ({time.time() - started:.2f}s)")
+                return path
+        else:
+            logger.warning("Installed Chrome version unknown")
+
+        try:
+            path = self._install()
+        except Exception as e:
+            logger.error(f"ChromeDriverManager could not resolve a driver: {str(e)}")
+            return self._fallback(version)
+
+        if version:
+            self.entries[version] = {"path": path, "resolved_at": time.time()}
+            self._save()
+            logger.info(f"Pinned chromedriver {path} for Chrome {version} ({time.time() - started:.2f}s)")
+        return path
@@ -1,12 +1,17 @@
-import time
+import config
 import logging
 import tkinter as tk
 import tkinter.messagebox as mbox
+from urllib.parse import urlparse
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys  # ⬅ add at top of file
+from services.waitService import WaitService
+from services.tracer import traced
+from services.lotMatcher import canonical_lot_name
+from services.formFiller import FormFiller
 logger = logging.getLogger("EmailTemplate")
 
 
@@ -16,7 +21,7 @@ class EmailTemplateService:
     • Tries to deny the reservation in T2; if already denied, shows a popup.
     • Always jumps back to Offstreet, clicks the **Share** tab, then:
         1. Clicks **Load Template**
-        2. Waits 0.5 s
+        2. Waits for the template dialog
         3. Clicks **Event Template w/Code**
     """
 
@@ -25,6 +30,7 @@ class EmailTemplateService:
         logger.info("Initializing EmailTemplateService")
         self.driver = driver
         self.wait = WebDriverWait(driver, 10)
+        self.waits = WaitService(driver)
 
     # ─────────────────────────  UI helpers  ────────────────────────────
     def _info_popup(self, msg: str):
@@ -53,10 +59,11 @@ class EmailTemplateService:
             logger.error(f"Standalone Load Template click failed: {exc}")
 
         # ───────────────────────  Share-template sequence  ───────────────────────
+    @traced()
     def _apply_share_template(self):
         """
         1) Click the outer **Load Template** button in the Share form.
-        2) Wait a moment for the “Load Template” dialog to render.
+        2) Wait for the “Load Template” dialog to become visible.
         3) Inside that dialog, click **Event Template w/Code**.
         4) Click the dialog-footer **Load Template** button to confirm.
 
@@ -64,14 +71,12 @@ class EmailTemplateService:
         """
         try:
             # ---------- 1️⃣  OUTER “Load Template” (in Share form) ----------
-            outer_btn = self.wait.until(
-                EC.element_to_be_clickable(
-                    (
-                        By.XPATH,
-                        # must NOT be inside any dialog
-                        "//form//button[normalize-space()='Load Template' "
-                        "and not(ancestor::*[@role='dialog'])]"
-                    )
+            outer_btn = self.waits.clickable(
+                (
+                    By.XPATH,
+                    # must NOT be inside any dialog
+                    "//form//button[normalize-space()='Load Template' "
+                    "and not(ancestor::*[@role='dialog'])]"
                 )
             )
             self.driver.execute_script(
@@ -80,19 +85,14 @@ class EmailTemplateService:
             outer_btn.click()
             logger.info("Outer 'Load Template' clicked")
 
-            # ---------- give the modal time to appear ----------
-            time.sleep(0.5)
-
             # ---------- 2️⃣  “Event Template w/Code” inside the dialog ----------
             dlg_xpath   = "//div[@role='dialog' and .//h2[normalize-space()='Load Template']]"
             event_xpath = "//div[@role='dialog']//button[normalize-space()='Event Template w/Code']"
 
-            # make sure the dialog is present
-            self.wait.until(EC.presence_of_element_located((By.XPATH, dlg_xpath)))
+            # make sure the dialog is showing
+            self.waits.visible((By.XPATH, dlg_xpath), replaces=0.5)
 
-            event_btn = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, event_xpath))
-            )
+            event_btn = self.waits.clickable((By.XPATH, event_xpath))
             self.driver.execute_script(
                 "arguments[0].scrollIntoView({block:'center'});", event_btn
             )
@@ -100,13 +100,11 @@ class EmailTemplateService:
             logger.info("'Event Template w/Code' clicked")
 
             # ---------- 3️⃣  INNER “Load Template” (dialog footer) ----------
-            inner_btn = self.wait.until(
-                EC.element_to_be_clickable(
-                    (
-                        By.XPATH,
-                        # footer button inside the same dialog
-                        f"{dlg_xpath}//button[normalize-space()='Load Template']"
-                    )
+            inner_btn = self.waits.clickable(
+                (
+                    By.XPATH,
+                    # footer button inside the same dialog
+                    f"{dlg_xpath}//button[normalize-space()='Load Template']"
                 )
             )
             self.driver.execute_script(
@@ -117,12 +115,7 @@ class EmailTemplateService:
             logger.info("Inner 'Load Template' clicked")
 
             # NEW ↓ – wait until the dialog goes away
-            self.wait.until(
-                EC.invisibility_of_element_located(
-                    (By.XPATH,
-                    "//div[@role='dialog' and .//h2[normalize-space()='Load Template']]")
-                )
-            )
+            self.waits.gone((By.XPATH, dlg_xpath))
 
             self._fill_reply_to_email()
             
@@ -136,6 +129,7 @@ class EmailTemplateService:
 
 
 
+    @traced()
     def _fill_reply_to_email(self, address: str = "parkrsvp@usc.edu") -> bool:
         """Types the address, presses Enter, confirms pill appears."""
         try:
@@ -168,19 +162,18 @@ class EmailTemplateService:
     from selenium.webdriver.common.by import By
     import time, logging
 
+    @traced()
     def _clear_all_recipient_pills(self) -> None:
         """
         Remove every recipient pill in the combobox.
-        Checks 4× at 0.5-s intervals (max 2 s) and exits
+        Waits for the template request to settle and exits
         as soon as the pills are gone or never appear.
         """
         css = "div[role='combobox'] button svg[data-slot='icon']"
-        for _ in range(4):                       # 0 s, 0.5 s, 1 s, 1.5 s
-            icons = self.driver.find_elements(By.CSS_SELECTOR, css)
-            if icons:
-                break
-            time.sleep(0.5)
-        else:
+        # Template recipients arrive with the template XHR; once it settles
+        # the pills are either rendered or not coming
+        self.waits.network_idle("template load request", replaces=2)
+        if not self.driver.find_elements(By.CSS_SELECTOR, css):
             return                                # nothing ever appeared
 
         while True:
@@ -188,16 +181,16 @@ class EmailTemplateService:
             if not icons:
                 break
             for icon in icons:
-                self.driver.execute_script(
-                    "arguments[0].click();", icon.find_element(By.XPATH, "./..")
-                )
-                time.sleep(0.1)
+                pill = icon.find_element(By.XPATH, "./..")
+                self.driver.execute_script("arguments[0].click();", pill)
+                self.waits.stale(pill, "recipient pill removed", replaces=0.1, soft=True)
         logging.getLogger("EmailTemplate").info("All recipient pills cleared")
 
 
     from selenium.webdriver.common.keys import Keys
     # ...
 
+    @traced()
     def _fill_subject(
         self,
         text: str = "Transportation Parking Reservations",
@@ -211,52 +204,17 @@ class EmailTemplateService:
                 "arguments[0].scrollIntoView({block:'center'});", subj
             )
 
-            # ── normal way ────────────────────────────────────────────────
-            subj.clear()
-            subj.send_keys(text, Keys.TAB)          # <── blur commits value
-        except Exception as exc:
-            logger.warning(f"send_keys failed on Subject – using JS fallback: {exc}")
-
-            subj = self.driver.find_element(By.ID, "subject")
-            self.driver.execute_script(
-                """
-                const el = arguments[0], val = arguments[1];
-
-                /* setNativeValue hacks around React’s setter */
-                const setNativeValue = (input, value) => {
-                const lastValue = input.value;
-                input.value = value;
-                const tracker = input._valueTracker;
-                if (tracker) tracker.setValue(lastValue);
-                input.dispatchEvent(new Event('input', { bubbles: true }));
-                input.dispatchEvent(new Event('change', { bubbles: true }));
-                };
-
-                setNativeValue(el, val);
-                el.blur();            // fires 'blur' so Formik commits
-                """,
-                subj,
-                text,
-            )
-
-        # ── verify ───────────────────────────────────────────────────────
-        try:
-            self.wait.until(
-                EC.text_to_be_present_in_element_value((By.ID, "subject"), text)
-            )
+            # native setter + blur so Formik commits; typing only if it does not stick
+            if FormFiller(self.driver, self.waits).fill({"#subject": text}):
+                logger.error("Failed to confirm subject value")
+                return False
             logger.info("Subject line set & committed")
             return True
         except Exception as exc:
-            logger.error(f"Failed to confirm subject value: {exc}")
+            logger.error(f"Failed to set subject: {exc}")
             return False
 
-
-
-
-
-
-
-
+    @traced()
     def _click_share_tab(self):
         """Focus Offstreet, click **Share**, then load the e-mail template."""
         logger.info("Switching to Offstreet & clicking Share tab")
@@ -264,7 +222,7 @@ class EmailTemplateService:
             # find Offstreet dashboard tab
             for handle in self.driver.window_handles:
                 self.driver.switch_to.window(handle)
-                if "dashboard.offstreet.io" in self.driver.current_url:
+                if urlparse(config.OFFSTREET_BASE_URL).netloc in self.driver.current_url:
                     break
             else:  # fallback to first handle
                 if self.driver.window_handles:
@@ -293,18 +251,12 @@ class EmailTemplateService:
     # ─────────────────────  e-mail HTML helpers  ───────────────────────
     @staticmethod
     def _format_parking_structure(name: str) -> str:
-        if "Biggy" in name:
-            return "Biggy Structure"
-        elif "San Pablo" in name:
-            return "San Pablo Parking Structure"
-        elif "Figueroa" in name:
-            return "Figueroa Street Structure"
-        return name
+        return canonical_lot_name(name)
 
     def _get_event_link(self) -> str:
         try:
             el = self.driver.find_element(
-                By.CSS_SELECTOR, 'a[href^="https://www.offstreet.io/events/"]'
+                By.CSS_SELECTOR, f'a[href^="{config.OFFSTREET_EVENT_URL}"]'
             )
             return el.get_attribute("href")
         except Exception:
@@ -366,7 +318,7 @@ class EmailTemplateService:
             rid = t2_data["t2_data"]["Confirmation/Reservation UID"]
             self.driver.execute_script(
                 "window.open(arguments[0],'_blank');",
-                f"https://usc.t2flex.com/PowerPark/reservation/view.aspx?id={rid}&addtoqueue=1",
+                f"{config.T2_BASE_URL}/reservation/view.aspx?id={rid}&addtoqueue=1",
             )
         except Exception as exc:
             logger.error(f"Tab open failed: {exc}")
@@ -422,17 +374,15 @@ class EmailTemplateService:
                 "arguments[0].scrollIntoView({block:'center'});", deny_link
             )
             deny_link.click()
-            time.sleep(1)
 
             # select note type
             Select(
-                self.wait.until(
-                    EC.presence_of_element_located(
-                        (
-                            By.ID,
-                            "insertEditNoteControl1_WizardStep1_S1NoteType_T2DropDownList_DropDownList",
-                        )
-                    )
+                self.waits.present(
+                    (
+                        By.ID,
+                        "insertEditNoteControl1_WizardStep1_S1NoteType_T2DropDownList_DropDownList",
+                    ),
+                    replaces=1,
                 )
             ).select_by_value("2005")
 
@@ -455,7 +405,7 @@ class EmailTemplateService:
                 )
             )
             save_btn.click()
-            time.sleep(1)
+            self.waits.stale(save_btn, "denial note saved", replaces=1, soft=True)
             logger.info("Reservation denied successfully")
         except Exception as exc:
             logger.error(f"Deny flow failed: {exc}")
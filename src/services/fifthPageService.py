@@ -1,21 +1,31 @@
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import time
+from services.waitService import WaitService
+from services.tracer import traced
+from services.domSnapshot import DomSnapshot
+from services.richTextWriter import RichTextWriter
 import logging
 import os
 import sys
-from selenium import webdriver
 
 logger = logging.getLogger('PortalSettings')
 
+TRANSPORT_IMAGE = "transport.png"
+
 class PortalSettingsService:
-    def __init__(self, driver, t2_data):
+    def __init__(self, driver, t2_data, asset_cache=None, account=None):
         logger.info("Initializing PortalSettingsService")
         self.driver = driver
         self.wait = WebDriverWait(self.driver, 10)
+        self.waits = WaitService(self.driver)
+        self.snapshot = DomSnapshot(self.driver)
+        self.rich_text = RichTextWriter(self.driver, self.waits)
         self.t2_data = t2_data.get('t2_data', {})
+        self.asset_cache = asset_cache if account else None
+        self.account = account
 
+    @traced()
     def enable_branding(self):
         try:
             logger.info("Enabling branding")
@@ -24,15 +34,29 @@ class PortalSettingsService:
             )
             if not "bg-primary-600" in branding_toggle.get_attribute("class"):
                 branding_toggle.click()
-                time.sleep(1)
+                self.waits.toggle_state((By.ID, "hasBranding"), on=True, replaces=1, soft=True)
                 logger.info("Branding enabled")
-                self.select_transport_image()
+                self.attach_transport_image()
             else:
                 logger.info("Branding was already enabled")
         except Exception as e:
             logger.error(f"Error enabling branding: {str(e)}")
 
-    def select_transport_image(self):
+    @traced()
+    def attach_transport_image(self):
+        """Ticks transport.png in the file dialog, by its cached file ID when there is one."""
+        file_id = self.asset_cache.get(self.account, TRANSPORT_IMAGE) if self.asset_cache else None
+        return self.select_transport_image(file_id)
+
+    def _file_row(self, file_id=None):
+        # The file rows carry the file name in aria-label and the file ID in data-id
+        for row in self.snapshot.table_rows("tr", ("aria-label", "data-id")):
+            if TRANSPORT_IMAGE in (row["attributes"]["aria-label"] or "") and (file_id is None or row["attributes"]["data-id"] == str(file_id)):
+                return row
+        return None
+
+    @traced()
+    def select_transport_image(self, file_id=None):
         try:
             logger.info("Starting to select transport.png image")
             
@@ -41,22 +65,33 @@ class PortalSettingsService:
             )
             add_previous_button.click()
             logger.info("Clicked Add Previous Files button")
-            time.sleep(2)
-            
-            search_input = self.wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "input[placeholder='Search...']"))
-            )
-            search_input.clear()
-            search_input.send_keys("transport.png")
-            logger.info("Entered 'transport.png' in search box")
-            time.sleep(2)
-            
-            first_result_checkbox = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//tr[contains(@aria-label, 'transport.png')][1]//span[@role='checkbox']"))
+
+            row = None
+            if file_id:
+                # The dialog opens with the previous files listed; the cached one needs no search
+                row = self.waits.until(lambda driver: self._file_row(file_id), f"file {file_id} listed", soft=True)
+            if not row:
+                search_input = self.waits.clickable((By.CSS_SELECTOR, "input[placeholder='Search...']"), replaces=2)
+                search_input.clear()
+                search_input.send_keys("transport.png")
+                logger.info("Entered 'transport.png' in search box")
+                self.waits.network_idle("file search request", replaces=2)
+                row = self.waits.until(lambda driver: self._file_row(), "transport.png search result")
+
+            if not self.snapshot.click_row(row["index"], "tr", "span[role='checkbox']"):
+                raise Exception("transport.png result disappeared before it could be selected")
+            logger.info(f"Selected transport.png (file ID {row['attributes']['data-id']})")
+            self.waits.until(
+                lambda driver: any(r["index"] == row["index"] and r["checked"] for r in self.snapshot.table_rows("tr")),
+                "transport.png checkbox ticked",
+                replaces=1,
+                soft=True
             )
-            first_result_checkbox.click()
-            logger.info("Selected the first transport.png result")
-            time.sleep(1)
+            if self.asset_cache:
+                if row["attributes"]["data-id"]:
+                    self.asset_cache.put(self.account, TRANSPORT_IMAGE, row["attributes"]["data-id"])
+                else:
+                    logger.warning(f"{TRANSPORT_IMAGE} row has no data-id, its file ID cannot be cached")
             
             next_button = self.wait.until(
             EC.element_to_be_clickable(
@@ -64,30 +99,25 @@ class PortalSettingsService:
                 )
             next_button.click()
             logger.info("Clicked Next button")
-            time.sleep(1)          # give the follow-up modal a moment to appear
 
             # 4️⃣  click **Save** in the new window
-            save_button = self.wait.until(
-                EC.element_to_be_clickable((
-                    By.XPATH,
-                    "//button[contains(@class, 'bg-primary') and normalize-space(text())='Save']"
-                ))
-            )
+            save_xpath = "//button[contains(@class, 'bg-primary') and normalize-space(text())='Save']"
+            save_button = self.waits.clickable((By.XPATH, save_xpath), replaces=1)
             save_button.click()
             logger.info("Clicked Save button")
-            time.sleep(2)
+            self.waits.gone((By.XPATH, "//div[@role='dialog']"), replaces=2, soft=True)
             return True
             
         except Exception as e:
             logger.error(f"Error selecting transport.png image: {str(e)}")
             return False
 
+    @traced()
     def add_instructions(self):
         try:
             logger.info("Adding instructions")
-            time.sleep(5)
 
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "form")))
+            self.waits.present((By.TAG_NAME, "form"), replaces=5)
 
             # Use correct toggle ID: 'hasInstructions'
             instructions_toggle = WebDriverWait(self.driver, 20).until(
@@ -96,64 +126,37 @@ class PortalSettingsService:
 
             if "bg-primary-600" not in instructions_toggle.get_attribute("class"):
                 self.driver.execute_script("arguments[0].scrollIntoView(true);", instructions_toggle)
-                time.sleep(1)
                 instructions_toggle.click()
-                time.sleep(3)
+                self.waits.toggle_state((By.ID, "hasInstructions"), on=True, replaces=4, soft=True)
 
             requested_lot = self.t2_data.get('Requested Lot', 'Structure')
             logger.debug(f"Retrieved lot name: {requested_lot}")
             instructions_text = f"Parking is now digital in the {requested_lot}. Please ensure to register your vehicle upon parking in any unmarked space."
 
             # Wait for at least 2 instruction fields to appear
-            WebDriverWait(self.driver, 20).until(
-                lambda d: len(d.find_elements(By.CLASS_NAME, "ProseMirror")) >= 2
-            )
-            instruction_elements = self.driver.find_elements(By.CLASS_NAME, "ProseMirror")[:2]
-
-            for idx, element in enumerate(instruction_elements):
-                try:
-                    self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-                    time.sleep(1)
-                    self.driver.execute_script("arguments[0].click();", element)
-                    time.sleep(0.5)
-                    self.driver.execute_script("arguments[0].innerHTML = '';", element)
-                    self.driver.execute_script(f"arguments[0].innerHTML = `{instructions_text}`;", element)
+            instruction_elements = self.waits.count((By.CLASS_NAME, "ProseMirror"), 2, timeout=20)[:2]
+
+            # Both editors in one script; the text is passed as an argument, never spliced into the JS
+            failed = self.rich_text.write(instruction_elements, instructions_text, replaces=3)
+            for idx in range(len(instruction_elements)):
+                if idx in failed:
+                    logger.error(f"Failed to inject instructions into field #{idx + 1}")
+                else:
                     logger.info(f"Instructions injected into field #{idx + 1}")
-                except Exception as e:
-                    logger.error(f"Failed to inject instructions into field #{idx + 1}: {str(e)}")
-
-            time.sleep(2)
 
         except Exception as e:
             logger.error(f"Error adding instructions: {str(e)}")
-            try:
-                logger.info("Attempting alternative approach for instructions")
-                time.sleep(5)
-                fallback_elements = self.driver.find_elements(By.CLASS_NAME, "ProseMirror")[:2]
-                for element in fallback_elements:
-                    actions = webdriver.ActionChains(self.driver)
-                    actions.move_to_element(element).click().send_keys(instructions_text).perform()
-                logger.info("Instructions added using fallback ActionChains")
-            except Exception as alt_e:
-                logger.error(f"Alternative approach failed: {str(alt_e)}")
-
 
-    
-
-            
+    @traced()
     def click_create_event(self):
         try:
             logger.info("Initiating event creation")
-            time.sleep(2)
             
-            create_button = self.wait.until(
-                EC.presence_of_element_located((By.XPATH, "//button[text()='Create Event']"))
-            )
+            create_button = self.waits.enabled((By.XPATH, "//button[text()='Create Event']"), replaces=2)
             self.driver.execute_script("arguments[0].scrollIntoView(true);", create_button)
-            time.sleep(1)
             
             create_button.click()
-            time.sleep(3)
+            self.waits.stale(create_button, "event creation to leave the wizard", replaces=4, soft=True, timeout=self.waits.profile["timeout"])
             logger.info("Event created successfully")
             return True
         except Exception as e:
@@ -161,8 +164,8 @@ class PortalSettingsService:
             return False
 
     def configure_all_portal_settings(self):
-        time.sleep(1)
         logger.info("Starting portal settings configuration")
+        self.waits.clickable((By.ID, "hasBranding"), replaces=1, soft=True, timeout=self.waits.profile["timeout"])
         self.enable_branding()
         self.add_instructions()
         logger.info("Portal settings configuration completed")
@@ -1,7 +1,8 @@
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import time
+from services.waitService import WaitService
+from services.tracer import traced
+from services.formFiller import FormFiller
 import logging
 
 logger = logging.getLogger('FirstPageService')
@@ -11,6 +12,8 @@ class FirstPageService:
         logger.info("Initializing FirstPageService")
         self.driver = driver
         self.wait = WebDriverWait(self.driver, 10)
+        self.waits = WaitService(self.driver)
+        self.form_filler = FormFiller(self.driver, self.waits)
         self.t2_data = t2_data
         self.billing_code = billing_code
 
@@ -20,10 +23,11 @@ class FirstPageService:
             return f"+1 ({digits[:3]}) {digits[3:6]}-{digits[6:]}"
         return phone
 
+    @traced()
     def fill_first_page(self):
         try:
-            time.sleep(2)
             logger.info("Starting first page form fill process")
+            self.waits.clickable((By.CSS_SELECTOR, "#event"), replaces=2)
             
             form_mapping = {
                 "event": ("Event Name", "#event"),
@@ -35,29 +39,26 @@ class FirstPageService:
                 "billingCode": (None, "#billingCode")
             }
             
+            fields = {}
             for field, (json_key, selector) in form_mapping.items():
-                try:
-                    logger.debug(f"Filling field: {field}")
-                    element = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                    element = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, selector)))
-                    
-                    if json_key:
-                        value = self.t2_data.get(json_key, "")
-                        if field == "phoneNumber" and value:
-                            value = self.format_phone(value)
-                    else:
-                        value = self.billing_code
-                        
-                    if value:
-                        element.clear()
-                        element.send_keys(value)
-                        time.sleep(0.5)
-                        logger.debug(f"Field {field} filled with value: {value}")
-                    else:
-                        logger.warning(f"No value found for field: {field}")
-                        
-                except Exception as field_error:
-                    logger.error(f"Error filling field {field}: {str(field_error)}")
+                if json_key:
+                    value = self.t2_data.get(json_key, "")
+                    if field == "phoneNumber" and value:
+                        value = self.format_phone(value)
+                else:
+                    value = self.billing_code
+
+                if value:
+                    fields[selector] = value
+                    logger.debug(f"Field {field} will be filled with value: {value}")
+                else:
+                    logger.warning(f"No value found for field: {field}")
+
+            # All fields in one scripted pass; only fields that do not stick are typed
+            failed = self.form_filler.fill(fields, replaces=0.5 * len(fields))
+            for field, (json_key, selector) in form_mapping.items():
+                if selector in failed:
+                    logger.error(f"Error filling field {field}: value did not stick")
             
             self.click_continue()
             logger.info("First page form submitted successfully")
@@ -67,8 +68,9 @@ class FirstPageService:
             logger.error(f"Error in fill_first_page: {str(e)}")
             return False
             
+    @traced()
     def click_continue(self):
         logger.info("Proceeding to next step")
-        continue_button = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit']")))
+        continue_button = self.waits.clickable((By.CSS_SELECTOR, "button[type='submit']"))
         continue_button.click()
         logger.debug("Continue button clicked")
\ No newline at end of file
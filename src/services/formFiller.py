@@ -0,0 +1,81 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from services.waitService import WaitService, values_committed
+import logging
+
+logger = logging.getLogger('FormFiller')
+
+# Sets a field through the prototype value setter so React's controlled inputs
+# see the change (the _valueTracker reset makes React treat it as new), then
+# fires the events Formik listens for. Prepended to scripts that fill fields.
+SET_NATIVE_VALUE_JS = """
+function setNativeValue(el, value, blur) {
+    const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    const lastValue = el.value;
+    el.dispatchEvent(new FocusEvent('focus'));
+    el.dispatchEvent(new FocusEvent('focusin', {bubbles: true}));
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+    const tracker = el._valueTracker;
+    if (tracker) { tracker.setValue(lastValue); }
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    if (blur) {
+        el.dispatchEvent(new FocusEvent('blur'));
+        el.dispatchEvent(new FocusEvent('focusout', {bubbles: true}));
+    }
+}
+"""
+
+# Returns the selectors not found
+FILL_SCRIPT = SET_NATIVE_VALUE_JS + """
+const [fields, blur] = arguments;
+const missing = [];
+for (const [selector, value] of fields) {
+    const el = document.querySelector(selector);
+    if (!el) { missing.push(selector); continue; }
+    setNativeValue(el, value, blur);
+}
+return missing;
+"""
+
+class FormFiller:
+    """Fills a whole form in one execute_script and types only the fields that did not stick."""
+
+    def __init__(self, driver, waits=None):
+        self.driver = driver
+        self.waits = waits or WaitService(driver)
+
+    def fill(self, fields, blur=True, replaces=0.0):
+        """Sets {css selector: value} and returns the selectors that still do not show their value."""
+        fields = {selector: str(value) for selector, value in fields.items()}
+        if not fields:
+            return []
+
+        missing = self.driver.execute_script(FILL_SCRIPT, list(fields.items()), blur)
+        if missing:
+            logger.warning(f"Fields not found for scripted fill: {', '.join(missing)}")
+
+        check = values_committed(fields)
+        if self.waits.until(check, f"{len(fields)} form values committed", replaces, soft=True):
+            logger.info(f"Filled {len(fields)} fields in one pass")
+            return []
+
+        logger.warning(f"Scripted fill did not stick for {', '.join(check.failed)}, typing them instead")
+        failed = []
+        for selector in check.failed:
+            if not self.type_field(selector, fields[selector]):
+                failed.append(selector)
+        return failed
+
+    def type_field(self, selector, value):
+        try:
+            element = self.waits.clickable((By.CSS_SELECTOR, selector))
+            element.clear()
+            # Tab out so the blur commits the value
+            element.send_keys(value, Keys.TAB)
+            if self.waits.value(element, value, selector):
+                return True
+        except Exception as e:
+            logger.error(f"Error typing field {selector}: {str(e)}")
+        logger.error(f"Field {selector} did not keep its value")
+        return False
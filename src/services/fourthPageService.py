@@ -1,24 +1,97 @@
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from services.waitService import WaitService, is_toggle_on, value_matches
+from services.formFiller import SET_NATIVE_VALUE_JS
+from services.tracer import traced
 from datetime import datetime
-import time
 import logging
 
 logger = logging.getLogger('EventSettings')
 
+SETTING_NAMES = {
+    "hasAdditionalInfo": "Collect Additional Information",
+    "hasCode": "Require a Code",
+    "hasRate": "Add Rate",
+    "hasMaxParkers": "Set Max Number of Parkers"
+}
+DRIVER_FIELD = "input[placeholder='e.g. Driver Name']"
+
+# Applies one plan step: switches are clicked only when off, a choice only when
+# its dependent field is not shown yet, rows are added up to the wanted count
+# and fields are set through the React-safe setter. Returns what was not found.
+APPLY_STEP_SCRIPT = SET_NATIVE_VALUE_JS + """
+const [step] = arguments;
+const isOn = el => el.getAttribute('aria-checked') === 'true' || (el.getAttribute('class') || '').includes('bg-primary-600');
+const missing = [];
+(step.switches || []).forEach(id => {
+    const el = document.getElementById(id);
+    if (!el) { missing.push(id); } else if (!isOn(el)) { el.click(); }
+});
+(step.choices || []).forEach(choice => {
+    if (document.querySelector(choice.reveals)) { return; }
+    const el = Array.from(document.querySelectorAll('div')).find(div =>
+        Array.from(div.childNodes).some(node => node.nodeType === Node.TEXT_NODE && node.textContent.includes(choice.text)));
+    if (el) { el.click(); } else { missing.push(choice.text); }
+});
+(step.rows || []).forEach(rows => {
+    const button = Array.from(document.querySelectorAll('button')).find(b => b.textContent.trim() === rows.button);
+    const wanted = rows.count - document.querySelectorAll(rows.selector).length;
+    if (wanted > 0 && !button) { missing.push(rows.button); return; }
+    for (let i = 0; i < wanted; i++) { button.click(); }
+});
+(step.fields || []).forEach(([selector, index, value]) => {
+    const el = document.querySelectorAll(selector)[index];
+    if (el) { setNativeValue(el, value, true); } else { missing.push(`${selector}[${index}]`); }
+});
+return missing;
+"""
+
+# Everything a plan step sets, read back in one call
+READ_STEP_SCRIPT = """
+const [step] = arguments;
+const isOn = el => el.getAttribute('aria-checked') === 'true' || (el.getAttribute('class') || '').includes('bg-primary-600');
+return {
+    switches: (step.switches || []).map(id => { const el = document.getElementById(id); return el ? isOn(el) : null; }),
+    choices: (step.choices || []).map(choice => !!document.querySelector(choice.reveals)),
+    rows: (step.rows || []).map(rows => document.querySelectorAll(rows.selector).length),
+    fields: (step.fields || []).map(([selector, index]) => { const el = document.querySelectorAll(selector)[index]; return el ? el.value : null; })
+};
+"""
+
+class step_applied:
+    def __init__(self, step):
+        self.step = step
+        self.failed = []
+
+    def __call__(self, driver):
+        state = driver.execute_script(READ_STEP_SCRIPT, self.step)
+        step = self.step
+        self.failed = (
+            [switch for switch, on in zip(step.get("switches", []), state["switches"]) if not on] +
+            [choice["text"] for choice, shown in zip(step.get("choices", []), state["choices"]) if not shown] +
+            [rows["button"] for rows, count in zip(step.get("rows", []), state["rows"]) if count < rows["count"]] +
+            [f"{selector}[{index}]" for (selector, index, value), actual in zip(step.get("fields", []), state["fields"]) if not value_matches(actual, value)]
+        )
+        return not self.failed
+
 class EventSettingsService:
     def __init__(self, driver, t2_data):
         logger.info("Initializing EventSettingsService")
         self.driver = driver
         self.wait = WebDriverWait(driver, 10)
+        self.waits = WaitService(driver)
         self.t2_data = t2_data
 
+    @traced()
     def toggle_switch(self, switch_id):
         logger.info(f"Toggling switch: {switch_id}")
         switch = self.wait.until(EC.element_to_be_clickable((By.ID, switch_id)))
+        if is_toggle_on(switch):
+            logger.info(f"Switch {switch_id} is already on")
+            return
         switch.click()
-        time.sleep(1)
+        self.waits.toggle_state((By.ID, switch_id), on=True, replaces=1, soft=True)
 
     def calculate_days_and_rate(self):
         try:
@@ -34,6 +107,7 @@ class EventSettingsService:
             logger.info("Using default rate of $20.50")
             return 20.50
 
+    @traced()
     def configure_code(self):
         try:
             logger.info("Configuring access code settings")
@@ -56,6 +130,7 @@ class EventSettingsService:
         except Exception as e:
             logger.error(f"Error configuring access code: {str(e)}")
 
+    @traced()
     def configure_rate(self):
         try:
             logger.info("Configuring rate settings")
@@ -74,6 +149,7 @@ class EventSettingsService:
         except Exception as e:
             logger.error(f"Error configuring rate: {str(e)}")
 
+    @traced()
     def configure_max_parkers(self):
         try:
             logger.info("Configuring maximum parkers")
@@ -101,7 +177,8 @@ class EventSettingsService:
             first_required_toggle = self.wait.until(EC.element_to_be_clickable(
                 (By.ID, "additionalInfo.0.isRequired")
             ))
-            first_required_toggle.click()
+            if not is_toggle_on(first_required_toggle):
+                first_required_toggle.click()
             # time.sleep(0.5)
             logger.debug("First name field configured and set as required")
         except Exception as e:
@@ -110,10 +187,11 @@ class EventSettingsService:
     def add_last_name_field(self):
         try:
             logger.info("Adding last name field")
-            add_field_button = self.wait.until(EC.element_to_be_clickable(
-                (By.XPATH, "//button[text()='Add Field']")
-            ))
-            add_field_button.click()
+            if len(self.driver.find_elements(By.CSS_SELECTOR, DRIVER_FIELD)) < 2:
+                add_field_button = self.wait.until(EC.element_to_be_clickable(
+                    (By.XPATH, "//button[text()='Add Field']")
+                ))
+                add_field_button.click()
             # time.sleep(0.5)
 
             field_inputs = self.driver.find_elements(By.CSS_SELECTOR, "input[placeholder='e.g. Driver Name']")
@@ -126,12 +204,14 @@ class EventSettingsService:
                 second_required_toggle = self.wait.until(EC.element_to_be_clickable(
                     (By.ID, "additionalInfo.1.isRequired")
                 ))
-                second_required_toggle.click()
+                if not is_toggle_on(second_required_toggle):
+                    second_required_toggle.click()
                 # time.sleep(0.5)
                 logger.debug("Last name field configured and set as required")
         except Exception as e:
             logger.error(f"Error adding last name field: {str(e)}")
 
+    @traced()
     def configure_additional_info(self):
         logger.info("Configuring additional information fields")
         # time.sleep(0.5)
@@ -140,55 +220,89 @@ class EventSettingsService:
         self.add_last_name_field()
         # time.sleep(0.5)
 
+    @traced()
     def click_continue(self):
         logger.info("Proceeding to next step")
         continue_button = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit']")))
         continue_button.click()
         logger.debug("Continue button clicked")
 
+    def settings_plan(self):
+        """The event settings for this reservation as ordered steps, each applied in one script call.
+
+        Switches come first because they reveal the rest; the same-code choice
+        and the second Driver Name row reveal inputs that the last step fills.
+        """
+        # Only set a max number of parkers when "Exceed Car Requested Set Value" is "No"
+        exceed_value = self.t2_data.get('Exceed Car Requested Set Value', 'No')
+        logger.info(f"Exceed Car Requested Set Value: {exceed_value}")
+        switches = ["hasAdditionalInfo", "hasCode", "hasRate"]
+        if exceed_value == "No":
+            switches.append("hasMaxParkers")
+
+        fields = [
+            [DRIVER_FIELD, 0, "First Name"],
+            [DRIVER_FIELD, 1, "Last Name"],
+            ["input[inputmode='numeric']", 0, str(self.calculate_days_and_rate())]
+        ]
+        reservation_uid = self.t2_data.get('Confirmation/Reservation UID', '')
+        if reservation_uid:
+            fields.append(["#sameCode", 0, reservation_uid])
+        if "hasMaxParkers" in switches:
+            fields.append(["input[placeholder='e.g. 48']", 0, self.t2_data.get('Cars Requested', '1')])
+
+        return [
+            ("switches", {"switches": switches}),
+            ("reveal", {
+                "choices": [{"text": "Parkers input the same code", "reveals": "#sameCode"}],
+                "rows": [{"button": "Add Field", "selector": DRIVER_FIELD, "count": 2}]
+            }),
+            ("values", {"fields": fields, "switches": ["additionalInfo.0.isRequired", "additionalInfo.1.isRequired"]})
+        ]
+
+    @traced()
+    def apply_settings_plan(self, plan):
+        for name, step in plan:
+            missing = self.driver.execute_script(APPLY_STEP_SCRIPT, step)
+            if missing:
+                logger.warning(f"Settings step '{name}' could not find: {', '.join(missing)}")
+            check = step_applied(step)
+            if not self.waits.until(check, f"settings step '{name}'", soft=True):
+                logger.warning(f"Settings step '{name}' did not apply: {', '.join(check.failed)}")
+                return False
+            logger.info(f"Settings step '{name}' applied")
+        return True
+
+    def configure_settings_individually(self, switches):
+        # First phase: Toggle all switches
+        for setting_id in switches:
+            logger.info(f"Configuring setting: {SETTING_NAMES[setting_id]}")
+            self.toggle_switch(setting_id)
+
+        # Second phase: Configure each enabled setting
+        for setting_id in switches:
+            logger.info(f"Filling fields for: {SETTING_NAMES[setting_id]}")
+            if setting_id == "hasMaxParkers":
+                self.configure_max_parkers()
+            elif setting_id == "hasAdditionalInfo":
+                self.configure_additional_info()
+            elif setting_id == "hasCode":
+                self.configure_code()
+            elif setting_id == "hasRate":
+                self.configure_rate()
+
     def configure_all_settings(self):
         try:
             logger.info("Starting event settings configuration")
-            
-            # Check if "Exceed Car Requested Set Value" is "Yes" or "No"
-            exceed_value = self.t2_data.get('Exceed Car Requested Set Value', 'No')
-            logger.info(f"Exceed Car Requested Set Value: {exceed_value}")
-            
-            settings = {
-                "hasAdditionalInfo": "Collect Additional Information",
-                "hasCode": "Require a Code",
-                "hasRate": "Add Rate"
-            }
-            
-            # Only add max parkers setting if exceed_value is "No"
-            if exceed_value == "No":
-                settings["hasMaxParkers"] = "Set Max Number of Parkers"
+            plan = self.settings_plan()
+            switches = plan[0][1]["switches"]
 
-            # Add a sleep before starting toggle phase to ensure page is fully loaded
             logger.info("Waiting for settings page to fully load before toggling switches")
-            time.sleep(2)
-            
-            # First phase: Toggle all switches
-            for setting_id, setting_name in settings.items():
-                logger.info(f"Configuring setting: {setting_name}")
-                self.toggle_switch(setting_id)
-                time.sleep(1)  # Short sleep after each toggle
-                
-            # Add a longer sleep after toggle phase to allow all UI changes to take effect
-            logger.info("Waiting for UI to update after toggling all switches")
-            # time.sleep(3)
-            
-            # Second phase: Configure each enabled setting
-            for setting_id, setting_name in settings.items():
-                logger.info(f"Filling fields for: {setting_name}")
-                if setting_id == "hasMaxParkers":
-                    self.configure_max_parkers()
-                elif setting_id == "hasAdditionalInfo":
-                    self.configure_additional_info()
-                elif setting_id == "hasCode":
-                    self.configure_code()
-                elif setting_id == "hasRate":
-                    self.configure_rate()
+            self.waits.clickable((By.ID, switches[0]), replaces=2)
+
+            if not self.apply_settings_plan(plan):
+                logger.warning("Batched settings did not stick, configuring settings one by one")
+                self.configure_settings_individually(switches)
 
             self.click_continue()
             logger.info("Event settings configuration completed successfully")
@@ -196,4 +310,4 @@ class EventSettingsService:
             
         except Exception as e:
             logger.error(f"Error configuring event settings: {str(e)}")
-            return False
\ No newline at end of file
+            return False
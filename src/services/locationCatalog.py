@@ -0,0 +1,101 @@
+from services.lotMatcher import get_matcher
+import json
+import os
+import time
+import logging
+
+logger = logging.getLogger('LocationCatalog')
+
+# Below this score an offline pick is too uncertain and the live search decides
+MIN_MATCH_SCORE = 0.6
+
+class LocationCatalog:
+    """Offstreet locations (ID -> name/data-name) seen in the Add Locations table or the location dropdown.
+
+    The file holds one catalog per Offstreet base URL so the mocks never
+    mix with the real dashboard.
+    """
+
+    def __init__(self, catalog_file, ttl_hours, account):
+        self.catalog_file = catalog_file
+        self.ttl_seconds = ttl_hours * 3600
+        self.account = account
+        self.hits = 0
+        self.misses = 0
+        self.accounts = self._load()
+        self.catalog = self.accounts.setdefault(account, {"refreshed_at": 0, "locations": {}})
+
+    def _load(self):
+        if not os.path.exists(self.catalog_file):
+            return {}
+        try:
+            with open(self.catalog_file, 'r') as f:
+                accounts = json.load(f)
+            locations = accounts.get(self.account, {}).get("locations", {})
+            logger.info(f"Loaded {len(locations)} cached locations from {self.catalog_file}")
+            return accounts
+        except Exception as e:
+            logger.error(f"Failed to load location catalog, starting empty: {str(e)}")
+            return {}
+
+    def _save(self):
+        try:
+            # Worker processes share the file, so each writes through its own temp file
+            tmp_file = f"{self.catalog_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(self.accounts, f, indent=2)
+            os.replace(tmp_file, self.catalog_file)
+        except Exception as e:
+            logger.error(f"Failed to save location catalog: {str(e)}")
+
+    @property
+    def locations(self):
+        return self.catalog["locations"]
+
+    def is_stale(self):
+        return not self.locations or time.time() - self.catalog["refreshed_at"] > self.ttl_seconds
+
+    def update(self, locations, refreshed=False):
+        """Merges [{"id", "name", "data_name"}] into the catalog; rows without an ID are keyed by name."""
+        changed = 0
+        for location in locations:
+            name = (location.get("name") or "").strip()
+            if not name:
+                continue
+            key = str(location.get("id") or name)
+            entry = {"id": location.get("id"), "name": name, "data_name": location.get("data_name") or self.locations.get(key, {}).get("data_name")}
+            if self.locations.get(key) != entry:
+                self.locations[key] = entry
+                changed += 1
+        if refreshed:
+            self.catalog["refreshed_at"] = time.time()
+        if changed or refreshed:
+            self._save()
+        if changed:
+            logger.info(f"Location catalog updated with {changed} location(s), {len(self.locations)} known")
+        return changed
+
+    def forget(self, location):
+        key = str(location.get("id") or location["name"])
+        if self.locations.pop(key, None):
+            logger.info(f"Removed {location['name']} from the location catalog")
+            self._save()
+
+    def resolve(self, requested_lot):
+        """Best catalog entry for the requested lot, or None when the live search should decide."""
+        entries = list(self.locations.values())
+        best = get_matcher([entry["name"] for entry in entries]).best(requested_lot) if requested_lot else None
+        if best and best[2] >= MIN_MATCH_SCORE:
+            self.hits += 1
+            location = entries[best[0]]
+            logger.info(f"Location catalog hit for '{requested_lot}': {location['name']} (ID {location['id']}, score {best[2]:.3f})")
+            return location
+
+        self.misses += 1
+        logger.info(f"Location catalog miss for '{requested_lot}'" + (f" (best {best[1]} scored {best[2]:.3f})" if best else ""))
+        return None
+
+    def log_stats(self):
+        total = self.hits + self.misses
+        hit_rate = (self.hits / total * 100) if total else 0.0
+        logger.info(f"Location catalog stats - hits: {self.hits}, misses: {self.misses}, hit rate: {hit_rate:.0f}%")
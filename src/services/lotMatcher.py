@@ -0,0 +1,134 @@
+import math
+import re
+import logging
+
+logger = logging.getLogger('LotMatcher')
+
+# (trigger, display name, preferred catalogue names). A requested lot containing
+# the trigger is shown to customers under the display name, and the preferred
+# catalogue entries win over other lots that merely share a token.
+LOT_ALIASES = (
+    ("biggy", "Biggy Structure", ("p8 biggy structure", "biggy structure")),
+    ("san pablo", "San Pablo Parking Structure", ("san pablo parking structure", "san pablo structure")),
+    ("figueroa", "Figueroa Street Structure", ("figueroa street structure", "figueroa structure"))
+)
+
+TOKEN_WEIGHT = 0.7
+TRIGRAM_WEIGHT = 0.3
+ALIAS_BONUS = 1.0
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+def normalize(name):
+    return _NON_ALNUM.sub(" ", (name or "").lower()).strip()
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def find_alias(name):
+    normalized = f" {normalize(name)} "
+    for trigger, display_name, preferred in LOT_ALIASES:
+        if f" {trigger} " in normalized:
+            return display_name, preferred
+    return None
+
+def canonical_lot_name(name):
+    """Customer-facing name for a T2 lot, e.g. any Biggy lot becomes "Biggy Structure"."""
+    alias = find_alias(name)
+    return alias[0] if alias else name
+
+class LotMatcher:
+    """Ranks location names against a requested lot by IDF-weighted token overlap plus trigram similarity."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.entries = []
+        self.token_index = {}
+        self.trigram_index = {}
+        self._cache = {}
+        for index, name in enumerate(self.names):
+            normalized = normalize(name)
+            tokens = set(normalized.split())
+            grams = trigrams(normalized)
+            self.entries.append((normalized, tokens, grams))
+            for token in tokens:
+                self.token_index.setdefault(token, set()).add(index)
+            for gram in grams:
+                self.trigram_index.setdefault(gram, set()).add(index)
+
+        count = len(self.names)
+        self.idf = {
+            token: math.log((count + 1) / (len(indexes) + 0.5)) + 1
+            for token, indexes in self.token_index.items()
+        }
+        self.unknown_idf = math.log((count + 1) / 0.5) + 1
+
+    def _alias_bonus(self, normalized, preferred):
+        for rank, phrase in enumerate(preferred):
+            if phrase in normalized:
+                return ALIAS_BONUS - rank * 0.1
+        return 0.0
+
+    def rank(self, query, limit=3):
+        """Returns up to limit (index, name, score) tuples, best first."""
+        key = (query, limit)
+        if key not in self._cache:
+            self._cache[key] = self._score(query, limit)
+        return self._cache[key]
+
+    def _score(self, query, limit=3):
+        normalized = normalize(query)
+        tokens = set(normalized.split())
+        grams = trigrams(normalized)
+        alias = find_alias(query)
+        query_weight = sum(self.idf.get(token, self.unknown_idf) for token in tokens) or 1.0
+
+        # Token overlap accumulated through the postings, so only lots sharing a token are touched
+        partial = {}
+        for token in tokens:
+            weight = TOKEN_WEIGHT * self.idf.get(token, 0.0) / query_weight
+            for index in self.token_index.get(token, ()):
+                partial[index] = partial.get(index, 0.0) + weight
+        if not partial:
+            # No shared token (typos, abbreviations): fall back to trigram neighbours
+            for gram in grams:
+                for index in self.trigram_index.get(gram, ()):
+                    partial[index] = 0.0
+        if alias:
+            for index in partial:
+                partial[index] += self._alias_bonus(self.entries[index][0], alias[1])
+
+        # Trigrams add at most TRIGRAM_WEIGHT, so lots too far behind the limit-th best cannot reach it
+        ordered = sorted(partial.values(), reverse=True)
+        cutoff = ordered[min(limit, len(ordered)) - 1] - TRIGRAM_WEIGHT if ordered else 0.0
+        scored = []
+        for index, score in partial.items():
+            if score < cutoff:
+                continue
+            candidate_grams = self.entries[index][2]
+            shared = len(grams & candidate_grams)
+            score += TRIGRAM_WEIGHT * shared / (len(grams) + len(candidate_grams) - shared)
+            scored.append((index, self.names[index], round(score, 4)))
+
+        # Ties keep the page order, like the scan this replaces
+        scored.sort(key=lambda item: (-item[2], item[0]))
+        return scored[:limit]
+
+    def best(self, query):
+        ranked = self.rank(query, limit=1)
+        return ranked[0] if ranked else None
+
+_matchers = {}
+
+def get_matcher(names):
+    """Matcher for a list of names, built once per distinct list for the session."""
+    key = tuple(names)
+    matcher = _matchers.get(key)
+    if matcher is None:
+        if len(_matchers) >= 64:
+            _matchers.clear()
+        matcher = LotMatcher(key)
+        _matchers[key] = matcher
+        logger.debug(f"Built lot index over {len(key)} names")
+    return matcher
@@ -0,0 +1,85 @@
+import json
+import time
+import weakref
+import logging
+
+logger = logging.getLogger('NetworkMonitor')
+
+class NetworkMonitor:
+    """Tracks in-flight requests from the Chrome performance log (CDP Network events)."""
+
+    _monitors = weakref.WeakKeyDictionary()
+
+    def __init__(self, driver, resource_types=("XHR", "Fetch")):
+        self.driver = driver
+        self.resource_types = set(resource_types)
+        self.in_flight = {}
+        self.last_activity = time.time()
+        self.available = True
+
+    @classmethod
+    def for_driver(cls, driver):
+        monitor = cls._monitors.get(driver)
+        if monitor is None:
+            monitor = cls(driver)
+            cls._monitors[driver] = monitor
+        return monitor
+
+    def drain(self):
+        if not self.available:
+            return
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            logger.warning(f"Performance log unavailable, network waits fall back to a fixed idle window: {str(e)}")
+            self.available = False
+            return
+
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method = message.get("method")
+            params = message.get("params", {})
+            request_id = params.get("requestId")
+            if method == "Network.requestWillBeSent":
+                if params.get("type") in self.resource_types:
+                    self.in_flight[request_id] = (params.get("request", {}).get("url", ""), time.time())
+                    self.last_activity = time.time()
+            elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+                if self.in_flight.pop(request_id, None) is not None:
+                    self.last_activity = time.time()
+
+    def _prune(self, max_age):
+        # Long-polling and abandoned requests would otherwise block every wait
+        now = time.time()
+        for request_id, (url, started) in list(self.in_flight.items()):
+            if now - started > max_age:
+                logger.debug(f"Ignoring long-lived request: {url}")
+                del self.in_flight[request_id]
+
+    def wait_for_idle(self, idle_ms=500, timeout=10, poll=0.05):
+        """Returns True once no tracked request has been in flight for idle_ms."""
+        idle_seconds = idle_ms / 1000
+        started = time.time()
+        self.drain()
+        if not self.available:
+            time.sleep(idle_seconds)
+            return True
+
+        # Only quiet time observed from now on counts, so a request fired just
+        # after the caller's action (e.g. a debounced search) is not missed
+        quiet_since = max(self.last_activity, started)
+        while time.time() - started < timeout:
+            self.drain()
+            self._prune(timeout)
+            if self.in_flight:
+                quiet_since = time.time()
+            elif time.time() - max(quiet_since, self.last_activity) >= idle_seconds:
+                return True
+            time.sleep(poll)
+
+        pending = [url for url, _ in self.in_flight.values()]
+        logger.warning(f"Network not idle after {timeout}s, {len(pending)} requests in flight: {pending[:3]}")
+        return False
@@ -0,0 +1,140 @@
+import csv
+import json
+import os
+import time
+import logging
+from datetime import datetime
+
+logger = logging.getLogger('RequisitionCache')
+
+CSV_COLUMNS = {
+    "r_number": ("r#", "r_number", "requisition", "requisition or third party"),
+    "gl_account": ("gl account", "gl_account", "acct_number", "account"),
+    "exp_date": ("exp date", "exp_date", "req_exp_date", "expiration date")
+}
+
+def requisition_expired(exp_date_str):
+    """Requisitions count as expired from the start of their expiration day (MM/DD/YYYY)."""
+    exp_date = datetime.strptime(exp_date_str, "%m/%d/%Y")
+    return exp_date.date() <= datetime.now().date()
+
+class RequisitionCache:
+    def __init__(self, cache_file, ttl_hours):
+        self.cache_file = cache_file
+        self.ttl_seconds = ttl_hours * 3600
+        self.hits = 0
+        self.misses = 0
+        self.entries = self._load()
+
+    def _read(self):
+        with open(self.cache_file, 'r') as f:
+            return json.load(f)
+
+    def _load(self):
+        # R# -> time this process dropped it, so a merge does not bring it back
+        self.removed = {}
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            entries = self._read()
+            logger.info(f"Loaded {len(entries)} cached requisitions from {self.cache_file}")
+            return entries
+        except Exception as e:
+            logger.error(f"Failed to load requisition cache, starting empty: {str(e)}")
+            return {}
+
+    def _merge_from_disk(self):
+        # Worker processes share the file; keep what the others cached since it was loaded
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            on_disk = self._read()
+        except Exception as e:
+            logger.warning(f"Could not re-read requisition cache before saving: {str(e)}")
+            return
+        for r_number, entry in on_disk.items():
+            cached_at = entry.get("cached_at", 0)
+            if cached_at <= self.removed.get(r_number, -1):
+                continue
+            mine = self.entries.get(r_number)
+            if mine is None or cached_at > mine.get("cached_at", 0):
+                self.entries[r_number] = entry
+
+    def _save(self):
+        try:
+            self._merge_from_disk()
+            tmp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            logger.error(f"Failed to save requisition cache: {str(e)}")
+
+    def _is_valid(self, entry):
+        # Entries without cached_at or exp_date (hand-edited, older format) count as stale
+        try:
+            if time.time() - entry["cached_at"] > self.ttl_seconds:
+                return False
+            return not requisition_expired(entry["exp_date"])
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    def get(self, r_number):
+        entry = self.entries.get(r_number)
+        if entry and self._is_valid(entry):
+            self.hits += 1
+            logger.info(f"Requisition cache hit for R#: {r_number}")
+            return entry["gl_account"], entry["exp_date"]
+
+        self.misses += 1
+        if entry:
+            logger.info(f"Requisition cache entry for R# {r_number} is stale, removing it")
+            del self.entries[r_number]
+            self.removed[r_number] = time.time()
+            self._save()
+        else:
+            logger.info(f"Requisition cache miss for R#: {r_number}")
+        return None
+
+    def put(self, r_number, gl_account, exp_date, save=True):
+        self.entries[r_number] = {
+            "gl_account": gl_account,
+            "exp_date": exp_date,
+            "cached_at": time.time()
+        }
+        if save:
+            self._save()
+
+    def warm_from_csv(self, csv_file):
+        logger.info(f"Pre-warming requisition cache from {csv_file}")
+        loaded = 0
+        with open(csv_file, 'r', newline='') as f:
+            reader = csv.DictReader(f)
+            columns = {}
+            for field, aliases in CSV_COLUMNS.items():
+                for header in reader.fieldnames or []:
+                    if header.strip().lower() in aliases:
+                        columns[field] = header
+                        break
+            if len(columns) != len(CSV_COLUMNS):
+                missing = [field for field in CSV_COLUMNS if field not in columns]
+                logger.error(f"Requisition CSV is missing columns: {missing}")
+                return 0
+
+            for row in reader:
+                r_number = (row[columns["r_number"]] or "").strip()
+                gl_account = (row[columns["gl_account"]] or "").strip()
+                exp_date = (row[columns["exp_date"]] or "").strip()
+                if not r_number or not gl_account or not exp_date:
+                    continue
+                self.put(r_number, gl_account, exp_date, save=False)
+                loaded += 1
+
+        self._save()
+        logger.info(f"Pre-warmed {loaded} requisitions")
+        return loaded
+
+    def log_stats(self):
+        total = self.hits + self.misses
+        hit_rate = (self.hits / total * 100) if total else 0.0
+        logger.info(f"Requisition cache stats - hits: {self.hits}, misses: {self.misses}, hit rate: {hit_rate:.0f}%")
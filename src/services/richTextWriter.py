@@ -0,0 +1,102 @@
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.keys import Keys
+from services.waitService import WaitService
+import logging
+
+logger = logging.getLogger('RichTextWriter')
+
+# Replaces the content of every editor with the same plain text. The text is a
+# script argument and is never parsed as HTML. Tiptap exposes its editor on
+# the .ProseMirror element; plain ProseMirror gets the text through its paste
+# handler; if nothing handles the paste, a text-only paragraph is written and
+# ProseMirror's DOM observer parses it. Returns the path used per editor.
+FILL_EDITORS_SCRIPT = """
+const [editors, text] = arguments;
+return editors.map(el => {
+    if (!el) { return null; }
+    el.scrollIntoView({block: 'center'});
+    el.focus();
+    if (el.editor && el.editor.commands) {
+        el.editor.commands.setContent({type: 'doc', content: [{type: 'paragraph', content: [{type: 'text', text: text}]}]});
+        return 'tiptap';
+    }
+    const range = document.createRange();
+    range.selectNodeContents(el);
+    const selection = window.getSelection();
+    selection.removeAllRanges();
+    selection.addRange(range);
+    const data = new DataTransfer();
+    data.setData('text/plain', text);
+    const paste = new ClipboardEvent('paste', {clipboardData: data, bubbles: true, cancelable: true});
+    el.dispatchEvent(paste);
+    if (paste.defaultPrevented) { return 'paste'; }
+    const paragraph = document.createElement('p');
+    paragraph.textContent = text;
+    el.replaceChildren(paragraph);
+    el.dispatchEvent(new InputEvent('input', {bubbles: true, inputType: 'insertFromPaste'}));
+    return 'dom';
+});
+"""
+
+# Each editor's text as the editor itself sees it
+READ_EDITORS_SCRIPT = """
+return arguments[0].map(el => {
+    if (!el || !el.isConnected) { return null; }
+    return el.editor && el.editor.getText ? el.editor.getText() : el.innerText;
+});
+"""
+
+def _same_text(actual, expected, exact=False):
+    if actual is None:
+        return False
+    if exact:
+        # Only the trailing newline innerText adds after the last paragraph is ignored
+        return actual.strip("\n") == expected.strip("\n")
+    return " ".join(actual.split()) == " ".join(expected.split())
+
+class editors_show:
+    def __init__(self, editors, text, exact=False):
+        self.editors = editors
+        self.text = text
+        self.exact = exact
+        self.failed = list(range(len(editors)))
+
+    def __call__(self, driver):
+        texts = driver.execute_script(READ_EDITORS_SCRIPT, self.editors)
+        self.failed = [index for index, actual in enumerate(texts) if not _same_text(actual, self.text, self.exact)]
+        return not self.failed
+
+class RichTextWriter:
+    """Fills ProseMirror/Tiptap editors in one script call and checks what the editors hold afterwards."""
+
+    def __init__(self, driver, waits=None):
+        self.driver = driver
+        self.waits = waits or WaitService(driver)
+
+    def write(self, editors, text, replaces=0.0):
+        """Sets every editor to text; returns the indexes of editors that still do not show it."""
+        paths = self.driver.execute_script(FILL_EDITORS_SCRIPT, editors, text)
+        logger.debug(f"Rich text paths: {paths}")
+
+        check = editors_show(editors, text)
+        if self.waits.until(check, f"{len(editors)} rich text editors updated", replaces, soft=True):
+            logger.info(f"Filled {len(editors)} rich text editors in one pass")
+            return []
+
+        logger.warning(f"Editors {check.failed} did not take the text, typing it instead")
+        failed = check.failed
+        for index in failed:
+            try:
+                # Select whatever a half-applied script left so the typing replaces it
+                (ActionChains(self.driver).move_to_element(editors[index]).click()
+                    .key_down(Keys.CONTROL).send_keys("a").key_up(Keys.CONTROL)
+                    .send_keys(text).perform())
+            except Exception as e:
+                logger.error(f"Typing into editor #{index + 1} failed: {str(e)}")
+
+        typed = [editors[index] for index in failed]
+        retyped = editors_show(typed, text, exact=True)
+        if not self.waits.until(retyped, "typed rich text", soft=True):
+            logger.error(f"Editors {[failed[i] for i in retyped.failed]} do not show exactly the instructions")
+            return [failed[i] for i in retyped.failed]
+        return []
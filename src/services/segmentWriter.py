@@ -0,0 +1,94 @@
+from selenium.webdriver.common.action_chains import ActionChains
+from services.waitService import WaitService, segments_show
+from datetime import datetime
+import logging
+
+logger = logging.getLogger('SegmentWriter')
+
+TIME_FORMATS = ("%I:%M %p", "%I:%M%p", "%I %p", "%H:%M")
+
+# Segment elements for [[scope, label, type], ...]; scope narrows the search to
+# a container, label matches React Aria's "<type>, <field label>" aria-label
+FIND_SEGMENTS_SCRIPT = """
+const found = arguments[0].map(([scope, label, type]) => {
+    const root = scope ? document.querySelector(scope) : document;
+    if (!root) { return null; }
+    const selector = `[data-segment-type="${type}"]` + (label ? `[aria-label="${type}, ${label}"]` : '');
+    return root.querySelector(selector);
+});
+const first = found.find(el => el);
+if (first) { first.scrollIntoView({block: 'center'}); }
+return found;
+"""
+
+def date_segments(value):
+    return {"month": f"{value.month:02d}", "day": f"{value.day:02d}", "year": f"{value.year:04d}"}
+
+def time_segments(value):
+    return {"hour": value.strftime("%I"), "minute": value.strftime("%M"), "dayPeriod": value.strftime("%p")}
+
+def date_field(label, value, scope=None):
+    """(scope, label, segments) for a date picker such as "Start Date"."""
+    return (scope, label, date_segments(value))
+
+def time_field(scope, value, label=None):
+    """(scope, label, segments) for a time field such as the one in #startTime."""
+    return (scope, label, time_segments(value))
+
+def parse_time(text, default):
+    """Time of day from T2 text such as "7:00 AM", or default when missing or unreadable."""
+    text = (text or "").strip().upper()
+    for time_format in TIME_FORMATS:
+        try:
+            return datetime.strptime(text, time_format).time()
+        except ValueError:
+            continue
+    if text:
+        logger.warning(f"Unrecognised time '{text}', using {default.strftime('%I:%M %p')}")
+    return default
+
+class SegmentWriter:
+    """Writes React Aria style date/time fields (data-segment-type segments) in one Actions command.
+
+    Segments only react to key events, so every segment is clicked and typed
+    in one W3C action chain; the rendered values are then checked in one
+    script call and only segments that did not take are typed again one by one.
+    """
+
+    def __init__(self, driver, waits=None):
+        self.driver = driver
+        self.waits = waits or WaitService(driver)
+
+    def write(self, fields, replaces=0.0):
+        """Fills [(scope, label, {segment type: value})]; returns False if a segment is missing or wrong."""
+        plan = [(scope, label, segment_type, value) for scope, label, segments in fields for segment_type, value in segments.items()]
+        elements = self.driver.execute_script(FIND_SEGMENTS_SCRIPT, [[scope, label, segment_type] for scope, label, segment_type, value in plan])
+
+        missing = [f"{segment_type} of {label or scope}" for (scope, label, segment_type, value), element in zip(plan, elements) if not element]
+        if missing:
+            logger.error(f"Date/time segments not found: {', '.join(missing)}")
+            return False
+
+        segments = [(element, value) for element, (scope, label, segment_type, value) in zip(elements, plan)]
+        try:
+            actions = ActionChains(self.driver)
+            for element, value in segments:
+                actions.click(element).send_keys(value)
+            actions.perform()
+        except Exception as e:
+            logger.warning(f"Batched segment input failed, typing segments one by one: {str(e)}")
+
+        check = segments_show(segments)
+        if self.waits.until(check, f"{len(segments)} date/time segments", replaces, soft=True):
+            logger.info(f"Wrote {len(segments)} date/time segments in one pass")
+            return True
+
+        logger.warning(f"{len(check.failed)} segment(s) did not take, typing them one by one")
+        for index in check.failed:
+            element, value = segments[index]
+            scope, label, segment_type, _ = plan[index]
+            self.driver.execute_script("arguments[0].click();", element)
+            element.send_keys(value)
+            if not self.waits.segment(element, value, f"{segment_type} of {label or scope}"):
+                return False
+        return True
@@ -0,0 +1,215 @@
+from selenium.common.exceptions import WebDriverException
+from services.waitService import WaitService
+from services.t2FetchService import cookie_matches_host
+from urllib.parse import urlparse
+import json
+import time
+import logging
+
+logger = logging.getLogger('SessionService')
+
+# Page that needs a login, the login form field it shows (or redirects to)
+# without one, and an element only a logged-in page has: T2's Log Out link,
+# Offstreet's links into the events pages
+SESSION_SITES = {
+    "t2": {
+        "probe": "/default.aspx",
+        "login_form": "#ctl00_pageContent_UserID_T2FormTextBox_TextBox",
+        "logged_in": "a[href*='logout' i], a[id*='logout' i]"
+    },
+    "offstreet": {
+        "probe": "/dashboard",
+        "login_form": "#password",
+        "logged_in": "a[href*='/events']"
+    }
+}
+
+COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite")
+
+SESSION_STATE_SCRIPT = """
+return {
+    origin: location.origin,
+    path: location.pathname,
+    login: !!document.querySelector(arguments[0]),
+    loggedIn: !!document.querySelector(arguments[1])
+};
+"""
+
+READ_LOCAL_STORAGE_SCRIPT = "return Object.assign({}, window.localStorage);"
+
+# Registered before the probe navigation so the page's own scripts already see
+# the restored items; does nothing on other origins
+SEED_LOCAL_STORAGE_SCRIPT = """
+(function (origin, items) {
+    if (location.origin !== origin) { return; }
+    Object.entries(items).forEach(([key, value]) => localStorage.setItem(key, value));
+})(%s, %s);
+"""
+
+WRITE_LOCAL_STORAGE_SCRIPT = """
+Object.entries(arguments[0]).forEach(([key, value]) => localStorage.setItem(key, value));
+"""
+
+def origin_of(url):
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+def to_cookie_param(cookie):
+    """CDP Network.setCookies parameters from a CDP or WebDriver cookie."""
+    param = {field: cookie[field] for field in COOKIE_FIELDS if cookie.get(field) is not None}
+    expires = cookie.get("expires", cookie.get("expiry"))
+    # CDP reports session cookies with expires -1; they are restored as session cookies
+    if expires and expires > 0 and not cookie.get("session"):
+        param["expires"] = expires
+    return param
+
+class session_active:
+    """Holds once the page shows the site's logged-in marker and no login form."""
+
+    def __init__(self, origin, site, path=None):
+        self.origin = origin
+        self.login_form = SESSION_SITES[site]["login_form"]
+        self.logged_in = SESSION_SITES[site]["logged_in"]
+        self.path = path
+
+    def __call__(self, driver):
+        try:
+            state = driver.execute_script(SESSION_STATE_SCRIPT, self.login_form, self.logged_in)
+        except WebDriverException:
+            # The page is still navigating
+            return False
+        if state["origin"] != self.origin or state["login"] or not state["loggedIn"]:
+            return False
+        return self.path is None or state["path"].lower().startswith(self.path.lower())
+
+class SessionService:
+    """Saves T2/Offstreet cookies and localStorage after a form login and restores them on the next launch.
+
+    Sessions are encrypted by the CredentialManager and keyed by site and
+    account. A restored session is checked with one load of a page that needs
+    a login; it counts as restored only once that page shows an element
+    logged-in pages have, otherwise the login forms run.
+    """
+
+    def __init__(self, driver, cred_manager, ttl_hours, waits=None):
+        self.driver = driver
+        self.cred_manager = cred_manager
+        self.ttl_hours = ttl_hours
+        self.waits = waits or WaitService(driver)
+        # Sessions loaded by prepare and awaiting verify, by site
+        self.pending = {}
+
+    def _base_path(self, base_url):
+        return urlparse(base_url).path.rstrip("/")
+
+    def _cookies(self, base_url):
+        host = urlparse(base_url).hostname or ""
+        try:
+            # CDP returns cookies for every domain, including HttpOnly ones set during redirects
+            cookies = self.driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+        except Exception as e:
+            logger.debug(f"CDP cookie read unavailable, using current page cookies: {str(e)}")
+            cookies = self.driver.get_cookies()
+        return [to_cookie_param(c) for c in cookies if cookie_matches_host(c.get("domain"), host)]
+
+    def save(self, site, base_url, account):
+        """Stores the session once the login has settled; returns False if it could not be captured."""
+        try:
+            check = session_active(origin_of(base_url), site)
+            if not self.waits.until(check, f"{site} login to settle", timeout=self.waits.profile["timeout"], soft=True):
+                logger.warning(f"{site} login did not settle, session not saved")
+                return False
+            cookies = self._cookies(base_url)
+            local_storage = self.driver.execute_script(READ_LOCAL_STORAGE_SCRIPT) or {}
+            self.cred_manager.save_session(site, account, {"cookies": cookies, "local_storage": local_storage})
+            logger.info(f"Saved {site} session: {len(cookies)} cookies, {len(local_storage)} localStorage items")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save {site} session: {str(e)}")
+            return False
+
+    def restore(self, site, base_url, account):
+        """Loads the saved session into the browser; True if the probe page shows it logged in."""
+        probe_url = self.prepare(site, base_url, account)
+        if probe_url is None:
+            return False
+        try:
+            self.driver.get(probe_url)
+        except Exception as e:
+            logger.error(f"Failed to load the {site} probe page: {str(e)}")
+        return self.verify(site, base_url, account)
+
+    def prepare(self, site, base_url, account):
+        """Sets the saved cookies and localStorage seed for the current tab; returns the probe URL, or None without a session.
+
+        The caller loads the probe URL (possibly in a background tab) and then calls verify.
+        """
+        session = self.cred_manager.load_session(site, account, self.ttl_hours)
+        if not session:
+            logger.info(f"No saved {site} session for {account}")
+            return None
+
+        origin = origin_of(base_url)
+        pending = {"session": session, "seed_id": None, "started": time.time()}
+        try:
+            self._set_cookies(session["cookies"], base_url)
+            if session["local_storage"]:
+                pending["seed_id"] = self._seed_local_storage(origin, session["local_storage"])
+        except Exception as e:
+            logger.error(f"Failed to load saved {site} session: {str(e)}")
+            self.cred_manager.forget_session(site)
+            return None
+        self.pending[site] = pending
+        return origin + self._base_path(base_url) + SESSION_SITES[site]["probe"]
+
+    def verify(self, site, base_url, account):
+        """Checks the loaded probe page; a rejected session is dropped so the form login can run."""
+        pending = self.pending.pop(site)
+        session = pending["session"]
+        origin = origin_of(base_url)
+        try:
+            if session["local_storage"] and pending["seed_id"] is None:
+                self.driver.execute_script(WRITE_LOCAL_STORAGE_SCRIPT, session["local_storage"])
+                self.driver.refresh()
+
+            # Sites may render or redirect to their login page from script after
+            # the load, so wait for the logged-in marker rather than checking once
+            check = session_active(origin, site, self._base_path(base_url) + SESSION_SITES[site]["probe"])
+            if self.waits.until(check, f"restored {site} session", timeout=self.waits.profile["timeout"], soft=True):
+                logger.info(f"Restored {site} session for {account} in {time.time() - pending['started']:.2f}s")
+                return True
+            logger.info(f"Saved {site} session was rejected, logging in with the form")
+        except Exception as e:
+            logger.error(f"Failed to restore {site} session: {str(e)}")
+        finally:
+            if pending["seed_id"] is not None:
+                self._remove_seed(pending["seed_id"])
+        self.cred_manager.forget_session(site)
+        return False
+
+    def _set_cookies(self, cookies, base_url):
+        try:
+            self.driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+        except Exception as e:
+            # WebDriver can only set cookies for the page it is on
+            logger.debug(f"CDP cookie write unavailable, adding cookies on {base_url}: {str(e)}")
+            self.driver.get(base_url)
+            for cookie in cookies:
+                cookie = dict(cookie)
+                if "expires" in cookie:
+                    cookie["expiry"] = int(cookie.pop("expires"))
+                self.driver.add_cookie(cookie)
+
+    def _seed_local_storage(self, origin, items):
+        try:
+            source = SEED_LOCAL_STORAGE_SCRIPT % (json.dumps(origin), json.dumps(items))
+            return self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})["identifier"]
+        except Exception as e:
+            logger.debug(f"CDP script injection unavailable, writing localStorage after load: {str(e)}")
+            return None
+
+    def _remove_seed(self, seed_id):
+        try:
+            self.driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": seed_id})
+        except Exception as e:
+            logger.debug(f"Could not remove localStorage seed script: {str(e)}")
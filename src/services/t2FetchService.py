@@ -0,0 +1,261 @@
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse
+import re
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger('T2Fetch')
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+POSTBACK_PATTERN = re.compile(r"__doPostBack\('([^']*)','([^']*)'\)")
+
+R_NUMBER_ID = "MySettings_custom_Reservation_REQ_NUMBER_T2Label_Label"
+REQUISITION_LINK_ID = "MySettings_ResponsibleThirdPartyLink_T2FormLinkButton"
+GL_ACCOUNT_ID = "ctl00_pageContent_MySettings_custom_ThirdParty_ACCT_NUMBER_T2Label_Label"
+EXP_DATE_ID = "ctl00_pageContent_MySettings_custom_ThirdParty_REQ_EXP_DATE_T2Label_Label"
+LOGIN_FIELD_ID = "ctl00_pageContent_UserID_T2FormTextBox_TextBox"
+
+
+class T2Node:
+    def __init__(self, tag, attrs, parent=None):
+        self.tag = tag
+        self.attrs = dict(attrs)
+        self.parent = parent
+        self.children = []
+
+    @property
+    def classes(self):
+        return (self.attrs.get("class") or "").split()
+
+    def iter(self):
+        for child in self.children:
+            if isinstance(child, T2Node):
+                yield child
+                yield from child.iter()
+
+    def find(self, tag=None, class_name=None, element_id=None):
+        for node in self.iter():
+            if tag and node.tag != tag:
+                continue
+            if class_name and class_name not in node.classes:
+                continue
+            if element_id and node.attrs.get("id") != element_id:
+                continue
+            return node
+        return None
+
+    def find_all(self, tag=None, class_name=None):
+        return [
+            node for node in self.iter()
+            if (not tag or node.tag == tag) and (not class_name or class_name in node.classes)
+        ]
+
+    @property
+    def text(self):
+        parts = []
+        for child in self.children:
+            parts.append(child.text if isinstance(child, T2Node) else child)
+        # Collapse whitespace the way WebElement.text reports it
+        return " ".join("".join(parts).split())
+
+
+class T2PageParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = T2Node("document", {})
+        self.current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        node = T2Node(tag, attrs, self.current)
+        self.current.children.append(node)
+        if tag not in VOID_TAGS:
+            self.current = node
+
+    def handle_startendtag(self, tag, attrs):
+        self.current.children.append(T2Node(tag, attrs, self.current))
+
+    def handle_endtag(self, tag):
+        node = self.current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        if self.current.tag not in ("script", "style"):
+            self.current.children.append(data)
+
+
+def parse_page(html):
+    parser = T2PageParser()
+    parser.feed(html)
+    parser.close()
+    return parser.root
+
+
+def cookie_matches_host(domain, host):
+    """True if a cookie for domain is sent to host: the exact host or a subdomain of it."""
+    domain = (domain or "").lstrip(".").lower()
+    host = (host or "").lower()
+    return bool(domain) and (host == domain or host.endswith("." + domain))
+
+
+def find_by_id(root, element_id):
+    return root.find(element_id=element_id)
+
+
+def parse_t2_rows(root):
+    data = {}
+    for row in root.find_all(class_name="T2FormRow"):
+        label_elem = row.find(class_name="T2FormLabelReadOnly") or row.find(class_name="T2FormLabelRequired")
+        value_cell = row.find(class_name="T2FormControlCell")
+        if not label_elem or not value_cell:
+            continue
+        label_span = label_elem.find(tag="span")
+        if not label_span:
+            continue
+
+        value = ""
+        value_elem = value_cell.find(tag="span") or value_cell.find(tag="a")
+        if value_elem:
+            value = value_elem.text
+        data[label_span.text] = value
+    return data
+
+
+class T2FetchService:
+    def __init__(self, base_url, cookies=None, user_agent=None, timeout=15):
+        logger.info("Initializing T2FetchService")
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.last_page = None
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if user_agent:
+            self.session.headers["User-Agent"] = user_agent
+        if cookies:
+            self.load_cookies(cookies)
+
+    @classmethod
+    def from_driver(cls, driver, base_url):
+        service = cls(base_url)
+        service.copy_cookies_from_driver(driver)
+        try:
+            service.session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent;")
+        except Exception as e:
+            logger.debug(f"Could not read browser user agent: {str(e)}")
+        return service
+
+    def copy_cookies_from_driver(self, driver):
+        host = urlparse(self.base_url).hostname or ""
+        try:
+            # CDP returns cookies for every domain, not just the current tab's
+            cookies = driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+        except Exception as e:
+            logger.debug(f"CDP cookie read unavailable, using current page cookies: {str(e)}")
+            cookies = driver.get_cookies()
+
+        t2_cookies = [c for c in cookies if cookie_matches_host(c.get("domain"), host)]
+        self.load_cookies(t2_cookies)
+        logger.info(f"Copied {len(t2_cookies)} T2 session cookies from browser")
+        return len(t2_cookies)
+
+    def load_cookies(self, cookies):
+        self.session.cookies.clear()
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain"),
+                path=cookie.get("path", "/")
+            )
+
+    def _get(self, url):
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def _is_login_page(self, root):
+        return find_by_id(root, LOGIN_FIELD_ID) is not None
+
+    def fetch_reservation(self, reservation_id):
+        self.last_page = None
+        try:
+            url = f"{self.base_url}/reservation/view.aspx?id={reservation_id}&addtoqueue=1"
+            logger.info(f"Fetching T2 reservation page over HTTP: {url}")
+            response = self._get(url)
+            root = parse_page(response.text)
+            if self._is_login_page(root):
+                logger.error("T2 session cookies were rejected (login page returned)")
+                return None
+
+            t2_data = parse_t2_rows(root)
+            if not t2_data:
+                logger.error("No T2FormRow data found in reservation page")
+                return None
+            self.last_page = (response, root)
+            logger.info(f"Fetched {len(t2_data)} T2 fields over HTTP")
+            return t2_data
+        except Exception as e:
+            logger.error(f"Error fetching T2 reservation over HTTP: {str(e)}")
+            return None
+
+    def get_r_number(self):
+        if not self.last_page:
+            return None
+        r_elem = find_by_id(self.last_page[1], R_NUMBER_ID) or find_by_id(self.last_page[1], f"ctl00_pageContent_{R_NUMBER_ID}")
+        return r_elem.text.strip() if r_elem else None
+
+    def _follow_requisition_link(self, response, root):
+        link = find_by_id(root, REQUISITION_LINK_ID) or find_by_id(root, f"ctl00_pageContent_{REQUISITION_LINK_ID}")
+        if link is None:
+            logger.error("Requisition link not found in reservation page")
+            return None
+
+        href = link.attrs.get("href", "")
+        postback = POSTBACK_PATTERN.search(href)
+        if not postback:
+            return self._get(urljoin(response.url, href))
+
+        # ASP.NET LinkButton: replay the postback with the page's hidden fields
+        form = root.find(tag="form")
+        if form is None:
+            logger.error("Reservation page has no form to post back")
+            return None
+        fields = {
+            node.attrs["name"]: node.attrs.get("value", "")
+            for node in form.find_all(tag="input")
+            if node.attrs.get("name") and node.attrs.get("type", "").lower() == "hidden"
+        }
+        fields["__EVENTTARGET"] = postback.group(1)
+        fields["__EVENTARGUMENT"] = postback.group(2)
+        action = urljoin(response.url, form.attrs.get("action") or response.url)
+        post_response = self.session.post(action, data=fields, timeout=self.timeout)
+        post_response.raise_for_status()
+        return post_response
+
+    def fetch_requisition(self):
+        """Reads (gl_account, exp_date_str) for the last fetched reservation; missing values are None."""
+        if not self.last_page:
+            logger.error("No reservation page fetched yet")
+            return None, None
+        try:
+            requisition = self._follow_requisition_link(*self.last_page)
+            if requisition is None:
+                return None, None
+            requisition_root = parse_page(requisition.text)
+            gl_elem = find_by_id(requisition_root, GL_ACCOUNT_ID)
+            exp_elem = find_by_id(requisition_root, EXP_DATE_ID)
+            gl_account = gl_elem.text.strip() if gl_elem else None
+            exp_date = exp_elem.text.strip() if exp_elem else None
+            logger.info(f"Fetched requisition over HTTP - GL: {gl_account}, Exp: {exp_date}")
+            return gl_account, exp_date
+        except Exception as e:
+            logger.error(f"Error fetching requisition over HTTP: {str(e)}")
+            return None, None
+
+    def close(self):
+        self.session.close()
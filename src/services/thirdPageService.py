@@ -1,38 +1,121 @@
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from services.waitService import WaitService
+from services.tracer import traced
+from services.lotMatcher import get_matcher
+from services.domSnapshot import DomSnapshot
 import random
 import logging
-import time
 
 logger = logging.getLogger('ThirdPage')
 
+# True once the results table only shows rows matching the search term
+SEARCH_RESULTS_FILTERED_SCRIPT = """
+const rows = Array.from(document.querySelectorAll('tbody tr'));
+return rows.length > 0 && rows.every(row => row.innerText.toLowerCase().includes(arguments[0]));
+"""
+
+# Checkbox of the row with the given location ID (or exact name when rows carry no ID)
+ROW_CHECKBOX_SCRIPT = """
+const [id, name] = arguments;
+for (const row of document.querySelectorAll('tbody tr')) {
+    const cell = row.querySelector('td:nth-child(2)');
+    if ((id && row.dataset.id === String(id)) || (cell && cell.innerText.trim() === name)) {
+        return row.querySelector("td:first-child span[role='checkbox']");
+    }
+}
+return null;
+"""
+
 class ThirdPageService:
-    def __init__(self, driver):
+    def __init__(self, driver, location_catalog=None):
         logger.info("Initializing ThirdPageService")
         self.driver = driver
+        self.location_catalog = location_catalog
         self.wait = WebDriverWait(self.driver, 10)
+        self.waits = WaitService(self.driver)
+        self.snapshot = DomSnapshot(self.driver)
 
     def log_all_options(self, location_element):
         logger.info("Retrieving available parking locations")
-        options = location_element.find_elements(By.TAG_NAME, "option")
-        valid_options = [opt for opt in options if opt.get_attribute("value")]
+        options = self.snapshot.options(location_element, ("data-name", "data-country"))
+        valid_options = [opt for opt in options if opt["value"]]
         logger.info(f"Found {len(valid_options)} available parking locations")
         
         for option in valid_options:
-            value = option.get_attribute("value")
-            name = option.get_attribute("data-name")
-            country = option.get_attribute("data-country")
-            logger.debug(f"Location option - ID: {value:5} | Name: {name:40} | Country: {country}")
+            name = option["attributes"]["data-name"] or ""
+            country = option["attributes"]["data-country"]
+            logger.debug(f"Location option - ID: {option['value']:5} | Name: {name:40} | Country: {country}")
+        if self.location_catalog:
+            # The dropdown lists every location, so it doubles as a full refresh
+            self.location_catalog.update(
+                [{"id": opt["value"], "name": opt["text"], "data_name": opt["attributes"]["data-name"]} for opt in valid_options],
+                refreshed=True
+            )
         return valid_options
 
+    def location_rows(self):
+        return self.snapshot.table_rows(attributes=("data-id",))
+
+    def remember_table_locations(self, rows=None, refreshed=False):
+        if not self.location_catalog:
+            return
+        try:
+            rows = self.location_rows() if rows is None else rows
+            self.location_catalog.update(
+                [{"id": row["attributes"]["data-id"], "name": row["cells"][1]} for row in rows if len(row["cells"]) > 1],
+                refreshed
+            )
+        except Exception as e:
+            logger.warning(f"Failed to record locations from the table: {str(e)}")
+
+    @traced()
+    def select_location_from_catalog(self, t2_data):
+        """Ticks the requested lot straight from the catalog, without the live search; False on a miss."""
+        if not self.location_catalog:
+            return False
+        try:
+            if self.location_catalog.is_stale():
+                # The dialog opens with the unfiltered list, which refreshes the catalog
+                if self.waits.count((By.CSS_SELECTOR, "tbody tr"), 1, soft=True):
+                    self.remember_table_locations(refreshed=True)
+
+            location = self.location_catalog.resolve(t2_data.get("Requested Lot", ""))
+            if not location:
+                return False
+
+            checkbox = self.waits.script(
+                ROW_CHECKBOX_SCRIPT, f"row for {location['name']}", location["id"], location["name"], soft=True
+            )
+            if not checkbox:
+                # Long lists may not show every row; narrow the table to the exact catalog name
+                logger.info(f"{location['name']} not listed, searching for it by its catalog name")
+                search_input = self.waits.clickable((By.CSS_SELECTOR, "input#search[placeholder='Search...']"))
+                search_input.clear()
+                search_input.send_keys(location["name"])
+                self.waits.network_idle("location search request")
+                checkbox = self.waits.script(
+                    ROW_CHECKBOX_SCRIPT, f"row for {location['name']}", location["id"], location["name"], soft=True
+                )
+            if not checkbox:
+                logger.warning(f"Catalog location {location['name']} is no longer offered, falling back to live search")
+                self.location_catalog.forget(location)
+                return False
+
+            checkbox.click()
+            logger.info(f"Selected {location['name']} from the location catalog")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to select location from catalog: {str(e)}")
+            return False
+
+    @traced()
     def click_add_locations_button(self):
         logger.info("Clicking 'Add Locations' button")
         try:
             # Using XPath to find the button with "Add Locations" text and the plus icon
-            add_locations_button = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, 
-                "//button[contains(@class, 'inline-flex') and contains(., 'Add Locations')]"))
+            add_locations_button = self.waits.clickable(
+                (By.XPATH, "//button[contains(@class, 'inline-flex') and contains(., 'Add Locations')]")
             )
             
             logger.info("Found 'Add Locations' button")
@@ -43,6 +126,7 @@ class ThirdPageService:
             logger.error(f"Failed to click 'Add Locations' button: {str(e)}")
             return False
     
+    @traced()
     def search_for_location(self, t2_data):
         logger.info("Searching for location in the search bar")
         try:
@@ -54,176 +138,113 @@ class ThirdPageService:
 
             logger.info(f"Searching for requested lot: {requested_lot}")
 
-            search_input = self.wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "input#search[placeholder='Search...']"))
-            )
+            search_input = self.waits.clickable((By.CSS_SELECTOR, "input#search[placeholder='Search...']"))
             search_input.clear()
             search_input.send_keys(requested_lot)
             logger.info(f"Entered '{requested_lot}' in search bar")
 
-            time.sleep(1.5)
+            self.waits.network_idle("location search request", replaces=1.5)
+            self.waits.script(
+                SEARCH_RESULTS_FILTERED_SCRIPT,
+                f"search results filtered to '{requested_lot}'",
+                requested_lot.lower(),
+                soft=True
+            )
             return True
         except Exception as e:
             logger.error(f"Failed to search for location: {str(e)}")
             return False
 
     
+    @traced()
     def select_location_from_search_results(self, t2_data):
         logger.info("Selecting location from search results")
         try:
             requested_lot_full = t2_data.get("Requested Lot", "")
-            requested_lot = requested_lot_full.split()[0] if requested_lot_full else ""
 
-            
-            # Find all rows in the search results table
-            rows = self.driver.find_elements(By.CSS_SELECTOR, "tbody tr")
+            # One snapshot of the search results table instead of a lookup per row
+            rows = self.location_rows()
             logger.info(f"Found {len(rows)} rows in search results")
             
             if not rows:
                 logger.warning("No rows found in search results")
                 return False
-            
-            # Special case for Biggy Structure
-            if "biggy" in requested_lot.lower():
-                logger.info("Looking for Biggy Structure in search results")
-                for row in rows:
-                    location_cell = row.find_element(By.CSS_SELECTOR, "td:nth-child(2)")
-                    location_text = location_cell.text
-                    
-                    if "BIGGY" in location_text.upper():
-                        logger.info(f"Found Biggy Structure: {location_text}")
-                        # Find and click the checkbox in the first cell
-                        checkbox = row.find_element(By.CSS_SELECTOR, "td:first-child span[role='checkbox']")
-                        checkbox.click()
-                        logger.info(f"Selected {location_text}")
-                        return True
-            
-            # Regular case: use scoring to find the best match
-            def match_score(str1, str2):
-                str1 = str1.lower()
-                str2 = str2.lower()
-                count = 0
-                min_len = min(len(str1), len(str2))
-                for i in range(min_len):
-                    if str1[i] == str2[i]:
-                        count += 1
-                return count
-            
-            matches = []
-            for row in rows:
-                try:
-                    location_cell = row.find_element(By.CSS_SELECTOR, "td:nth-child(2)")
-                    location_text = location_cell.text.strip()
-                    
-                    score = match_score(location_text, requested_lot)
-                    matches.append((row, location_text, score))
-                    logger.debug(f"Match score - Location: {location_text:30} | Score: {score:2}")
-                except Exception as e:
-                    logger.error(f"Error processing row: {str(e)}")
-                    continue
-            
+
+            names = [row["cells"][1] if len(row["cells"]) > 1 else "" for row in rows]
+
+            # Rank against the full requested lot; the search box only got its first word
+            matches = get_matcher(names).rank(requested_lot_full)
             if not matches:
                 logger.warning("No valid matches found in search results")
-                # If no matches, select the first row if available
-                if rows:
-                    first_row = rows[0]
-                    checkbox = first_row.find_element(By.CSS_SELECTOR, "td:first-child span[role='checkbox']")
-                    checkbox.click()
-                    logger.info("Selected first row as fallback")
-                    return True
-                return False
-            
-            # Sort by score and select the best match
-            matches.sort(key=lambda x: x[2], reverse=True)
+                # If no matches, select the first row
+                if not self.snapshot.click_row(0, expected_text=names[0]):
+                    return False
+                logger.info("Selected first row as fallback")
+                return True
+
             logger.info("Top 3 matching locations:")
-            for i, (row, location_text, score) in enumerate(matches[:3 if len(matches) >= 3 else len(matches)], 1):
-                logger.info(f"{i}. {location_text:30} | Score: {score:2}")
-            
-            best_match = matches[0]
-            best_row = best_match[0]
-            checkbox = best_row.find_element(By.CSS_SELECTOR, "td:first-child span[role='checkbox']")
-            checkbox.click()
-            logger.info(f"Selected best match: {best_match[1]} with score: {best_match[2]}")
-            
+            for i, (index, location_text, score) in enumerate(matches, 1):
+                logger.info(f"{i}. {location_text:30} | Score: {score:.3f}")
+
+            best_index, best_text, best_score = matches[0]
+            if not self.snapshot.click_row(best_index, expected_text=best_text):
+                return False
+            logger.info(f"Selected best match: {best_text} with score: {best_score:.3f}")
+            self.remember_table_locations(rows)
+
             return True
-            
+
         except Exception as e:
             logger.error(f"Failed to select location from search results: {str(e)}")
             return False
     
     
             
+    @traced()
     def select_location_by_similarity(self, t2_data):
         logger.info("Starting location selection by similarity")
         requested_lot = t2_data.get("Requested Lot", "")
         logger.info(f"Requested parking lot: {requested_lot}")
         
         location_selector = "select[name='locations.0.id']"
-        location_element = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, location_selector)))
-        location_element = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, location_selector)))
+        location_element = self.waits.clickable((By.CSS_SELECTOR, location_selector))
         
         valid_options = self.log_all_options(location_element)
         
         if valid_options and requested_lot:
-            if "biggy" in requested_lot.lower():
-                for option in valid_options:
-                    if "P8 - BIGGY STRUCTURE" in option.text.upper():
-                        logger.info(f"Direct match found for Biggy Structure: {option.text}")
-                        option.click()
-                        return True
-
-            def match_score(str1, str2):
-                str1 = str1.lower()
-                str2 = str2.lower()
-                count = 0
-                min_len = min(len(str1), len(str2))
-                for i in range(min_len):
-                    if str1[i] == str2[i]:
-                        count += 1
-                return count
-            
-            matches = []
-            for option in valid_options:
-                option_text = option.text.strip()
-                score = match_score(option_text, requested_lot)
-                matches.append((option, score))
-                logger.debug(f"Match score - Location: {option_text:30} | Score: {score:2}")
-            
-            matches.sort(key=lambda x: x[1], reverse=True)
+            matches = get_matcher([option["text"] for option in valid_options]).rank(requested_lot)
             logger.info("Top 3 matching locations:")
-            for i, (option, score) in enumerate(matches[:3], 1):
-                logger.info(f"{i}. {option.text:30} | Score: {score:2}")
-            
+            for i, (index, option_text, score) in enumerate(matches, 1):
+                logger.info(f"{i}. {option_text:30} | Score: {score:.3f}")
+
             if matches:
-                best_match = matches[0][0]
-                logger.info(f"Selected best match: {best_match.text} with score: {matches[0][1]}")
-                best_match.click()
-                return True
-            
+                best_index, best_text, best_score = matches[0]
+                logger.info(f"Selected best match: {best_text} with score: {best_score:.3f}")
+                return self.snapshot.select_option(location_element, valid_options[best_index]["index"])
+
         logger.warning("No suitable location match found")
         return False
 
     def select_random_location(self):
         logger.info("Selecting random location")
         location_selector = "#locations\\.0\\.id"
-        location_element = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, location_selector)))
-        location_element = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, location_selector)))
+        location_element = self.waits.clickable((By.CSS_SELECTOR, location_selector))
         
         valid_options = self.log_all_options(location_element)
         
         if valid_options:
             random_option = random.choice(valid_options)
-            logger.info(f"Randomly selected location: {random_option.text}")
-            random_option.click()
-            return True
+            logger.info(f"Randomly selected location: {random_option['text']}")
+            return self.snapshot.select_option(location_element, random_option["index"])
             
         logger.warning("No valid location options found")
         return False
 
+    @traced()
     def click_continue(self):
         try:
             logger.info("Attempting to click continue button")
-            continue_button = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit']")))
+            continue_button = self.waits.clickable((By.CSS_SELECTOR, "button[type='submit']"))
             continue_button.click()
             logger.info("Continue button clicked successfully")
             return True
@@ -231,12 +252,12 @@ class ThirdPageService:
             logger.error(f"Failed to click continue button: {str(e)}")
             return False
             
+    @traced()
     def click_choose_button(self):
         logger.info("Attempting to click Choose button")
         try:
-            choose_button = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, 
-                "//button[contains(@class, 'bg-primary') and text()='Choose']"))
+            choose_button = self.waits.clickable(
+                (By.XPATH, "//button[contains(@class, 'bg-primary') and text()='Choose']")
             )
             
             logger.info("Found Choose button")
@@ -256,17 +277,19 @@ class ThirdPageService:
             # Try the old way as fallback
             return self.select_location_by_similarity(t2_data) and self.click_continue()
         
-        # Then search for the location by name
-        if not self.search_for_location(t2_data):
-            logger.error("Failed to search for location")
-            # Try the old way as fallback
-            return self.select_location_by_similarity(t2_data) and self.click_continue()
-        
-        # Select the location from search results
-        if not self.select_location_from_search_results(t2_data):
-            logger.error("Failed to select location from search results")
-            # Try the old way as fallback
-            return self.select_location_by_similarity(t2_data) and self.click_continue()
+        # Known locations are ticked directly; the live search only runs on a catalog miss
+        if not self.select_location_from_catalog(t2_data):
+            # Then search for the location by name
+            if not self.search_for_location(t2_data):
+                logger.error("Failed to search for location")
+                # Try the old way as fallback
+                return self.select_location_by_similarity(t2_data) and self.click_continue()
+
+            # Select the location from search results
+            if not self.select_location_from_search_results(t2_data):
+                logger.error("Failed to select location from search results")
+                # Try the old way as fallback
+                return self.select_location_by_similarity(t2_data) and self.click_continue()
         
         # Confirm the selection
         # if not self.click_confirm_selection():
@@ -0,0 +1,167 @@
+from contextlib import contextmanager
+from functools import wraps
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+import uuid
+import logging
+import config
+
+logger = logging.getLogger('Tracer')
+
+_local = threading.local()
+_lock = threading.Lock()
+_state = {"file": None, "handle": None}
+
+def configure(trace_file=None):
+    with _lock:
+        if _state["handle"]:
+            _state["handle"].close()
+        _state["file"] = trace_file
+        _state["handle"] = None
+    if trace_file:
+        logger.info(f"Writing latency spans to {trace_file}")
+
+def enabled():
+    return bool(_state["file"])
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+def _write(record):
+    line = json.dumps(record) + "\n"
+    with _lock:
+        if not _state["file"]:
+            return
+        try:
+            if _state["handle"] is None:
+                trace_dir = os.path.dirname(_state["file"])
+                if trace_dir:
+                    os.makedirs(trace_dir, exist_ok=True)
+                _state["handle"] = open(_state["file"], "a")
+            _state["handle"].write(line)
+            _state["handle"].flush()
+        except Exception as e:
+            logger.error(f"Failed to write span, disabling tracing: {str(e)}")
+            _state["file"] = None
+
+@contextmanager
+def span(name, **attrs):
+    if not enabled():
+        yield None
+        return
+
+    stack = _stack()
+    parent = stack[-1] if stack else None
+    current = {
+        "trace_id": parent["trace_id"] if parent else uuid.uuid4().hex[:16],
+        "span_id": uuid.uuid4().hex[:16],
+        "parent_id": parent["span_id"] if parent else None,
+        "name": name,
+        "attrs": attrs
+    }
+    stack.append(current)
+    start = time.time()
+    status = "ok"
+    try:
+        yield current
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        stack.pop()
+        _write({
+            "trace_id": current["trace_id"],
+            "span_id": current["span_id"],
+            "parent_id": current["parent_id"],
+            "name": name,
+            "start": round(start, 4),
+            "duration": round(time.time() - start, 4),
+            "status": status,
+            "depth": len(stack),
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+            "attrs": current["attrs"]
+        })
+
+def traced(name=None):
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    # Nearest-rank percentile
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+def load_spans(paths):
+    spans = []
+    for path in paths:
+        with open(path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    spans.append(json.loads(line))
+                except ValueError:
+                    continue
+    return spans
+
+def summarize(spans):
+    durations = {}
+    for record in spans:
+        durations.setdefault(record["name"], []).append(record["duration"])
+    rows = []
+    for name, values in durations.items():
+        rows.append({
+            "name": name,
+            "count": len(values),
+            "total": sum(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "max": max(values)
+        })
+    rows.sort(key=lambda row: row["total"], reverse=True)
+    return rows
+
+def print_report(rows, out=sys.stdout):
+    out.write(f"{'step':60} {'count':>6} {'p50':>8} {'p95':>8} {'max':>8} {'total':>9}\n")
+    for row in rows:
+        out.write(f"{row['name'][:60]:60} {row['count']:>6} {row['p50']:>8.2f} {row['p95']:>8.2f} {row['max']:>8.2f} {row['total']:>9.1f}\n")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise latency spans per step (seconds)")
+    parser.add_argument("files", nargs="*", help="JSONL span files (defaults to PARKING_TRACE_FILE)")
+    parser.add_argument("--name", help="Only include steps whose name contains this text")
+    args = parser.parse_args(argv)
+
+    files = args.files or ([config.TRACE_FILE] if config.TRACE_FILE else [])
+    if not files:
+        parser.error("no span files given")
+    spans = load_spans(files)
+    if args.name:
+        spans = [record for record in spans if args.name in record["name"]]
+    print_report(summarize(spans))
+
+configure(config.TRACE_FILE)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from services.networkMonitor import NetworkMonitor
+import config
+import time
+import logging
+
+logger = logging.getLogger('Wait')
+
+# Resolves as soon as the condition holds: checked once up front, then on every
+# DOM mutation, with a slow interval as a safety net for style-only changes.
+OBSERVE_SCRIPT = """
+const by = arguments[0], selector = arguments[1], condition = arguments[2], timeoutMs = arguments[3];
+const done = arguments[arguments.length - 1];
+function find() {
+    if (by === 'xpath') {
+        return document.evaluate(selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    return document.querySelector(selector);
+}
+function visible(el) {
+    if (!el.isConnected) { return false; }
+    const style = window.getComputedStyle(el);
+    const rect = el.getBoundingClientRect();
+    return style.visibility !== 'hidden' && style.display !== 'none' && (rect.width > 0 || rect.height > 0);
+}
+function check() {
+    const el = find();
+    if (condition === 'present') { return el; }
+    if (condition === 'visible') { return el && visible(el) ? el : null; }
+    if (condition === 'clickable') { return el && visible(el) && !el.disabled ? el : null; }
+    if (condition === 'invisible') { return !el || !visible(el) ? true : null; }
+    return null;
+}
+const initial = check();
+if (initial) { done(initial); return; }
+let finished = false;
+function finish(result) {
+    if (finished) { return; }
+    finished = true;
+    observer.disconnect();
+    clearInterval(poller);
+    clearTimeout(timer);
+    done(result);
+}
+function recheck() {
+    const result = check();
+    if (result) { finish(result); }
+}
+const observer = new MutationObserver(recheck);
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+const poller = setInterval(recheck, 250);
+const timer = setTimeout(function () { finish(null); }, timeoutMs);
+"""
+
+def to_observer_locator(locator):
+    by, value = locator
+    if by == By.XPATH:
+        return "xpath", value
+    if by == By.CSS_SELECTOR:
+        return "css", value
+    if by == By.ID:
+        return "css", f'[id="{value}"]'
+    if by == By.NAME:
+        return "css", f'[name="{value}"]'
+    if by == By.CLASS_NAME:
+        return "css", f".{value}"
+    if by == By.TAG_NAME:
+        return "css", value
+    return None
+
+def get_timing_profile(name=None):
+    name = name or config.TIMING_PROFILE
+    if name not in config.TIMING_PROFILES:
+        logger.warning(f"Unknown timing profile '{name}', using default")
+        name = "default"
+    return config.TIMING_PROFILES[name]
+
+def is_toggle_on(element):
+    # Offstreet switches expose state through aria-checked and the active colour class
+    return element.get_attribute("aria-checked") == "true" or "bg-primary-600" in (element.get_attribute("class") or "")
+
+def _normalize(value):
+    return "".join(ch for ch in str(value).lower() if ch.isalnum())
+
+def value_matches(actual, expected):
+    """Field value comparison that ignores formatting; numeric values compare as numbers ("41.0" == "$41.00")."""
+    if actual is None:
+        return False
+    try:
+        return float("".join(ch for ch in str(actual) if ch.isdigit() or ch == ".")) == float(expected)
+    except (TypeError, ValueError):
+        return _normalize(actual) == _normalize(expected)
+
+class toggle_in_state:
+    def __init__(self, locator, on=True):
+        self.locator = locator
+        self.on = on
+
+    def __call__(self, driver):
+        element = driver.find_element(*self.locator)
+        return element if is_toggle_on(element) == self.on else False
+
+class value_committed:
+    def __init__(self, element, value):
+        self.element = element
+        self.value = _normalize(value)
+
+    def __call__(self, driver):
+        return _normalize(self.element.get_attribute("value") or "") == self.value
+
+READ_VALUES_SCRIPT = """
+return arguments[0].map(selector => {
+    const el = document.querySelector(selector);
+    return el ? el.value : null;
+});
+"""
+
+class values_committed:
+    """Like value_committed for {css selector: value}, reading every field in one script call."""
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.failed = list(fields)
+
+    def __call__(self, driver):
+        selectors = list(self.fields)
+        values = driver.execute_script(READ_VALUES_SCRIPT, selectors)
+        self.failed = [
+            selector for selector, value in zip(selectors, values)
+            if not value_matches(value, self.fields[selector])
+        ]
+        return not self.failed
+
+def _segment_matches(text, value):
+    text = (text or "").strip()
+    value = str(value)
+    if text.isdigit() and value.isdigit():
+        return int(text) == int(value)
+    return _normalize(text) == _normalize(value)
+
+class segment_shows:
+    def __init__(self, element, value):
+        self.element = element
+        self.value = str(value)
+
+    def __call__(self, driver):
+        return _segment_matches(self.element.text, self.value)
+
+READ_TEXTS_SCRIPT = """
+return arguments[0].map(el => el && el.isConnected ? el.innerText : null);
+"""
+
+class segments_show:
+    """Like segment_shows for [(element, value)], reading every segment in one script call."""
+
+    def __init__(self, segments):
+        self.segments = segments
+        self.failed = list(range(len(segments)))
+
+    def __call__(self, driver):
+        texts = driver.execute_script(READ_TEXTS_SCRIPT, [element for element, value in self.segments])
+        self.failed = [
+            index for index, ((element, value), text) in enumerate(zip(self.segments, texts))
+            if text is None or not _segment_matches(text, value)
+        ]
+        return not self.failed
+
+class element_enabled:
+    def __init__(self, locator):
+        self.locator = locator
+
+    def __call__(self, driver):
+        element = driver.find_element(*self.locator)
+        if element.is_enabled() and element.get_attribute("aria-disabled") != "true":
+            return element
+        return False
+
+class element_count_at_least:
+    def __init__(self, locator, minimum):
+        self.locator = locator
+        self.minimum = minimum
+
+    def __call__(self, driver):
+        elements = driver.find_elements(*self.locator)
+        return elements if len(elements) >= self.minimum else False
+
+class script_returns_true:
+    def __init__(self, script, *args):
+        self.script = script
+        self.args = args
+
+    def __call__(self, driver):
+        return driver.execute_script(self.script, *self.args)
+
+class WaitService:
+    def __init__(self, driver, profile=None):
+        self.driver = driver
+        self.profile = get_timing_profile(profile)
+
+    def _log_wait(self, description, elapsed, replaces):
+        if replaces:
+            logger.info(f"Waited {elapsed:.2f}s for {description} (replaced {replaces}s sleep, saved {replaces - elapsed:.2f}s)")
+        else:
+            logger.debug(f"Waited {elapsed:.2f}s for {description}")
+
+    def until(self, condition, description, replaces=0.0, timeout=None, soft=False):
+        """Waits for condition and logs the time taken against the fixed sleep it replaced.
+
+        Soft waits are best-effort checks: on timeout they log a warning and
+        return False instead of raising.
+        """
+        if timeout is None:
+            timeout = self.profile["commit_timeout"] if soft else self.profile["timeout"]
+        started = time.time()
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=self.profile["poll"]).until(condition)
+        except TimeoutException:
+            elapsed = time.time() - started
+            if not soft:
+                logger.error(f"Timed out after {elapsed:.2f}s waiting for {description}")
+                raise
+            logger.warning(f"Gave up after {elapsed:.2f}s waiting for {description}")
+            return False
+
+        elapsed = time.time() - started
+        self._log_wait(description, elapsed, replaces)
+        return result
+
+    def observe(self, locator, condition, fallback, description, replaces=0.0, timeout=None, soft=False):
+        """Waits in the browser with a MutationObserver, falling back to polling if the script cannot run."""
+        observer_locator = to_observer_locator(locator)
+        if config.WAIT_STRATEGY != "observer" or observer_locator is None:
+            return self.until(fallback, description, replaces, timeout, soft)
+
+        if timeout is None:
+            timeout = self.profile["commit_timeout"] if soft else self.profile["timeout"]
+        started = time.time()
+        try:
+            result = self.driver.execute_async_script(OBSERVE_SCRIPT, observer_locator[0], observer_locator[1], condition, int(timeout * 1000))
+        except TimeoutException:
+            result = None
+        except WebDriverException as e:
+            logger.debug(f"Observer wait unavailable for {description}, polling instead: {str(e)}")
+            remaining = max(timeout - (time.time() - started), self.profile["poll"])
+            return self.until(fallback, description, replaces, remaining, soft)
+
+        elapsed = time.time() - started
+        if not result:
+            if not soft:
+                logger.error(f"Timed out after {elapsed:.2f}s waiting for {description}")
+                raise TimeoutException(f"Timed out waiting for {description}")
+            logger.warning(f"Gave up after {elapsed:.2f}s waiting for {description}")
+            return False
+
+        self._log_wait(description, elapsed, replaces)
+        return result
+
+    def present(self, locator, replaces=0.0, **kwargs):
+        return self.observe(locator, "present", EC.presence_of_element_located(locator), f"{locator[1]} present", replaces, **kwargs)
+
+    def clickable(self, locator, replaces=0.0, **kwargs):
+        return self.observe(locator, "clickable", EC.element_to_be_clickable(locator), f"{locator[1]} clickable", replaces, **kwargs)
+
+    def visible(self, locator, replaces=0.0, **kwargs):
+        return self.observe(locator, "visible", EC.visibility_of_element_located(locator), f"{locator[1]} visible", replaces, **kwargs)
+
+    def gone(self, locator, replaces=0.0, **kwargs):
+        return self.observe(locator, "invisible", EC.invisibility_of_element_located(locator), f"{locator[1]} gone", replaces, **kwargs)
+
+    def stale(self, element, description, replaces=0.0, **kwargs):
+        return self.until(EC.staleness_of(element), description, replaces, **kwargs)
+
+    def enabled(self, locator, replaces=0.0, **kwargs):
+        return self.until(element_enabled(locator), f"{locator[1]} enabled", replaces, **kwargs)
+
+    def toggle_state(self, locator, on=True, replaces=0.0, **kwargs):
+        return self.until(toggle_in_state(locator, on), f"{locator[1]} toggled {'on' if on else 'off'}", replaces, **kwargs)
+
+    def value(self, element, value, description, replaces=0.0, **kwargs):
+        kwargs.setdefault("soft", True)
+        return self.until(value_committed(element, value), f"{description} value committed", replaces, **kwargs)
+
+    def segment(self, element, value, description, replaces=0.0, **kwargs):
+        kwargs.setdefault("soft", True)
+        return self.until(segment_shows(element, value), f"{description} segment shows {value}", replaces, **kwargs)
+
+    def count(self, locator, minimum, replaces=0.0, **kwargs):
+        return self.until(element_count_at_least(locator, minimum), f"{minimum}+ {locator[1]}", replaces, **kwargs)
+
+    def network_idle(self, description, idle_ms=None, replaces=0.0, timeout=None, soft=True):
+        """Waits until the page has had no XHR/fetch in flight for idle_ms."""
+        if idle_ms is None:
+            idle_ms = config.NETWORK_IDLE_MS
+        if timeout is None:
+            timeout = self.profile["timeout"]
+        started = time.time()
+        idle = NetworkMonitor.for_driver(self.driver).wait_for_idle(idle_ms, timeout, self.profile["poll"])
+        elapsed = time.time() - started
+        if not idle:
+            if not soft:
+                raise TimeoutException(f"Timed out waiting for {description}")
+            logger.warning(f"Gave up after {elapsed:.2f}s waiting for {description}")
+            return False
+        self._log_wait(description, elapsed, replaces)
+        return True
+
+    def script(self, script, description, *args, replaces=0.0, **kwargs):
+        return self.until(script_returns_true(script, *args), description, replaces, **kwargs)
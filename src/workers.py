@@ -0,0 +1,157 @@
+from reservation import login_browser, process_reservation
+from pipeline import new_result
+import multiprocessing
+import queue
+import time
+import logging
+
+logger = logging.getLogger('WorkerPool')
+
+def _start_browser(creds, worker_logger):
+    from browser import Browser
+
+    browser = Browser()
+    if login_browser(browser, creds):
+        return browser
+    worker_logger.error("Login failed")
+    browser.close()
+    return None
+
+def worker_main(worker_name, creds, jobs, results, log_config=None, initializer=None, initargs=()):
+    from services import logger as log_setup
+
+    log_setup.configure_logging(log_config)
+    if initializer is not None:
+        initializer(*initargs)
+    worker_logger = logging.getLogger(worker_name)
+    started = time.time()
+    busy = 0.0
+    processed = 0
+
+    try:
+        browser = _start_browser(creds, worker_logger)
+    except Exception as e:
+        worker_logger.exception(f"Failed to start browser: {str(e)}")
+        browser = None
+    if browser is None:
+        results.put(("failed", worker_name, "Browser start or login failed"))
+        return
+    ready_at = time.time()
+    results.put(("ready", worker_name, round(ready_at - started, 2)))
+
+    try:
+        while True:
+            reservation_id = jobs.get()
+            if reservation_id is None:
+                break
+
+            job_started = time.time()
+            try:
+                result = process_reservation(browser, reservation_id)
+            except SystemExit:
+                # get_billing_code quits the driver when a requisition cannot be
+                # resolved; start a fresh browser so the worker keeps serving jobs
+                worker_logger.error(f"Browser closed while processing {reservation_id}, restarting it")
+                result = new_result(reservation_id)
+                result["status"] = "aborted"
+                result["error"] = "Browser closed during billing code retrieval"
+                browser = _start_browser(creds, worker_logger)
+            busy += time.time() - job_started
+            processed += 1
+
+            result["worker"] = worker_name
+            results.put(("result", worker_name, result))
+            if browser is None:
+                results.put(("failed", worker_name, "Browser restart failed"))
+                return
+    finally:
+        if browser is not None:
+            try:
+                browser.close()
+            except Exception as e:
+                worker_logger.error(f"Failed to close browser: {str(e)}")
+
+    active = time.time() - ready_at
+    results.put(("stopped", worker_name, {
+        "processed": processed,
+        "busy": round(busy, 2),
+        "active": round(active, 2),
+        "utilisation": round(busy / active, 3) if active else 0.0
+    }))
+
+def run_worker_pool(creds, reservation_ids, worker_count, log_config=None, initializer=None, initargs=()):
+    """initializer(*initargs) runs in each worker process before its browser starts, as with multiprocessing.Pool."""
+    worker_count = max(1, min(worker_count, len(reservation_ids)))
+    logger.info(f"Starting worker pool with {worker_count} workers for {len(reservation_ids)} reservations")
+
+    context = multiprocessing.get_context("spawn")
+    jobs = context.Queue()
+    results = context.Queue()
+    for reservation_id in reservation_ids:
+        jobs.put(reservation_id)
+    for _ in range(worker_count):
+        jobs.put(None)
+
+    started = time.time()
+    workers = []
+    for index in range(worker_count):
+        name = f"Worker-{index + 1}"
+        process = context.Process(target=worker_main, args=(name, creds, jobs, results, log_config, initializer, initargs), name=name)
+        process.start()
+        workers.append(process)
+
+    reservation_results = {}
+    worker_stats = {}
+    finished = set()
+    while len(finished) < worker_count:
+        try:
+            kind, name, payload = results.get(timeout=1)
+        except queue.Empty:
+            dead = [p.name for p in workers if not p.is_alive() and p.name not in finished]
+            for name in dead:
+                logger.error(f"{name} exited unexpectedly")
+                finished.add(name)
+            continue
+
+        if kind == "ready":
+            logger.info(f"{name} ready after {payload}s")
+            worker_stats.setdefault(name, {})["startup"] = payload
+        elif kind == "result":
+            reservation_results[payload["reservation_id"]] = payload
+            logger.info(f"{name} finished reservation {payload['reservation_id']} with status '{payload['status']}' in {payload['duration']}s")
+        elif kind == "stopped":
+            worker_stats.setdefault(name, {}).update(payload)
+            finished.add(name)
+        elif kind == "failed":
+            logger.error(f"{name} failed: {payload}")
+            worker_stats.setdefault(name, {})["error"] = payload
+            finished.add(name)
+
+    for process in workers:
+        process.join(timeout=10)
+    elapsed = time.time() - started
+
+    ordered_results = []
+    for reservation_id in reservation_ids:
+        result = reservation_results.get(reservation_id)
+        if result is None:
+            result = new_result(reservation_id)
+            result["status"] = "skipped"
+            result["error"] = "No worker processed this reservation"
+        ordered_results.append(result)
+
+    completed = sum(1 for r in ordered_results if r["status"] != "skipped")
+    throughput = completed / elapsed * 60 if elapsed else 0.0
+    logger.info(f"Worker pool processed {completed} reservations in {elapsed:.1f}s ({throughput:.2f} reservations/minute)")
+    for name in sorted(worker_stats):
+        stats = worker_stats[name]
+        if "error" in stats:
+            logger.info(f"{name}: failed - {stats['error']}")
+        else:
+            logger.info(f"{name}: {stats.get('processed', 0)} reservations, utilisation {stats.get('utilisation', 0.0) * 100:.0f}%, startup {stats.get('startup', 0)}s")
+
+    return ordered_results, {
+        "elapsed": round(elapsed, 2),
+        "throughput_per_minute": round(throughput, 2),
+        "workers": worker_stats
+    }